@@ -0,0 +1,27 @@
+import os
+import shutil
+
+'''
+Gunicorn config: 'gunicorn src.main:app -c gunicorn.conf.py'
+
+Prometheus multiprocess mode: every worker writes its metrics to files in PROMETHEUS_MULTIPROC_DIR,
+'/metrics' aggregates the files of all workers (prometheus_client.multiprocess).
+'''
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')  # Set before workers import prometheus_client
+
+bind = '0.0.0.0:8000'
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+
+def on_starting(server):
+    # Metrics of the previous run would be summed with the new ones
+    multiproc_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)  # Drop 'live*' gauges of the dead worker
@@ -11,6 +11,7 @@ from src.models.model_role import Role
 from src.models.model_user import User
 from src.models.model_project import Project
 from src.models.model_task import Task
+from src.models.model_outbox import OutboxMessage
 from src.database import Base
 from src.config import settings
 
@@ -0,0 +1,45 @@
+"""Make Project name unique per owner
+
+Revision ID: 4d8e6a1f0c93
+Revises: 9b1f3c2d7e4a
+Create Date: 2026-10-18 13:40:07.118264
+
+Project names were checked per owner by the application before the INSERT, concurrent requests could still
+create duplicates: the upgrade stops before changing the table and lists them, they have to be renamed first.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8e6a1f0c93'
+down_revision: Union[str, None] = '9b1f3c2d7e4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def check_duplicates() -> None:
+    """ Stop the upgrade if unique (owner_id, name) can't be created """
+    if context.is_offline_mode():
+        return
+    duplicates = op.get_bind().execute(sa.text(
+        'SELECT owner_id, name FROM project GROUP BY owner_id, name HAVING count(*) > 1 ORDER BY 1, 2 LIMIT 20'
+    )).all()
+    if duplicates:
+        raise RuntimeError(f'Duplicate Project names of one owner, rename them before the upgrade: {[tuple(row) for row in duplicates]}')
+
+
+def upgrade() -> None:
+    check_duplicates()
+    
+    # The unique constraint index replaces the plain (owner_id, name) index
+    op.drop_index('ix_project_owner_id_name', table_name='project')
+    op.create_unique_constraint('uq_project_owner_id_name', 'project', ['owner_id', 'name'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_project_owner_id_name', 'project', type_='unique')
+    op.create_index('ix_project_owner_id_name', 'project', ['owner_id', 'name'], unique=False)
@@ -0,0 +1,68 @@
+"""Add indexes for repository filters and relationship ordering
+
+Revision ID: 9b1f3c2d7e4a
+Revises: 6061c5eb5eea
+Create Date: 2026-10-18 10:12:41.305518
+
+The User email / username indexes are unique and case-insensitive. Registration only rejected exact
+duplicates before, so rows like 'Test@example.com' and 'test@example.com' can exist: the upgrade stops
+before creating any index and lists them, they have to be merged or renamed first.
+An offline upgrade (--sql) can't check the data, the CREATE UNIQUE INDEX statements fail on duplicates then.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1f3c2d7e4a'
+down_revision: Union[str, None] = '6061c5eb5eea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def check_duplicates(column: str) -> None:
+    """ Stop the upgrade if unique lower(column) can't be created """
+    if context.is_offline_mode():
+        return
+    duplicates = op.get_bind().execute(sa.text(
+        f'SELECT lower({column}) FROM "user" GROUP BY lower({column}) HAVING count(*) > 1 ORDER BY 1 LIMIT 20'
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(f'Users with case-insensitive duplicate {column}s, merge or rename them before the upgrade: {duplicates}')
+
+
+def upgrade() -> None:
+    check_duplicates('email')
+    check_duplicates('username')
+    
+    # User: 'email = ?' / 'username = ?' + case-insensitive uniqueness
+    op.create_index('uq_user_email', 'user', ['email'], unique=True)
+    op.create_index('uq_user_username', 'user', ['username'], unique=True)
+    op.create_index('uq_user_email_lower', 'user', [sa.text('lower(email)')], unique=True)
+    op.create_index('uq_user_username_lower', 'user', [sa.text('lower(username)')], unique=True)
+    
+    # Project: owner Projects by name, 'name = ?'
+    op.create_index('ix_project_owner_id_name', 'project', ['owner_id', 'name'], unique=False)
+    op.create_index('ix_project_name', 'project', ['name'], unique=False)
+    
+    # Task: foreign keys + relationship / pagination order
+    op.create_index('ix_task_project_id_name', 'task', ['project_id', 'name', 'id'], unique=False)
+    op.create_index('ix_task_customer_id_name', 'task', ['customer_id', 'name'], unique=False)
+    op.create_index('ix_task_performer_id_name', 'task', ['performer_id', 'name'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_performer_id_name', table_name='task')
+    op.drop_index('ix_task_customer_id_name', table_name='task')
+    op.drop_index('ix_task_project_id_name', table_name='task')
+    
+    op.drop_index('ix_project_name', table_name='project')
+    op.drop_index('ix_project_owner_id_name', table_name='project')
+    
+    op.drop_index('uq_user_username_lower', table_name='user')
+    op.drop_index('uq_user_email_lower', table_name='user')
+    op.drop_index('uq_user_username', table_name='user')
+    op.drop_index('uq_user_email', table_name='user')
@@ -0,0 +1,37 @@
+"""Create outbox table
+
+Revision ID: b7c2e9f4a1d6
+Revises: 4d8e6a1f0c93
+Create Date: 2026-10-18 16:05:22.540193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c2e9f4a1d6'
+down_revision: Union[str, None] = '4d8e6a1f0c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task', sa.String(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+    sa.Column('available_at', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_available_at_id', 'outbox', ['available_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_available_at_id', table_name='outbox')
+    op.drop_table('outbox')
@@ -0,0 +1,26 @@
+"""Add User last_seen_at
+
+Revision ID: e3a9c1d5b7f2
+Revises: b7c2e9f4a1d6
+Create Date: 2026-10-18 18:21:47.305516
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c1d5b7f2'
+down_revision: Union[str, None] = 'b7c2e9f4a1d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('last_seen_at', sa.TIMESTAMP(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'last_seen_at')
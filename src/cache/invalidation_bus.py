@@ -0,0 +1,152 @@
+import asyncio
+from typing import Awaitable, Callable
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.logger import logger
+
+
+DIRTY_KEYS = 'dirty_keys'  # session.info key, entity keys of the current transaction
+COMMITTED_KEYS = 'committed_keys'  # session.info key, entity keys of committed transactions (not published yet)
+ALL_KEYS = '*'  # Every entity (delete_all)
+
+
+def mark_dirty(session: Session, *keys: str) -> None:
+    """
+    Mark entities changed in the current transaction
+
+    Keys are published only after COMMIT, ROLLBACK discards them.
+
+    Args:
+        session (Session): SQLAlchemy session (AsyncSession.info is the same dict)
+        keys (str): Entity keys ('user:1', 'username:test1', 'principal:test1@example.com', 'project:1:project1')
+    """
+    session.info.setdefault(DIRTY_KEYS, set()).update(keys)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed(session: Session, flush_context) -> None:
+    # Entities written by the unit of work (session.add / session.delete)
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        mark_dirty(session, *instance.cache_keys())
+
+
+@event.listens_for(Session, 'after_commit')
+def _collect_committed(session: Session) -> None:
+    keys = session.info.pop(DIRTY_KEYS, None)
+    if keys:
+        session.info.setdefault(COMMITTED_KEYS, set()).update(keys)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dirty(session: Session) -> None:
+    session.info.pop(DIRTY_KEYS, None)
+
+
+class InvalidationBus:
+    '''
+    Write-driven cache invalidation across gunicorn workers and containers
+
+    1. Repositories / ORM events mark dirty entity keys in the session, 'after_commit' keeps them
+    2. The writing worker evicts the shared (Redis) tiers once and publishes the keys (Redis pub/sub)
+    3. Every worker evicts the keys from its local (in-process) tiers
+    4. With read replicas steps 2-3 are repeated after 'replica_lag': a request could refill a value from a replica
+       which hadn't replayed the write yet
+
+    Caches register their handlers: shared - async, called once per write, local - sync, called in every worker.
+
+    Fields:
+        replica_lag (float): Max seconds a replica read is behind the primary, 0 - no replicas
+    '''
+
+    channel = 'cache:invalidate'
+    max_backoff = 30  # Seconds between resubscribe attempts
+
+    def __init__(self, replica_lag: float = 0):
+        self.replica_lag = replica_lag
+        self.__connection: Redis | None = None  # None - the listener isn't started (tests, scripts) => no pub/sub
+        self.__shared_handlers: list[Callable[..., Awaitable[None]]] = []
+        self.__local_handlers: list[Callable[..., None]] = []
+        self.__delayed: set[asyncio.Task] = set()  # Repeated evictions waiting for the replicas
+
+    def add_shared_handler(self, handler: Callable[..., Awaitable[None]]) -> None:
+        self.__shared_handlers.append(handler)
+
+    def add_local_handler(self, handler: Callable[..., None]) -> None:
+        self.__local_handlers.append(handler)
+
+    def evict_local(self, *keys: str) -> None:
+        for handler in self.__local_handlers:
+            handler(*keys)
+
+    async def publish_committed(self, session: Session) -> None:
+        """
+        Publish entity keys of the committed transactions
+
+        Args:
+            session (Session): SQLAlchemy session (AsyncSession.info is the same dict)
+        """
+        keys = session.info.pop(COMMITTED_KEYS, None)
+        if keys:
+            await self.publish(*sorted(keys))
+
+    async def publish(self, *keys: str) -> None:
+        await self._evict(*keys)
+        if self.replica_lag:
+            task = asyncio.create_task(self._evict_later(*keys))
+            self.__delayed.add(task)
+            task.add_done_callback(self.__delayed.discard)
+
+    async def _evict_later(self, *keys: str) -> None:
+        await asyncio.sleep(self.replica_lag)
+        await self._evict(*keys)
+
+    async def _evict(self, *keys: str) -> None:
+        for handler in self.__shared_handlers:
+            await handler(*keys)
+        self.evict_local(*keys)  # Don't wait for the own message
+
+        if self.__connection is None:
+            return
+        try:
+            await self.__connection.publish(self.channel, orjson.dumps(keys))
+        except RedisError as e:
+            msg = 'Cache invalidation publish failed'
+            extra = {'keys': keys, 'Error': e}
+            logger.error(msg=msg, extra=extra, exc_info=False)  # log
+
+    async def listen(self, connection: Redis) -> None:
+        """
+        Evict keys published by other workers (run as a background task for the worker lifetime)
+
+        Args:
+            connection (Redis): Redis connection
+        """
+        self.__connection = connection
+        backoff = 1
+        while True:
+            pubsub = connection.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self.evict_local(ALL_KEYS)  # Messages could be lost while unsubscribed
+                backoff = 1
+                async for message in pubsub.listen():
+                    self.evict_local(*orjson.loads(message['data']))
+            except RedisError as e:
+                msg = 'Cache invalidation listener error'
+                extra = {'Error': e, 'retry_in': backoff}
+                logger.error(msg=msg, extra=extra, exc_info=False)  # log
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                await pubsub.reset()
+
+
+invalidation_bus = InvalidationBus( # A replica is used while its lag, checked every DB_REPLICA_LAG_CHECK_INTERVAL, is <= DB_REPLICA_MAX_LAG
+    replica_lag=settings.DB_REPLICA_MAX_LAG + settings.DB_REPLICA_LAG_CHECK_INTERVAL if settings.DATABASE_REPLICA_URLS else 0,
+)
@@ -0,0 +1,34 @@
+from typing import Any, Callable
+
+
+'''
+Cache key builders
+
+A key builder takes endpoint kwargs and returns the entity key of the cached value,
+e.g. 'user:1', 'username:test1', 'project:1:project1'.
+'''
+KeyBuilder = Callable[[dict[str, Any]], str]
+
+
+def _resolve(kwargs: dict[str, Any], path: str) -> Any:
+    name, *attributes = path.split('.')
+    value = kwargs[name]
+    for attribute in attributes:
+        value = getattr(value, attribute)
+    return value
+
+
+def attr_key(prefix: str, *paths: str) -> KeyBuilder:
+    """
+    Build key from endpoint kwargs
+
+    Args:
+        prefix (str): Entity name
+        paths (str): Kwarg names or attribute paths ('user_data.id')
+
+    Returns:
+        KeyBuilder: kwargs => '{prefix}:{value1}:{value2}...'
+    """
+    def key_builder(kwargs: dict[str, Any]) -> str:
+        return ':'.join([prefix, *[str(_resolve(kwargs, path)) for path in paths]])
+    return key_builder
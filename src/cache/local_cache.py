@@ -0,0 +1,51 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class LocalTTLCache:
+    '''
+    In-process LRU cache with per-entry TTL (one instance per worker process)
+
+    Fields:
+        maxsize (int): Max amount of entries, the least recently used entry is evicted first
+        ttl (float): Default entry lifetime in seconds
+    '''
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.__data: OrderedDict[str, tuple[float, Any]] = OrderedDict()  # key: (expires_at, value)
+
+    def get(self, key: str) -> Any | None:
+        item = self.__data.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():  # Entry has expired
+            del self.__data[key]
+            return None
+
+        self.__data.move_to_end(key)  # Mark as recently used
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+
+        self.__data[key] = (time.monotonic() + ttl, value)
+        self.__data.move_to_end(key)
+        while len(self.__data) > self.maxsize:
+            self.__data.popitem(last=False)  # Evict the least recently used entry
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.__data.pop(key, None)
+
+    def clear(self) -> None:
+        self.__data.clear()
+
+    def __len__(self) -> int:
+        return len(self.__data)
@@ -0,0 +1,195 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.cache.local_cache import LocalTTLCache
+from src.config import settings
+from src.database import async_session_factory
+from src.logger import logger
+from src.metrics import PRESENCE_FLUSHED
+from src.redis_config import app_redis
+from src.utils.user_repo import UserRepository
+
+
+class PresenceStore:
+    '''
+    User presence ('is_active', last seen time) in Redis, written to the Database in batches
+
+    1. Login / logout / authenticated requests change only Redis and mark the User id as changed
+    2. The flusher task of every worker takes changed ids (SPOP => each change is taken by one worker)
+       and writes them with one 'UPDATE ... FROM (VALUES ...)' per batch
+    3. 'is_active' is read from Redis, the 'user' columns are its durable copy (used when Redis has no entry)
+
+    Keys:
+        {prefix}:active (hash): User id => '1' / '0'
+        {prefix}:last_seen (sorted set): User id => last seen timestamp
+        {prefix}:dirty (set): User ids changed since their last flush
+
+    Fields:
+        connection (Redis): Redis connection
+        session_factory (async_sessionmaker[AsyncSession]): Session factory of the flush
+        flush_interval (float): Seconds between flushes
+        batch_size (int): Users per UPDATE
+        touch_interval (float): Min seconds between last seen updates of one User (per worker process)
+        touch_maxsize (int): Max amount of recently touched Users in the worker process
+        prefix (str): Redis keys prefix
+    '''
+
+    def __init__(
+        self,
+        connection: Redis,
+        session_factory: async_sessionmaker[AsyncSession],
+        flush_interval: float,
+        batch_size: int,
+        touch_interval: float,
+        touch_maxsize: int,
+        prefix: str = 'presence'
+    ):
+        self.connection = connection
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.active_key = f'{prefix}:active'
+        self.last_seen_key = f'{prefix}:last_seen'
+        self.dirty_key = f'{prefix}:dirty'
+        self.__touched = LocalTTLCache(maxsize=touch_maxsize, ttl=touch_interval)  # Recently touched Users
+
+    async def set_active(self, user_id: int, is_active: bool) -> bool:
+        """
+        Set User 'is_active' and last seen time
+
+        Args:
+            user_id (int): User id
+            is_active (bool): User is logged-in
+
+        Returns:
+            bool: False - Redis is unavailable, the caller writes the Database
+        """
+        try:
+            async with self.connection.pipeline(transaction=True) as pipeline:  # HSET + ZADD + SADD in one round trip
+                pipeline.hset(self.active_key, str(user_id), int(is_active))
+                pipeline.zadd(self.last_seen_key, {str(user_id): time.time()})
+                pipeline.sadd(self.dirty_key, str(user_id))
+                await pipeline.execute()
+        except RedisError as e:
+            logger.error(msg='Presence update failed', extra={'user_id': user_id, 'Error': e}, exc_info=False)  # log
+            return False
+        self.__touched.set(str(user_id), True)
+        return True
+
+    async def touch(self, user_id: int) -> None:
+        """
+        Update User last seen time (at most once per 'touch_interval' in the worker process)
+
+        Args:
+            user_id (int): User id
+        """
+        if self.__touched.get(str(user_id)):
+            return
+        self.__touched.set(str(user_id), True)
+        try:
+            async with self.connection.pipeline(transaction=True) as pipeline:
+                pipeline.zadd(self.last_seen_key, {str(user_id): time.time()})
+                pipeline.sadd(self.dirty_key, str(user_id))
+                await pipeline.execute()
+        except RedisError as e:
+            logger.warning(msg='Presence touch failed', extra={'user_id': user_id, 'Error': e})  # log
+
+    async def is_active(self, user_id: int) -> bool | None:
+        """
+        Read User 'is_active'
+
+        Args:
+            user_id (int): User id
+
+        Returns:
+            bool | None: None - no entry / Redis is unavailable (the Database value is used)
+        """
+        try:
+            value = await self.connection.hget(self.active_key, str(user_id))
+        except RedisError:
+            return None
+        return None if value is None else value == b'1'
+
+    async def forget(self, user_id: int) -> None:
+        """
+        Remove deleted User
+
+        Args:
+            user_id (int): User id
+        """
+        try:
+            async with self.connection.pipeline(transaction=True) as pipeline:
+                pipeline.hdel(self.active_key, str(user_id))
+                pipeline.zrem(self.last_seen_key, str(user_id))
+                pipeline.srem(self.dirty_key, str(user_id))
+                await pipeline.execute()
+        except RedisError as e:
+            logger.warning(msg='Presence removal failed', extra={'user_id': user_id, 'Error': e})  # log
+
+    async def flush(self) -> int:
+        """
+        Write one batch of changed Users to the Database
+
+        Raises:
+            RedisError: Redis is unavailable
+            SQLAlchemyError: Database error (the ids are returned to the changed set)
+
+        Returns:
+            int: Amount of taken User ids
+        """
+        ids = await self.connection.spop(self.dirty_key, self.batch_size)
+        if not ids:
+            return 0
+        user_ids = [int(user_id) for user_id in ids]
+
+        async with self.connection.pipeline(transaction=False) as pipeline:
+            pipeline.hmget(self.active_key, [str(user_id) for user_id in user_ids])
+            pipeline.zmscore(self.last_seen_key, [str(user_id) for user_id in user_ids])
+            active, last_seen = await pipeline.execute()
+
+        rows_by_columns: dict[tuple[str, ...], list[dict]] = {}  # One UPDATE per set of changed columns (touch changes only the last seen time)
+        for user_id, is_active, seen in zip(user_ids, active, last_seen):
+            row = {'id': user_id}
+            if is_active is not None:
+                row['is_active'] = is_active == b'1'
+            if seen is not None:
+                row['last_seen_at'] = datetime.fromtimestamp(seen, tz=timezone.utc).replace(tzinfo=None)
+            if len(row) > 1:
+                rows_by_columns.setdefault(tuple(row), []).append(row)
+
+        try:
+            async with self.session_factory() as session:
+                repository = UserRepository(session)
+                for rows in rows_by_columns.values():
+                    await repository.update_many(rows)
+        except SQLAlchemyError:
+            await self.connection.sadd(self.dirty_key, *ids)  # Flushed by the next run
+            PRESENCE_FLUSHED.labels('failed').inc(len(user_ids))
+            raise
+        PRESENCE_FLUSHED.labels('flushed').inc(len(user_ids))
+        return len(user_ids)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                while await self.flush() == self.batch_size:  # Backlog => the next batch right away
+                    pass
+            except (RedisError, SQLAlchemyError) as e:
+                logger.error(msg='Presence flush error', extra={'Error': e}, exc_info=False)  # log
+
+
+presence_store = PresenceStore(
+    connection=app_redis.connection,
+    session_factory=async_session_factory,
+    flush_interval=settings.PRESENCE_FLUSH_INTERVAL,
+    batch_size=settings.PRESENCE_FLUSH_BATCH_SIZE,
+    touch_interval=settings.PRESENCE_TOUCH_INTERVAL,
+    touch_maxsize=settings.PRESENCE_TOUCH_CACHE_MAXSIZE,
+)
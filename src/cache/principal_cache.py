@@ -0,0 +1,125 @@
+import time
+
+from redis.exceptions import RedisError
+
+from src.cache.invalidation_bus import ALL_KEYS, invalidation_bus
+from src.cache.local_cache import LocalTTLCache
+from src.config import settings
+from src.logger import logger
+from src.models.model_user import User
+from src.redis_config import app_redis
+from src.redis_repositories.redis_string_type_service import RedisStringTypeService
+from src.schemas.user_schemas import UserPrincipal
+
+
+class PrincipalCache:
+    '''
+    Two-tier cache of authenticated Users ('UserManager.get_current_user')
+
+    1. In-process LRU with short TTL (per gunicorn worker)
+    2. Redis, shared by all workers
+
+    Entries are keyed by token subject (User email) and never outlive the token 'exp'.
+
+    Fields:
+        redis_service (RedisStringTypeService): Redis DAO service
+        ttl (int): Max entry lifetime in Redis (seconds)
+        local_ttl (int): Max entry lifetime in the worker process (seconds)
+        maxsize (int): Max amount of entries in the worker process
+    '''
+
+    prefix = 'principal'
+
+    def __init__(self, redis_service: RedisStringTypeService, ttl: int, local_ttl: int, maxsize: int):
+        self.__redis_service = redis_service
+        self.__ttl = ttl
+        self.__local = LocalTTLCache(maxsize=maxsize, ttl=local_ttl)
+
+    def _redis_key(self, subject: str) -> str:
+        return f'{self.prefix}:{subject}'
+
+    async def get(self, subject: str) -> User | None:
+        """
+        Take cached User
+
+        Args:
+            subject (str): Token subject (User email)
+
+        Returns:
+            User | None: User SQLAlchemy model (without relationships), None - cache miss
+        """
+        principal: UserPrincipal | None = self.__local.get(subject)
+        if principal is None:
+            try:
+                raw = await self.__redis_service.get_one(self._redis_key(subject))
+            except RedisError:
+                return None  # Redis is unavailable => go to the Database
+            if raw is None:
+                return None
+
+            principal = UserPrincipal.model_validate_json(raw)
+            self.__local.set(subject, principal)
+        return User(**principal.model_dump())  # New detached instance per request
+
+    async def set(self, subject: str, user: User, expire: int | float) -> None:
+        """
+        Cache User
+
+        Args:
+            subject (str): Token subject (User email)
+            user (User): User SQLAlchemy model
+            expire (int | float): Token 'exp' (timestamp)
+        """
+        ttl = min(self.__ttl, int(expire - time.time()))  # Don't keep the User longer than the token lives
+        if ttl <= 0:
+            return
+
+        principal = UserPrincipal.model_validate(user)
+        self.__local.set(subject, principal, ttl=ttl)
+        try:
+            await self.__redis_service.create_one(self._redis_key(subject), principal.model_dump_json(), ex=ttl)
+        except RedisError:
+            pass  # Already logged by RedisRepository, the local tier still works
+
+    def _subjects(self, keys: tuple[str, ...]) -> list[str]:
+        return [key.removeprefix(f'{self.prefix}:') for key in keys if key.startswith(f'{self.prefix}:')]
+
+    async def invalidate(self, *keys: str) -> None:
+        """
+        Delete cached Users from Redis (shared handler of the invalidation bus)
+
+        Args:
+            keys (str): Entity keys, only 'principal:{email}' are used
+        """
+        subjects = self._subjects(keys)
+        if not subjects:
+            return
+
+        try:
+            await self.__redis_service.delete_one(*[self._redis_key(subject) for subject in subjects])
+        except RedisError:
+            msg = 'Principal cache invalidation failed'
+            extra = {'subjects': subjects}
+            logger.error(msg=msg, extra=extra, exc_info=False)  # log
+
+    def evict_local(self, *keys: str) -> None:
+        """
+        Delete cached Users from the worker process (local handler of the invalidation bus)
+
+        Args:
+            keys (str): Entity keys, only 'principal:{email}' are used, '*' - all Users
+        """
+        if ALL_KEYS in keys:
+            self.__local.clear()
+        else:
+            self.__local.delete(*self._subjects(keys))
+
+
+principal_cache = PrincipalCache(
+    redis_service=app_redis.redis_string_type_service,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL,
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+)
+invalidation_bus.add_shared_handler(principal_cache.invalidate)
+invalidation_bus.add_local_handler(principal_cache.evict_local)
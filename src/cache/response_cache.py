@@ -0,0 +1,301 @@
+import asyncio
+import functools
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, get_type_hints
+from uuid import uuid4
+
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from src.cache.invalidation_bus import ALL_KEYS, invalidation_bus
+from src.cache.key_builders import KeyBuilder
+from src.cache.local_cache import LocalTTLCache
+from src.cache.serializers import CacheEntry, CacheSerializer
+from src.config import settings
+from src.exceptions.custom_error import CustomError
+from src.exceptions.exist_error import ExistError
+from src.logger import logger
+from src.metrics import CACHE_LOOKUP_DURATION, CACHE_RECOMPUTE_DURATION, CACHE_REQUESTS
+from src.redis_config import app_redis
+from src.redis_repositories.redis_string_type_service import RedisStringTypeService
+from src.utils.read_routing import is_sticky
+
+
+class ResponseCache:
+    '''
+    Two-tier read-through cache of router / service methods results
+
+    1. In-process LRU with short TTL (per gunicorn worker)
+    2. Redis, shared by all workers: 'cache:{namespace}:{entity key}', so all namespaces of one entity can be evicted together
+
+    Expiry storms are absorbed by:
+    - singleflight: one coroutine per worker recomputes a key, the others wait for its result
+    - Redis lock (SET NX EX): one worker across the fleet recomputes a missing key, the others poll Redis
+    - probabilistic early expiration (XFetch): a value is refreshed before it expires, earlier for slow recomputes
+    - stale-while-revalidate: an expired value is kept 'stale_ttl' more seconds and served while one request refreshes it
+
+    Read replicas: a client that wrote recently (read-your-writes) doesn't read cached values, its request reads
+    the primary and replaces the value. Values refilled from a lagging replica are evicted again by the invalidation bus.
+
+    Fields:
+        redis_service (RedisStringTypeService): Redis DAO service
+        local_ttl (int): Max value lifetime in the worker process (seconds)
+        local_maxsize (int): Max amount of values in the worker process
+        stale_ttl (int): Seconds an expired value can be served
+        lock_timeout (int): Recompute lock lifetime (seconds)
+        beta (float): XFetch parameter, > 1 - earlier refresh
+    '''
+
+    prefix = 'cache'
+    lock_prefix = 'lock'
+    poll_interval = 0.05  # Seconds between Redis polls while another worker recomputes
+
+    def __init__(
+        self,
+        redis_service: RedisStringTypeService,
+        local_ttl: int,
+        local_maxsize: int,
+        stale_ttl: int,
+        lock_timeout: int,
+        beta: float
+    ):
+        self.__redis_service = redis_service
+        self.__local = LocalTTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self.__stale_ttl = stale_ttl
+        self.__lock_timeout = lock_timeout
+        self.__beta = beta
+        self.__inflight: dict[str, asyncio.Future] = {}  # Singleflight, redis key: recompute result
+        self.__lock_token = uuid4().hex  # Lock owner (this worker)
+        self.namespaces: set[str] = set()  # All registered namespaces (the same in every worker)
+
+    def _redis_key(self, namespace: str, key: str) -> str:
+        return f'{self.prefix}:{namespace}:{key}'
+
+    @staticmethod
+    def _return_model(func: Callable) -> type[BaseModel] | None:
+        return_type = get_type_hints(func).get('return')
+        if isinstance(return_type, type) and issubclass(return_type, BaseModel):
+            return return_type
+        return None
+
+    def cached(
+        self,
+        namespace: str,
+        key_builder: KeyBuilder,
+        ttl: int,
+        negative_ttl: int = settings.CACHE_NEGATIVE_TTL,
+        negative_errors: tuple[type[CustomError], ...] = (ExistError,)
+    ) -> Callable:
+        """
+        Cache decorator
+
+        Args:
+            namespace (str): Cache namespace (usually endpoint name)
+            key_builder (KeyBuilder): Endpoint kwargs => entity key
+            ttl (int): Value lifetime in seconds (before it becomes stale)
+            negative_ttl (int): Error lifetime in seconds, 0 - don't cache errors
+            negative_errors (tuple[type[CustomError], ...]): Errors to cache (negative caching)
+
+        Returns:
+            Callable: Decorator
+        """
+        self.namespaces.add(namespace)
+
+        def decorator(func: Callable) -> Callable:
+            model = self._return_model(func)  # Cached models are restored by the return annotation
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs) -> Any:
+                redis_key = self._redis_key(namespace, key_builder(kwargs))
+                call = functools.partial(func, *args, **kwargs)
+                compute = functools.partial(self._compute, namespace, redis_key, call, ttl, negative_ttl, negative_errors)
+
+                if is_sticky():  # Read-your-writes: a cached value could be older than the write of the client
+                    CACHE_REQUESTS.labels(namespace, 'bypass').inc()
+                    entry = await compute()  # The primary, the fresh value replaces the cached one
+                else:
+                    lookup_start = time.perf_counter()
+                    entry = await self._get(namespace, redis_key)
+                    CACHE_LOOKUP_DURATION.labels(namespace).observe(time.perf_counter() - lookup_start)
+                    if entry is None:
+                        CACHE_REQUESTS.labels(namespace, 'miss').inc()
+                        entry = await self._singleflight(redis_key, functools.partial(self._fill, redis_key, compute))
+                    elif self._should_refresh(entry):
+                        if redis_key in self.__inflight or not await self._lock(redis_key):
+                            CACHE_REQUESTS.labels(namespace, 'stale').inc()  # Another request refreshes it
+                        else:
+                            entry = await self._singleflight(redis_key, functools.partial(self._locked, redis_key, compute))
+
+                try:
+                    return CacheSerializer.loads(entry.payload, model)
+                except CustomError:
+                    CACHE_REQUESTS.labels(namespace, 'negative_hit').inc()
+                    raise
+            return wrapper
+        return decorator
+
+    def _should_refresh(self, entry: CacheEntry) -> bool:
+        # XFetch: now - delta * beta * ln(rand) >= expiry, rand in (0, 1]
+        return time.time() - entry.delta * self.__beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+    async def _singleflight(self, redis_key: str, recompute: Callable[[], Awaitable[CacheEntry]]) -> CacheEntry:
+        future = self.__inflight.get(redis_key)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():  # This request is cancelled
+                    raise
+                return await recompute()  # The leader request is cancelled
+
+        future = asyncio.get_running_loop().create_future()
+        self.__inflight[redis_key] = future
+        try:
+            entry = await recompute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved, waiting requests still get it
+            raise
+        else:
+            future.set_result(entry)
+            return entry
+        finally:
+            del self.__inflight[redis_key]
+
+    async def _fill(self, redis_key: str, compute: Callable[..., Awaitable[CacheEntry]]) -> CacheEntry:
+        if await self._lock(redis_key):
+            return await self._locked(redis_key, compute)
+
+        deadline = time.monotonic() + self.__lock_timeout  # Another worker recomputes the value
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                entry = await self._get_redis(redis_key)
+            except RedisError:
+                break
+            if entry is not None:
+                self.__local.set(redis_key, entry)
+                return entry
+        return await compute()  # The lock owner is too slow or dead
+
+    async def _locked(self, redis_key: str, compute: Callable[..., Awaitable[CacheEntry]]) -> CacheEntry:
+        try:
+            return await compute(unlock=True)  # The lock is released with the value write
+        except BaseException:
+            await self._unlock(redis_key)
+            raise
+
+    async def _compute(
+        self,
+        namespace: str,
+        redis_key: str,
+        call: Callable[[], Awaitable[Any]],
+        ttl: int,
+        negative_ttl: int,
+        negative_errors: tuple[type[CustomError], ...],
+        unlock: bool = False
+    ) -> CacheEntry:
+        start = time.perf_counter()
+        try:
+            payload = CacheSerializer.dumps(await call())
+            stale_ttl = self.__stale_ttl
+        except negative_errors as e:
+            if not negative_ttl:
+                raise
+            payload, ttl, stale_ttl = CacheSerializer.dumps_error(e), negative_ttl, 0  # Errors aren't served stale
+        delta = time.perf_counter() - start
+        CACHE_RECOMPUTE_DURATION.labels(namespace).observe(delta)
+
+        entry = CacheEntry(payload=payload, expires_at=time.time() + ttl, delta=delta)
+        self.__local.set(redis_key, entry)
+        try:
+            async with self.__redis_service.batch() as batch:  # SET + lock release in one round trip
+                batch.create_one(redis_key, entry.pack(), ex=ttl + stale_ttl)
+                if unlock:
+                    batch.delete_one_if_equal(self._lock_key(redis_key), self.__lock_token)
+                await batch.execute()
+        except RedisError:
+            pass  # Already logged by RedisRepository, the lock expires by itself
+        return entry
+
+    async def _get(self, namespace: str, redis_key: str) -> CacheEntry | None:
+        entry: CacheEntry | None = self.__local.get(redis_key)
+        if entry is not None:
+            CACHE_REQUESTS.labels(namespace, 'local_hit').inc()
+            return entry
+
+        try:
+            entry = await self._get_redis(redis_key)
+        except RedisError:
+            CACHE_REQUESTS.labels(namespace, 'error').inc()
+            return None  # Redis is unavailable => call the function
+        if entry is not None:
+            CACHE_REQUESTS.labels(namespace, 'hit').inc()
+            self.__local.set(redis_key, entry)
+        return entry
+
+    async def _get_redis(self, redis_key: str) -> CacheEntry | None:
+        raw = await self.__redis_service.get_one(redis_key, decode=False)
+        return CacheEntry.unpack(raw) if raw is not None else None
+
+    def _lock_key(self, redis_key: str) -> str:
+        return f'{self.lock_prefix}:{redis_key}'
+
+    async def _lock(self, redis_key: str) -> bool:
+        try:
+            result = await self.__redis_service.create_one(self._lock_key(redis_key), self.__lock_token, ex=self.__lock_timeout, nx=True)
+            return result['success']
+        except RedisError:
+            return True  # Redis is unavailable => singleflight still limits recomputes to one per worker
+
+    async def _unlock(self, redis_key: str) -> None:
+        try:
+            await self.__redis_service.delete_one_if_equal(self._lock_key(redis_key), self.__lock_token)
+        except RedisError:
+            pass  # The lock expires by itself
+
+    async def invalidate(self, *keys: str) -> None:
+        """
+        Delete cached values of entities in all namespaces from Redis (shared handler of the invalidation bus)
+
+        Args:
+            keys (str): Entity keys ('user:1', 'username:test1', ...), '*' is left to TTL
+        """
+        redis_keys = [self._redis_key(namespace, key) for key in keys if key != ALL_KEYS for namespace in self.namespaces]
+        if not redis_keys:
+            return
+        try:
+            await self.__redis_service.delete_one(*redis_keys)
+        except RedisError:
+            msg = 'Response cache invalidation failed'
+            extra = {'keys': list(keys)}
+            logger.error(msg=msg, extra=extra, exc_info=False)  # log
+
+    def evict_local(self, *keys: str) -> None:
+        """
+        Delete cached values of entities from the worker process (local handler of the invalidation bus)
+
+        Args:
+            keys (str): Entity keys, '*' - all values
+        """
+        if ALL_KEYS in keys:
+            self.__local.clear()
+        else:
+            self.__local.delete(*[self._redis_key(namespace, key) for key in keys for namespace in self.namespaces])
+
+
+response_cache = ResponseCache(
+    redis_service=app_redis.redis_string_type_service,
+    local_ttl=settings.CACHE_LOCAL_TTL,
+    local_maxsize=settings.CACHE_LOCAL_MAXSIZE,
+    stale_ttl=settings.CACHE_STALE_TTL,
+    lock_timeout=settings.CACHE_LOCK_TIMEOUT,
+    beta=settings.CACHE_XFETCH_BETA,
+)
+invalidation_bus.add_shared_handler(response_cache.invalidate)
+invalidation_bus.add_local_handler(response_cache.evict_local)
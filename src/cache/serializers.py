@@ -0,0 +1,82 @@
+import struct
+from typing import Any, NamedTuple
+
+import orjson
+from pydantic import BaseModel
+
+from src.exceptions.custom_error import CustomError
+
+
+class CacheSerializer:
+    '''
+    Binary cache payloads: 1 byte tag + body
+
+    M - pydantic model JSON (pydantic-core, round-trips nested models)
+    J - orjson (dict, list, str, int, ...)
+    E - cached error {'status_code', 'message'} (negative caching)
+    '''
+
+    MODEL = b'M'
+    JSON = b'J'
+    ERROR = b'E'
+
+    @classmethod
+    def dumps(cls, value: Any) -> bytes:
+        if isinstance(value, BaseModel):
+            return cls.MODEL + value.model_dump_json().encode('utf-8')
+        return cls.JSON + orjson.dumps(value)
+
+    @classmethod
+    def dumps_error(cls, error: CustomError) -> bytes:
+        return cls.ERROR + orjson.dumps({'status_code': error.code, 'message': error.message})
+
+    @classmethod
+    def loads(cls, payload: bytes, model: type[BaseModel] | None = None) -> Any:
+        """
+        Restore cached value
+
+        Args:
+            payload (bytes): Cache payload
+            model (type[BaseModel] | None): Pydantic model of 'M' payloads
+
+        Raises:
+            CustomError: Cached error ('E' payload)
+            ValueError: Unknown payload
+
+        Returns:
+            Any: Cached value
+        """
+        tag, body = payload[:1], payload[1:]
+        if tag == cls.MODEL and model is not None:
+            return model.model_validate_json(body)
+        if tag == cls.JSON:
+            return orjson.loads(body)
+        if tag == cls.ERROR:
+            error = orjson.loads(body)
+            raise CustomError(status_code=error['status_code'], message=error['message'])
+        raise ValueError(f'Unknown cache payload: {tag}')
+
+
+class CacheEntry(NamedTuple):
+    '''
+    Cached payload with expiry metadata: 16 bytes header (expires_at, delta) + payload
+
+    Fields:
+        payload (bytes): CacheSerializer payload
+        expires_at (float): Logical expiry (timestamp), the entry is kept longer to be served stale
+        delta (float): Recompute time in seconds (probabilistic early expiration)
+    '''
+
+    payload: bytes
+    expires_at: float
+    delta: float
+
+    HEADER = struct.Struct('!dd')
+
+    def pack(self) -> bytes:
+        return self.HEADER.pack(self.expires_at, self.delta) + self.payload
+
+    @classmethod
+    def unpack(cls, raw: bytes) -> 'CacheEntry':
+        expires_at, delta = cls.HEADER.unpack_from(raw)
+        return cls(payload=raw[cls.HEADER.size:], expires_at=expires_at, delta=delta)
@@ -6,12 +6,20 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file='.env')
     
     LOG_LEVEL: Literal['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+    LOG_QUEUE_SIZE: int = 10000  # Records waiting for the writer thread, the next ones are dropped
+    LOG_RATE_LIMIT_PER_SECOND: float = 50.0  # Records per second of one message (below ERROR)
+    LOG_RATE_LIMIT_BURST: int = 100  # Records of one message in a burst
+    LOG_REQUEST_SAMPLE_RATE: float = 1.0  # Fraction of logged successful requests
     
     DB_HOST: str
     DB_PORT: int
     DB_USER: str
     DB_PASS: str
     DB_NAME: str
+    DB_REPLICA_HOSTS: str = ''  # Read replicas 'host1:port1,host2:port2' (same user / password / database), '' - reads go to the primary
+    DB_REPLICA_MAX_LAG: float = 1.0  # Seconds, a replica lagging more is skipped until it catches up
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 2.0  # Seconds between replica lag checks
+    DB_STICKY_SECONDS: int = 5  # Reads of a client go to the primary for this long after its write (read-your-writes cookie)
     
     DB_HOST_TEST: str
     DB_PORT_TEST: int
@@ -24,11 +32,67 @@ class Settings(BaseSettings):
     REDIS_PASSWORD: str
     REDIS_USER: str
     REDIS_USER_PASSWORD: str
+    REDIS_MAX_CONNECTIONS: int = 50  # Connections per worker process
+    REDIS_POOL_TIMEOUT: float = 2.0  # Seconds waiting for a free connection
+    REDIS_SOCKET_TIMEOUT: float = 1.0  # Seconds per command
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 1.0  # Seconds per connect
+    REDIS_SOCKET_KEEPALIVE: bool = True
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # Seconds idle before PING on checkout
+    REDIS_RETRY_ATTEMPTS: int = 3  # Retries of a failed command (connection / timeout errors)
+    REDIS_RETRY_BACKOFF_BASE: float = 0.05  # Seconds, exponential backoff
+    REDIS_RETRY_BACKOFF_CAP: float = 1.0  # Seconds, max backoff
+    
+    PRINCIPAL_CACHE_TTL: int = 300  # Seconds in Redis (always bounded by the token 'exp')
+    PRINCIPAL_CACHE_LOCAL_TTL: int = 10  # Seconds in the worker process
+    PRINCIPAL_CACHE_MAXSIZE: int = 10000  # Principals per worker process
+    
+    CACHE_TTL_PROFILE_ME: int = 30  # Seconds, '/profile/me'
+    CACHE_TTL_PUBLIC_PROFILE: int = 60  # Seconds, '/profile/@{username}'
+    CACHE_TTL_PROJECT: int = 30  # Seconds, '/projects/{project_name}'
+    CACHE_NEGATIVE_TTL: int = 5  # Seconds, cached 404 responses
+    CACHE_STALE_TTL: int = 30  # Seconds an expired value is still served while one request refreshes it
+    CACHE_LOCAL_TTL: int = 5  # Seconds in the worker process
+    CACHE_LOCAL_MAXSIZE: int = 10000  # Values per worker process
+    CACHE_LOCK_TIMEOUT: int = 5  # Seconds, recompute lock across workers
+    CACHE_XFETCH_BETA: float = 1.0  # Probabilistic early expiration, > 1 - earlier refresh
     
     SMTP_HOST: str
     SMTP_PORT: int
     SMTP_USER: str
     SMTP_PASS: str
+    SMTP_SSL: bool = True  # Implicit TLS (SMTP_SSL), False - plain SMTP (local stand-in)
+    SMTP_POOL_SIZE: int = 4  # Connections per celery worker process (worker threads)
+    SMTP_TIMEOUT: float = 10.0  # Seconds per SMTP command
+    SMTP_MAX_IDLE: float = 30.0  # Seconds idle before NOOP check on checkout
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100  # Emails before reconnect
+    SMTP_BATCH_SIZE: int = 50  # Emails per celery task
+    SMTP_MAX_RETRIES: int = 5  # Retries of a batch with transient errors
+    SMTP_RETRY_BACKOFF_BASE: float = 2.0  # Seconds, exponential backoff
+    SMTP_RETRY_BACKOFF_CAP: float = 300.0  # Seconds, max backoff
+
+    OUTBOX_BATCH_SIZE: int = 100  # Outbox messages per relay transaction
+    OUTBOX_POLL_INTERVAL: float = 1.0  # Seconds between polls without COMMIT notifications
+    OUTBOX_MAX_BACKOFF: int = 300  # Seconds, max delay of a message the broker didn't accept
+    OUTBOX_LEASE: int = 60  # Seconds claimed messages are hidden from the other workers while they are sent (sent again if the worker dies)
+    
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # The same statement repeated in one request => N+1 warning
+    SQL_SLOW_QUERY_THRESHOLD: float = 0.2  # Seconds, slower repository calls are logged
+    SQL_SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1  # Fraction of slow calls with an EXPLAIN plan
+    SQL_SLOW_QUERY_MAX_EXPLAINS: int = 2  # Concurrent EXPLAIN tasks per worker process
+    SQL_SLOW_QUERY_EXPLAIN_TIMEOUT: int = 5000  # Milliseconds, EXPLAIN statement_timeout
+    SQL_SLOW_QUERY_DIR: str = '/tmp/terrea_slow_queries'  # Slow query log files of all workers
+    SQL_SLOW_QUERY_MAX_BYTES: int = 10 * 1024 * 1024  # File size before rotation
+    SQL_SLOW_QUERY_BACKUP_COUNT: int = 3  # Rotated files per worker process
+    
+    PRESENCE_FLUSH_INTERVAL: float = 10.0  # Seconds between flushes of Users presence to the Database
+    PRESENCE_FLUSH_BATCH_SIZE: int = 1000  # Users per 'UPDATE ... FROM (VALUES ...)'
+    PRESENCE_TOUCH_INTERVAL: float = 60.0  # Seconds between last seen updates of one User (per worker process)
+    PRESENCE_TOUCH_CACHE_MAXSIZE: int = 10000  # Recently touched Users per worker process
+    
+    ADMIN_ROLE_ID: int = 2  # Role of administrators ('/admin' endpoints)
+    
+    PASSWORD_HASH_WORKERS: int = 4  # bcrypt threads per worker process
+    PASSWORD_HASH_QUEUE_DEPTH: int = 64  # Waiting hashes per worker process, the next ones get 503
     
     SECRET_KEY: str 
     ALGORITHM: str
@@ -38,6 +102,11 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f'postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}'
     
+    @property
+    def DATABASE_REPLICA_URLS(self) -> list[str]:
+        hosts = [host.strip() for host in self.DB_REPLICA_HOSTS.split(',') if host.strip()]
+        return [f'postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{host}/{self.DB_NAME}' for host in hosts]
+    
     @property
     def TEST_DATABASE_URL(self) -> str:
         return f'postgresql+asyncpg://{self.DB_USER_TEST}:{self.DB_PASS_TEST}@{self.DB_HOST_TEST}:{self.DB_PORT_TEST}/{self.DB_NAME_TEST}'
@@ -1,10 +1,16 @@
+import time
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from src.config import settings
 from src.logger import logger
+from src.utils.query_stats import record_query
+from src.utils.read_routing import ReplicaRouter
+from src.utils.slow_queries import record_statement
+from src.utils.request_timing import get_request_timing
 
 
 class Base(DeclarativeBase):
@@ -39,10 +45,54 @@ class Base(DeclarativeBase):
             string: Class.tablename
         """        
         return cls.__tablename__.capitalize()
+    
+    def cache_keys(self) -> tuple[str, ...]:
+        """
+        Cache entity keys of the row (evicted after the row is written)
+
+        Returns:
+            tuple[str, ...]: Entity keys, by default the row isn't cached
+        """
+        return tuple()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration = time.perf_counter() - context._query_start
+    timing = get_request_timing() # SQLAlchemy greenlets share the request context
+    if timing is not None:
+        timing.add('db', duration)
+    record_query(statement, duration) # Query count, fingerprint histograms, N+1 detection
+    record_statement(statement, parameters, duration, conn.engine, executemany) # Slow repository calls log
+
+
+def instrument_engine(engine: AsyncEngine) -> AsyncEngine:
+    """
+    Add query timing listeners to the engine (request phases, query stats, slow queries log)
+
+    Other engines of the process (Alembic, scripts) aren't instrumented.
 
+    Args:
+        engine (AsyncEngine): Application engine
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False) # Creating engine for connection with database settings (DATABASE_URL), echo=True - show SQL transactions
+    Returns:
+        AsyncEngine: The same engine
+    """
+    event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', _after_cursor_execute)
+    return engine
+
+
+engine = instrument_engine(create_async_engine(settings.DATABASE_URL, echo=False)) # Creating engine for connection with database settings (DATABASE_URL), echo=True - show SQL transactions
 async_session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False) # Async session for creating SQL transations, autoflush=False - don't auto commit
+replica_router = ReplicaRouter( # Read-only dependencies => read replicas (DB_REPLICA_HOSTS), no replicas => the primary
+    engines=[instrument_engine(create_async_engine(url, echo=False)) for url in settings.DATABASE_REPLICA_URLS],
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -65,4 +115,19 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback() # Rollback SQL transations
             raise
         finally:
-            await session.close() # Close session
\ No newline at end of file
+            await session.close() # Close session
+
+
+async def get_async_read_session() -> AsyncGenerator[AsyncSession, None]:
+    session_factory = replica_router.read_session_factory() or async_session_factory # The primary after a recent write of the client / when replicas lag
+    async with session_factory() as session:
+        try:
+            yield session
+        except Exception as e:
+            msg = f'Database connection Error {e}'
+            extra = {'replica': session_factory is not async_session_factory}
+            logger.critical(msg=msg, extra=extra, exc_info=False)
+            await session.rollback() # Rollback SQL transations
+            raise
+        finally:
+            await session.close() # Close session
@@ -3,7 +3,7 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_session
+from src.database import get_async_read_session, get_async_session
 from src.repositories.project_service import ProjectService
 from src.repositories.role_service import RoleService
 from src.repositories.task_service import TaskService
@@ -11,6 +11,7 @@ from src.repositories.user_service import UserService
 from src.utils.projects_repo import ProjectRepository
 from src.utils.role_repo import RoleRepository
 from src.utils.task_repo import TaskRepository
+from src.utils.unit_of_work import UnitOfWork
 from src.utils.user_repo import UserRepository
 
 
@@ -24,4 +25,21 @@ def task_service(session: Annotated[AsyncSession, Depends(get_async_session)]):
     return TaskService(TaskRepository(session))
 
 def user_service(session: Annotated[AsyncSession, Depends(get_async_session)]):
-    return UserService(UserRepository(session))
\ No newline at end of file
+    return UserService(UserRepository(session))
+
+def unit_of_work(session: Annotated[AsyncSession, Depends(get_async_session)]):
+    return UnitOfWork(session) # The same session as the DAO services of the request
+
+
+# Read-only dependencies (GET endpoints): replica session, see 'replica_router'
+def project_read_service(session: Annotated[AsyncSession, Depends(get_async_read_session)]):
+    return ProjectService(ProjectRepository(session))
+
+def task_read_service(session: Annotated[AsyncSession, Depends(get_async_read_session)]):
+    return TaskService(TaskRepository(session))
+
+def user_read_service(session: Annotated[AsyncSession, Depends(get_async_read_session)]):
+    return UserService(UserRepository(session))
+
+def read_unit_of_work(session: Annotated[AsyncSession, Depends(get_async_read_session)]):
+    return UnitOfWork(session)
\ No newline at end of file
@@ -0,0 +1,48 @@
+import base64
+import binascii
+import json
+
+from src.exceptions.validation_error import ValidationError
+from src.logger import logger
+
+
+class PaginationManager:
+    '''
+    Opaque keyset cursors: base64(JSON list of the last row ordering values)
+    '''
+
+    @staticmethod
+    def encode_cursor(values: tuple) -> str:
+        raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str | None, types: tuple[type, ...]) -> tuple | None:
+        """
+        Decode cursor from the request
+
+        Args:
+            cursor (str | None): Cursor from the previous page, None - first page
+            types (tuple[type, ...]): Types of the ordering values (('name', 'id') => (str, int))
+
+        Raises:
+            ValidationError: status - 400, Cursor is invalid
+
+        Returns:
+            tuple | None: Last row ordering values
+        """
+        if cursor is None:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, ValueError):
+            values = None
+
+        valid = isinstance(values, list) and len(values) == len(types) and all(
+            isinstance(value, value_type) and not isinstance(value, bool) for value, value_type in zip(values, types) # bool is int
+        )
+        if not valid: # Wrong types would reach the keyset comparison => DataError
+            logger.info(msg='Invalid cursor', extra={'cursor': cursor}) # log
+            raise ValidationError(msg='Invalid cursor')
+        return tuple(values)
@@ -1,12 +1,60 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
 from passlib.context import CryptContext
 
+from src.config import settings
+from src.exceptions.unavailable_error import UnavailableError
+from src.logger import logger
+from src.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_QUEUE_WAIT, PASSWORD_HASH_REJECTED
+from src.utils.request_timing import timed
+
 
 class PasswordManager:
-    def __init__(self, schemes: list[str] = ['bcrypt'], deprecated: str = 'auto'):
-        self.pwd_context = CryptContext(schemes=schemes, deprecated=deprecated)
-    
-    def get_password_hash(self, password: str) -> str:
-        return self.pwd_context.hash(password)
-
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    '''
+    Async password hashing service
+
+    bcrypt runs in a bounded thread pool (bcrypt releases the GIL), so a login burst doesn't block the event loop.
+
+    Fields:
+        max_workers (int): Max amount of hashes running at the same time
+        queue_depth (int): Max amount of hashes waiting for a free worker, the next ones are rejected (503)
+    '''
+
+    def __init__(self, max_workers: int, queue_depth: int, schemes: tuple[str, ...] = ('bcrypt',), deprecated: str = 'auto'):
+        self.pwd_context = CryptContext(schemes=schemes, deprecated=deprecated) # Shared context (built once per worker process)
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hash')
+        self.__semaphore = asyncio.Semaphore(max_workers)
+        self.__max_pending = max_workers + queue_depth
+        self.__pending = 0
+
+    async def _run(self, operation: str, func: Callable, *args) -> Any:
+        if self.__pending >= self.__max_pending: # Queue is full
+            PASSWORD_HASH_REJECTED.labels(operation).inc()
+            logger.warning(msg='Password hashing queue is full', extra={'operation': operation}) # log
+            raise UnavailableError(msg='Server is busy, try again later')
+
+        self.__pending += 1
+        queued_at = time.perf_counter()
+        try:
+            async with self.__semaphore:
+                started_at = time.perf_counter()
+                PASSWORD_HASH_QUEUE_WAIT.labels(operation).observe(started_at - queued_at)
+
+                with timed('bcrypt'):
+                    result = await asyncio.get_running_loop().run_in_executor(self.__executor, func, *args)
+                PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - started_at)
+                return result
+        finally:
+            self.__pending -= 1
+
+    async def get_password_hash(self, password: str) -> str:
+        return await self._run('hash', self.pwd_context.hash, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run('verify', self.pwd_context.verify, plain_password, hashed_password)
+
+
+password_manager = PasswordManager(max_workers=settings.PASSWORD_HASH_WORKERS, queue_depth=settings.PASSWORD_HASH_QUEUE_DEPTH)
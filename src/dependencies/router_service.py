@@ -1,17 +1,35 @@
 from fastapi import Depends
 from typing import Annotated
 
-from src.dependencies.model_service import user_service, project_service, task_service
+from src.dependencies.model_service import (
+    project_read_service,
+    project_service,
+    read_unit_of_work,
+    task_read_service,
+    task_service,
+    unit_of_work,
+    user_read_service,
+    user_service,
+)
 from src.services.profile_config import ProfileConfig
 from src.services.project_config import ProjectConfig
 from src.repositories.user_service import UserService
 from src.repositories.project_service import ProjectService
 from src.repositories.task_service import TaskService
+from src.utils.unit_of_work import UnitOfWork
 
 
-def get_profile_config(user_service: Annotated[UserService, Depends(user_service)]) -> ProfileConfig:
-    return ProfileConfig(user_service=user_service)
+def get_profile_config(user_service: Annotated[UserService, Depends(user_service)], uow: Annotated[UnitOfWork, Depends(unit_of_work)]) -> ProfileConfig:
+    return ProfileConfig(user_service=user_service, uow=uow)
 
 
-def get_project_config(project_service: Annotated[ProjectService, Depends(project_service)], task_service: Annotated[TaskService, Depends(task_service)]) -> ProjectConfig:
-    return ProjectConfig(project_service=project_service, task_service=task_service) 
\ No newline at end of file
+def get_project_config(project_service: Annotated[ProjectService, Depends(project_service)], task_service: Annotated[TaskService, Depends(task_service)], user_service: Annotated[UserService, Depends(user_service)], uow: Annotated[UnitOfWork, Depends(unit_of_work)]) -> ProjectConfig:
+    return ProjectConfig(project_service=project_service, task_service=task_service, user_service=user_service, uow=uow)
+
+
+def get_profile_read_config(user_service: Annotated[UserService, Depends(user_read_service)], uow: Annotated[UnitOfWork, Depends(read_unit_of_work)]) -> ProfileConfig:
+    return ProfileConfig(user_service=user_service, uow=uow) # Read-only methods (replica session)
+
+
+def get_project_read_config(project_service: Annotated[ProjectService, Depends(project_read_service)], task_service: Annotated[TaskService, Depends(task_read_service)], user_service: Annotated[UserService, Depends(user_read_service)], uow: Annotated[UnitOfWork, Depends(read_unit_of_work)]) -> ProjectConfig:
+    return ProjectConfig(project_service=project_service, task_service=task_service, user_service=user_service, uow=uow) # Read-only methods (replica session)
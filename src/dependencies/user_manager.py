@@ -4,34 +4,22 @@ from typing import Annotated
 from fastapi import Depends
 from jose import JWTError, jwt
 
+from src.cache.presence_store import presence_store
+from src.cache.principal_cache import principal_cache
+from src.exceptions.access_error import AccessError
 from src.exceptions.auth_error import AuthError
 from src.config import settings
-from src.dependencies.model_service import user_service
+from src.dependencies.model_service import user_read_service, user_service
 from src.dependencies.token_manager import TokenManager
 from src.models.model_user import User
 from src.repositories.user_service import UserService
 from src.logger import logger
+from src.utils.request_timing import timed_phase
 
 
 class UserManager:
     @staticmethod
-    async def get_current_user(token: Annotated[str, Depends(TokenManager.get_access_token)], user_service: Annotated[UserService, Depends(user_service)]) -> User:
-        """
-        Check if User Logeed-in
-
-        Args:
-            token (Annotated[str, Depends): Dependencies with 'TokenManager.get_access_token'
-            user_service (Annotated[UserService, Depends): Dependencies with 'src.dependencies.model_service.user_service'. User DAO service
-
-        Raises:
-            AuthError: status - 401, Token is invalid
-            AuthError: status - 401, Token has expired
-            AuthError: status - 401, User ID not found
-            AuthError: status - 401, User not found
-
-        Returns:
-            User: User SQLAlchemy model
-        """
+    async def _authenticate(token: str, user_service: UserService) -> User:
         try:
             auth_data = settings.AUTH_DATA
             payload = jwt.decode(token, auth_data['secret_key'], algorithms=auth_data['algorithm'])
@@ -50,8 +38,73 @@ class UserManager:
             logger.warning(msg='User ID not found', extra={'user_email': user_email}) # log
             raise AuthError(msg='User ID not found')
             
-        user = await user_service.get_user_by_email(user_email) # Searching User in the Database
+        user = await principal_cache.get(user_email) # Searching User in the cache (worker process => Redis)
         if user is None:
-            logger.warning(msg='User not found') # log
-            raise AuthError(msg='User not found')
-        return user
\ No newline at end of file
+            user = await user_service.get_user_by_email(user_email, loader_profile='auth-minimal') # Searching User in the Database (only the User row, without relationships)
+            if user is None:
+                logger.warning(msg='User not found') # log
+                raise AuthError(msg='User not found')
+            await principal_cache.set(user_email, user, expire) # Cache User until the token expires
+        await presence_store.touch(user.id) # Last seen time (Redis, at most once per PRESENCE_TOUCH_INTERVAL)
+        return user
+    
+    @staticmethod
+    @timed_phase('auth')
+    async def get_current_user(token: Annotated[str, Depends(TokenManager.get_access_token)], user_service: Annotated[UserService, Depends(user_service)]) -> User:
+        """
+        Check if User Logeed-in
+
+        Args:
+            token (Annotated[str, Depends): Dependencies with 'TokenManager.get_access_token'
+            user_service (Annotated[UserService, Depends): Dependencies with 'src.dependencies.model_service.user_service'. User DAO service
+
+        Raises:
+            AuthError: status - 401, Token is invalid
+            AuthError: status - 401, Token has expired
+            AuthError: status - 401, User ID not found
+            AuthError: status - 401, User not found
+
+        Returns:
+            User: User SQLAlchemy model (without relationships, may be detached if taken from the cache)
+        """
+        return await UserManager._authenticate(token, user_service)
+    
+    @staticmethod
+    @timed_phase('auth')
+    async def get_current_user_read(token: Annotated[str, Depends(TokenManager.get_access_token)], user_service: Annotated[UserService, Depends(user_read_service)]) -> User:
+        """
+        Check if User Logged-in (read-only routes: a principal cache miss reads the route read session, not the primary)
+
+        Args:
+            token (Annotated[str, Depends): Dependencies with 'TokenManager.get_access_token'
+            user_service (Annotated[UserService, Depends): Dependencies with 'src.dependencies.model_service.user_read_service'. User DAO service
+
+        Raises:
+            AuthError: status - 401, see 'UserManager.get_current_user'
+
+        Returns:
+            User: User SQLAlchemy model (without relationships, may be detached if taken from the cache)
+        """
+        return await UserManager._authenticate(token, user_service)
+    
+    @staticmethod
+    async def get_current_admin(token: Annotated[str, Depends(TokenManager.get_access_token)], user_service: Annotated[UserService, Depends(user_service)]) -> User:
+        """
+        Check if User Logged-in and is an administrator
+
+        Args:
+            token (Annotated[str, Depends): Dependencies with 'TokenManager.get_access_token'
+            user_service (Annotated[UserService, Depends): User DAO service
+
+        Raises:
+            AuthError: status - 401, see 'UserManager.get_current_user'
+            AccessError: status - 405, User is not an administrator
+
+        Returns:
+            User: User SQLAlchemy model
+        """
+        user = await UserManager.get_current_user(token, user_service)
+        if user.role_id != settings.ADMIN_ROLE_ID:
+            logger.warning(msg='Admin access denied', extra={'user_id': user.id}) # log
+            raise AccessError(msg='Access denied')
+        return user
@@ -0,0 +1,12 @@
+from fastapi import status
+
+from src.exceptions.custom_error import CustomError
+
+
+class UnavailableError(CustomError):
+    '''
+    Server overload Error
+    '''
+    
+    def __init__(self, msg: str):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, message=msg)
\ No newline at end of file
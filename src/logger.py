@@ -1,10 +1,20 @@
+import atexit
 import logging
-from datetime import datetime
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from pythonjsonlogger import jsonlogger
 
 from src.config import settings
+from src.exceptions.custom_error import CustomError
+from src.metrics import LOG_RECORDS_DROPPED
 
 logger = logging.getLogger()
+request_logger = logging.getLogger('terrea.request') # Hot path: one record per HTTP request (sampled)
 logHandler = logging.StreamHandler()
 
 
@@ -12,16 +22,141 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
     def add_fields(self, log_record, record, message_dict):
         super(CustomJsonFormatter, self).add_fields(log_record, record, message_dict)
         if not log_record.get('timestamp'):
-            # this doesn't use record.created, so it is slightly off
-            now = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-            log_record['timestamp'] = now
+            log_record['timestamp'] = datetime.fromtimestamp(record.created, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ') # Time of the log call, not of the write
         if log_record.get('level'):
             log_record['level'] = log_record['level'].upper()
         else:
             log_record['level'] = record.levelname
 
+
+class ExpectedErrorFilter(logging.Filter):
+    '''
+    Drop traceback of expected errors before it is formatted
+
+    'exc_info=True' outside of 'except' (no exception) and client errors (CustomError, status < 500) are logged without a stack trace.
+    '''
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.exc_info:
+            error = record.exc_info[1]
+            if error is None or (isinstance(error, CustomError) and error.code < 500):
+                record.exc_info = None
+                record.exc_text = None
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    '''
+    Token bucket per (logger, message) for records below 'max_level', dropped records are counted in the next passing one ('suppressed')
+
+    Fields:
+        rate (float): Records per second
+        burst (int): Bucket size
+        max_level (int): Records of this level and above always pass
+        exempt (tuple[str, ...]): Loggers with their own sampling
+    '''
+
+    max_buckets = 10000
+
+    def __init__(self, rate: float, burst: int, max_level: int = logging.ERROR, exempt: tuple[str, ...] = ()):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level
+        self.exempt = exempt
+        self.__buckets: dict[tuple[str, str], list[float]] = {} # (logger, message): [tokens, last update, suppressed]
+        self.__lock = threading.Lock() # Records come from the event loop and thread pools
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.max_level or record.name in self.exempt:
+            return True
+        now = time.monotonic()
+        key = (record.name, str(record.msg))
+        with self.__lock:
+            if len(self.__buckets) >= self.max_buckets: # Messages built with f-strings => unbounded keys
+                self.__buckets.clear()
+            bucket = self.__buckets.setdefault(key, [float(self.burst), now, 0])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                LOG_RECORDS_DROPPED.labels('rate_limited').inc()
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed = int(bucket[2])
+                bucket[2] = 0
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    '''
+    Keep a fraction of records below WARNING (per-logger filter)
+
+    Fields:
+        rate (float): Kept fraction, 1 - all records
+    '''
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate:
+            return True
+        LOG_RECORDS_DROPPED.labels('sampled').inc()
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    '''
+    Hand records to the writer thread: formatting (JSON, tracebacks) and stream writes are done outside of the event loop
+
+    A full queue drops the record instead of blocking the caller.
+    '''
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage() # Merge args now, they may change before the record is written
+        record.msg, record.args = record.message, None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.labels('queue_full').inc()
+
+
 formatter = CustomJsonFormatter('%(timestamp)s %(level)s %(name)s %(message)s')
 
 logHandler.setFormatter(formatter)
-logger.addHandler(logHandler)
-logger.setLevel(settings.LOG_LEVEL)
\ No newline at end of file
+
+queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+queue_handler.addFilter(ExpectedErrorFilter())
+queue_handler.addFilter(RateLimitFilter(rate=settings.LOG_RATE_LIMIT_PER_SECOND, burst=settings.LOG_RATE_LIMIT_BURST, exempt=(request_logger.name,)))
+
+logger.addHandler(queue_handler)
+logger.setLevel(settings.LOG_LEVEL)
+request_logger.addFilter(SamplingFilter(rate=settings.LOG_REQUEST_SAMPLE_RATE))
+
+
+def _start_log_listener() -> QueueListener:
+    listener = QueueListener(queue_handler.queue, logHandler, respect_handler_level=True) # Background writer thread
+    listener.start()
+    return listener
+
+
+def _restart_log_listener() -> None:
+    # Forked process (celery prefork) has no writer thread and may inherit a locked queue
+    global log_listener
+    queue_handler.queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    log_listener = _start_log_listener()
+
+
+def _stop_log_listener() -> None:
+    log_listener.stop() # Flush the queue
+
+
+log_listener = _start_log_listener()
+os.register_at_fork(after_in_child=_restart_log_listener)
+atexit.register(_stop_log_listener)
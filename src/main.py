@@ -1,14 +1,27 @@
-import time
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI, Request
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 
+from src.cache.invalidation_bus import invalidation_bus
+from src.cache.presence_store import presence_store
+from src.database import replica_router
 from src.exceptions.custom_error import CustomError
+from src.middlewares.read_routing_middleware import ReadYourWritesMiddleware
+from src.middlewares.timing_middleware import TimingMiddleware
+from src.routers.router_admin import router as admin_router
 from src.routers.router_profile import router as auth_router
 from src.routers.router_project import router as projects_router
 from src.logger import logger
+from src.redis_config import app_redis
+from src.schemas.charset import CHARSET_ERROR, CHARSET_MESSAGE
+from src.tasks.outbox_relay import outbox_relay
+from src.utils.index_audit import find_unindexed_filters
 
 description = """
 Terrea API.
@@ -36,19 +49,48 @@ You will be able to:
 """
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    for unindexed_filter in find_unindexed_filters(): # Check if every repository filter is backed by an index
+        logger.warning(msg='Repository filter is not backed by an index', extra=unindexed_filter)  # log
+    
+    invalidation_listener = asyncio.create_task(invalidation_bus.listen(app_redis.connection)) # Evict local caches on writes of other workers
+    relay = asyncio.create_task(outbox_relay.run()) # Send committed outbox messages to the broker
+    presence_flusher = asyncio.create_task(presence_store.run()) # Write Users presence to the Database in batches
+    replica_monitor = asyncio.create_task(replica_router.run()) # Replication lag of the read replicas
+    yield
+    for background_task in (invalidation_listener, relay, presence_flusher, replica_monitor):
+        background_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await background_task
+    await replica_router.close()
+    await app_redis.close()
+
+
 app = FastAPI(
     title='Terrea',
     description=description,
     version='0.1.0',
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse, # orjson instead of json.dumps for dict / list responses
 )
 
 @app.exception_handler(CustomError)
 async def unicorn_exception_handler(request: Request, exc: CustomError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.code,
         content={'status': False, 'message': exc.message}
     )
 
+@app.exception_handler(RequestValidationError)
+async def charset_exception_handler(request: Request, exc: RequestValidationError):
+    if exc.errors() and all(error['type'] == CHARSET_ERROR for error in exc.errors()): # Only incorrect symbols => 400 as the other client errors
+        return ORJSONResponse(
+            status_code=400,
+            content={'status': False, 'message': CHARSET_MESSAGE}
+        )
+    return await request_validation_exception_handler(request, exc) # 422
+
 origins = [
     "http://localhost:3000",
 ]
@@ -61,21 +103,15 @@ app.add_middleware(
     allow_headers=['*'],
 )
 
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.perf_counter()
-    response = await call_next(request)
-    process_time = time.perf_counter() - start_time
-    logger.info('Request execution time', extra={
-        'process_time': round(process_time, 4)
-    })
-    return response
+app.add_middleware(ReadYourWritesMiddleware) # Read-your-writes cookie after committed writes
+app.add_middleware(TimingMiddleware) # Outermost: 'Server-Timing' header and request log
 
 instrumentator = Instrumentator(
     should_group_status_codes=False,
     excluded_handlers=[".*admin.*", "/metrics"],
 )
-Instrumentator().instrument(app).expose(app)
+instrumentator.instrument(app).expose(app) # Aggregates all workers if PROMETHEUS_MULTIPROC_DIR is set
 
 app.include_router(auth_router)
 app.include_router(projects_router)
+app.include_router(admin_router)
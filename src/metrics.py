@@ -0,0 +1,150 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+
+'''
+Application metrics (exposed with HTTP metrics on '/metrics')
+
+Under gunicorn every worker writes its metrics to PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py),
+gauges declare how the workers values are aggregated ('multiprocess_mode').
+'''
+
+# Password hashing (src.dependencies.password_manager)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    'password_hash_queue_wait_seconds',
+    'Time spent waiting for a free password hashing worker',
+    ['operation'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PASSWORD_HASH_DURATION = Histogram(
+    'password_hash_duration_seconds',
+    'Time spent hashing / verifying a password',
+    ['operation'],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2),
+)
+PASSWORD_HASH_REJECTED = Counter(
+    'password_hash_rejected_total',
+    'Password hashing requests rejected because the queue is full',
+    ['operation'],
+)
+
+# Response cache (src.cache.response_cache)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Response cache lookups',
+    ['namespace', 'result'],  # result: local_hit, hit, miss, negative_hit, stale, bypass, error
+)
+CACHE_LOOKUP_DURATION = Histogram(
+    'cache_lookup_duration_seconds',
+    'Response cache lookup time (worker process => Redis)',
+    ['namespace'],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+CACHE_RECOMPUTE_DURATION = Histogram(
+    'cache_recompute_duration_seconds',
+    'Time spent recomputing a cached value',
+    ['namespace'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+# Redis connection pool (src.utils.redis_pool)
+REDIS_POOL_CONNECTIONS = Gauge(
+    'redis_pool_connections',
+    'Redis connections of the worker process pools',
+    ['state'],  # state: in_use, idle
+    multiprocess_mode='livesum',  # Sum of the alive workers
+)
+REDIS_POOL_WAITERS = Gauge(
+    'redis_pool_waiters',
+    'Requests waiting for a free Redis connection',
+    multiprocess_mode='livesum',
+)
+REDIS_POOL_TIMEOUTS = Counter(
+    'redis_pool_timeouts_total',
+    'Redis connection checkouts failed (pool exhausted / connection error)',
+)
+
+# SQL (src.utils.query_stats)
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds',
+    'SQL statement execution time',
+    ['operation', 'fingerprint'],  # fingerprint: hash of the normalized statement (logged with N+1 warnings)
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'db_queries_per_request',
+    'SQL statements executed by one HTTP request',
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+
+# Slow query log (src.utils.slow_queries)
+DB_SLOW_CALLS = Counter(
+    'db_slow_repository_calls_total',
+    'Repository calls longer than SQL_SLOW_QUERY_THRESHOLD',
+    ['caller'],  # Service method
+)
+
+# Redis commands (src.redis_config)
+REDIS_COMMAND_DURATION = Histogram(
+    'redis_command_duration_seconds',
+    'Redis command round trip time',
+    ['command'],  # PIPELINE - batch of commands
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+# Celery (src.tasks.celery)
+CELERY_ENQUEUE_DURATION = Histogram(
+    'celery_enqueue_duration_seconds',
+    'Time spent sending a task to the broker',
+    ['task'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+CELERY_ENQUEUE_ERRORS = Counter(
+    'celery_enqueue_errors_total',
+    'Tasks failed to be sent to the broker',
+    ['task'],
+)
+
+# Logging (src.logger)
+LOG_RECORDS_DROPPED = Counter(
+    'log_records_dropped_total',
+    'Log records not written',
+    ['reason'],  # rate_limited, sampled, queue_full
+)
+
+# Email (src.tasks.smtp_pool / src.tasks.tasks)
+SMTP_CONNECTIONS_OPENED = Counter(
+    'smtp_connections_opened_total',
+    'SMTP connections opened (connect + TLS + login)',
+)
+SMTP_EMAILS = Counter(
+    'smtp_emails_total',
+    'Emails handled by the email tasks',
+    ['result'],  # sent, refused, retried, failed
+)
+
+# Outbox (src.tasks.outbox_relay)
+OUTBOX_RELAYED = Counter(
+    'outbox_relayed_total',
+    'Outbox messages handed to the broker',
+    ['task', 'result'],  # sent, failed
+)
+
+# Presence (src.cache.presence_store)
+PRESENCE_FLUSHED = Counter(
+    'presence_flushed_total',
+    'Users presence changes written to the Database',
+    ['result'],  # flushed, failed
+)
+
+# Read replicas (src.utils.read_routing)
+DB_REPLICA_LAG = Gauge(
+    'db_replica_lag_seconds',
+    'Replication lag of the read replicas, -1 - unreachable',
+    ['replica'],
+    multiprocess_mode='livemax',  # Max of the alive workers (every worker checks the lag)
+)
+DB_READ_SESSIONS = Counter(
+    'db_read_sessions_total',
+    'Read-only sessions by target',
+    ['target'],  # replica, primary_sticky, primary_lag
+)
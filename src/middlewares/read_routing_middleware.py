@@ -0,0 +1,32 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.utils.read_routing import STICKY_COOKIE, start_read_your_writes
+
+
+class ReadYourWritesMiddleware:
+    '''
+    Pure ASGI middleware: a response of a committed write sets a short cookie, reads of the client go to the primary while it lives
+
+    Fields:
+        app (ASGIApp): Next ASGI application
+    '''
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        state = start_read_your_writes(scope)  # The context is shared with the endpoint (same task)
+
+        async def send_with_cookie(message: Message) -> None:
+            if message['type'] == 'http.response.start' and state.wrote:
+                cookie = f'{STICKY_COOKIE}=1; Max-Age={settings.DB_STICKY_SECONDS}; Path=/; HttpOnly; SameSite=lax'
+                MutableHeaders(scope=message).append('Set-Cookie', cookie)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
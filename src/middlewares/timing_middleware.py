@@ -0,0 +1,95 @@
+import asyncio
+import functools
+import logging
+import time
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.logger import logger, request_logger
+from src.metrics import DB_QUERIES_PER_REQUEST
+from src.utils.query_stats import start_query_stats
+from src.utils.request_timing import get_request_timing, start_request_timing
+from src.utils.responses import ModelResponse
+
+
+class TimingMiddleware:
+    '''
+    Pure ASGI middleware: request phases => 'Server-Timing' header and structured log, repeated statements => N+1 warning
+
+    Unlike '@app.middleware("http")' (BaseHTTPMiddleware) it doesn't wrap the response in another task / stream.
+
+    Fields:
+        app (ASGIApp): Next ASGI application
+    '''
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timing = start_request_timing(scope)  # The context is shared with the endpoint (same task)
+        query_stats = start_query_stats()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                if timing.endpoint_end is not None:
+                    timing.add('serialization', time.perf_counter() - timing.endpoint_end) # Response model validation + rendering
+                MutableHeaders(scope=message).append('Server-Timing', timing.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            extra = {
+                'method': scope['method'],
+                'path': scope['path'],
+                'status_code': status_code,
+                'process_time': round(timing.total(), 4),
+                **{f'{phase}_time': round(seconds, 4) for phase, seconds in timing.phases.items()},
+                'query_count': query_stats.count,
+            }
+            level = logging.WARNING if status_code >= 500 else logging.INFO  # Successful requests are sampled
+            request_logger.log(level, 'Request execution time', extra=extra)  # log
+            
+            DB_QUERIES_PER_REQUEST.observe(query_stats.count)
+            for repeated in query_stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD):
+                logger.warning('Possible N+1 queries', extra={'method': scope['method'], 'path': scope['path'], **repeated})  # log
+
+
+class TimedRoute(APIRoute):
+    '''
+    Route which marks the endpoint return time, the rest of the request is response serialization
+
+    Endpoints decorated with 'skip_revalidation' return their model as 'ModelResponse' (no return value revalidation).
+    '''
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        if asyncio.iscoroutinefunction(endpoint):
+            endpoint = self._mark_endpoint_end(endpoint, getattr(endpoint, 'skip_revalidation', False))
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _mark_endpoint_end(endpoint: Callable[..., Any], skip_revalidation: bool) -> Callable[..., Any]:
+        @functools.wraps(endpoint)  # FastAPI reads the signature of the original endpoint
+        async def wrapper(*args, **kwargs) -> Any:
+            try:
+                result = await endpoint(*args, **kwargs)
+            finally:
+                timing = get_request_timing()
+                if timing is not None:
+                    timing.endpoint_end = time.perf_counter()
+            if skip_revalidation and isinstance(result, BaseModel):
+                return ModelResponse.from_endpoint(result, kwargs)  # Serialized here => still the 'serialization' phase
+            return result
+        return wrapper
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class OutboxMessage(Base): # Outbox Table, Celery tasks committed with the data they belong to
+    __tablename__ = 'outbox'
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    task: Mapped[str] = mapped_column(nullable=False) # Celery task name, the task takes a list of payloads (batch)
+    payload: Mapped[Any] = mapped_column(JSONB, nullable=False) # One item of the batch (JSON)
+    created_at: Mapped[datetime] = mapped_column(server_default=text("timezone('utc', now())"))
+    available_at: Mapped[datetime] = mapped_column(server_default=text("timezone('utc', now())")) # Next relay attempt (backoff after broker errors)
+    attempts: Mapped[int] = mapped_column(server_default=text('0'), nullable=False) # Failed relay attempts
+    
+    __table_args__ = (
+        Index('ix_outbox_available_at_id', 'available_at', 'id'), # Relay: 'available_at <= now() ORDER BY id'
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, text
+from sqlalchemy import ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -14,7 +14,15 @@ class Project(Base):
     created_at: Mapped[datetime] = mapped_column(server_default=text("timezone('utc', now())")) # Time when the Project was created
     owner_id: Mapped[int] = mapped_column(ForeignKey('user.id', ondelete='CASCADE')) # User id, who created the project
     
-    owner: Mapped['User'] = relationship(back_populates='projects', lazy='selectin') # Many2One
-    project_tasks: Mapped[list['Task']] = relationship(back_populates='project', lazy='selectin') # One2Many
+    owner: Mapped['User'] = relationship(back_populates='projects', lazy='raise') # Many2One
+    project_tasks: Mapped[list['Task']] = relationship(back_populates='project', lazy='raise') # One2Many
     
     repr_cols_num = 2
+    
+    def cache_keys(self) -> tuple[str, ...]:
+        return (f'project:{self.owner_id}:{self.name}', f'user:{self.owner_id}') # Project and owner profile ('projects'), 'username:' keys are added by the router service
+    
+    __table_args__ = (
+        UniqueConstraint('owner_id', 'name', name='uq_project_owner_id_name'), # Project name is unique per owner, 'owner_id = ? AND name = ?'
+        Index('ix_project_name', 'name'), # 'name = ?'
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import ForeignKey, text
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -19,6 +19,15 @@ class Task(Base):
     deadline: Mapped[datetime] = mapped_column(nullable=True) # datetim | None
     
     
-    project: Mapped['Project'] = relationship(back_populates='project_tasks', lazy='selectin') # Many2One
-    customer: Mapped['User'] = relationship(back_populates='assigned_user_tasks', lazy='selectin', foreign_keys='Task.customer_id') # Many2One
-    performer: Mapped['User'] = relationship(back_populates='user_tasks', lazy='selectin', foreign_keys='Task.performer_id') # Many2One
+    project: Mapped['Project'] = relationship(back_populates='project_tasks', lazy='raise') # Many2One
+    customer: Mapped['User'] = relationship(back_populates='assigned_user_tasks', lazy='raise', foreign_keys='Task.customer_id') # Many2One
+    performer: Mapped['User'] = relationship(back_populates='user_tasks', lazy='raise', foreign_keys='Task.performer_id') # Many2One
+    
+    def cache_keys(self) -> tuple[str, ...]:
+        return (f'user:{self.performer_id}',) # Performer profile ('user_tasks'), Project / owner / username keys are added by the router service
+    
+    __table_args__ = (
+        Index('ix_task_project_id_name', 'project_id', 'name', 'id'), # Project Tasks by name (keyset pagination)
+        Index('ix_task_customer_id_name', 'customer_id', 'name'), # 'User.assigned_user_tasks' order
+        Index('ix_task_performer_id_name', 'performer_id', 'name'), # 'User.user_tasks' order
+    )
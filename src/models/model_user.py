@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import TIMESTAMP, ForeignKey
+from sqlalchemy import TIMESTAMP, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -16,10 +16,24 @@ class User(Base): # User Table
     registred_at: Mapped[str] = mapped_column(TIMESTAMP, default=datetime.utcnow) # Time when User was registred
     role_id: Mapped[int] = mapped_column(ForeignKey('role.id'), default=1) # By default User has Role 'user'
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False) # If user is active at the site => is_active = True, else is_active = False
+    last_seen_at: Mapped[datetime | None] = mapped_column(TIMESTAMP, nullable=True) # Last login / logout / request (flushed from the presence store)
     
-    projects: Mapped[list['Project']] = relationship(back_populates='owner', order_by='asc(Project.name)', lazy='selectin') # One2Many
-    assigned_user_tasks: Mapped[list['Task']] = relationship(back_populates='customer', order_by='asc(Task.name)', lazy='selectin', primaryjoin='User.id == Task.customer_id') # One2Many
-    user_tasks: Mapped[list['Task']] = relationship(back_populates='performer', order_by='asc(Task.name)', lazy='selectin', primaryjoin='User.id == Task.performer_id') # One2Many
+    projects: Mapped[list['Project']] = relationship(back_populates='owner', order_by='asc(Project.name)', lazy='raise') # One2Many
+    assigned_user_tasks: Mapped[list['Task']] = relationship(back_populates='customer', order_by='asc(Task.name)', lazy='raise', primaryjoin='User.id == Task.customer_id') # One2Many
+    user_tasks: Mapped[list['Task']] = relationship(back_populates='performer', order_by='asc(Task.name)', lazy='raise', primaryjoin='User.id == Task.performer_id') # One2Many
     
     repr_cols_num = 4
     repr_cols = ('role_id', 'is_active', 'projects')
+    
+    def cache_keys(self) -> tuple[str, ...]:
+        return (f'user:{self.id}', f'username:{self.username}', f'principal:{self.email}')
+    
+    __table_args__ = (
+        Index('uq_user_email', 'email', unique=True), # 'email = ?' (login, get_current_user)
+        Index('uq_user_username', 'username', unique=True), # 'username = ?' (public profile)
+    )
+
+
+# Case-insensitive uniqueness ('Test@example.com' and 'test@example.com' are the same User)
+Index('uq_user_email_lower', func.lower(User.email), unique=True)
+Index('uq_user_username_lower', func.lower(User.username), unique=True)
@@ -1,18 +1,65 @@
-import functools
+import time
 
 from redis.asyncio import Redis
-from redis.exceptions import RedisError
+from redis.asyncio.client import Pipeline
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, RedisError, TimeoutError
 
 from src.config import settings
 from src.dependencies.redis_service import redis_hash_type_service, redis_string_type_service
 from src.logger import logger
-from src.schemas.base_schema import BaseSchema
+from src.metrics import REDIS_COMMAND_DURATION
+from src.utils.redis_pool import InstrumentedConnectionPool
+from src.utils.request_timing import timed
+
+
+class TimedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True) -> list:
+        start = time.perf_counter()
+        with timed('redis'):
+            try:
+                return await super().execute(raise_on_error)
+            finally:
+                REDIS_COMMAND_DURATION.labels('PIPELINE').observe(time.perf_counter() - start)
+
+
+class TimedRedis(Redis):
+    '''
+    Redis client which adds command time to the 'redis' request phase and to the command histogram
+    '''
+    
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        with timed('redis'):
+            try:
+                return await super().execute_command(*args, **options)
+            finally:
+                REDIS_COMMAND_DURATION.labels(str(args[0]).upper()).observe(time.perf_counter() - start)
+    
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> TimedPipeline:
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
 
 
 class RedisServer:
     def __init__(self, host: str | int, port: int, username=None, password=None, db=0):
         try:
-            self.connection = Redis(host=host, port=port, username=username, password=password, db=db)  # Connect to Database
+            self.pool = InstrumentedConnectionPool(
+                host=host,
+                port=port,
+                username=username,
+                password=password,
+                db=db,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,  # Wait for a free connection, then ConnectionError
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                socket_keepalive=settings.REDIS_SOCKET_KEEPALIVE,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                retry=Retry(ExponentialBackoff(cap=settings.REDIS_RETRY_BACKOFF_CAP, base=settings.REDIS_RETRY_BACKOFF_BASE), settings.REDIS_RETRY_ATTEMPTS),
+                retry_on_error=[ConnectionError, TimeoutError],
+            )
+            self.connection = TimedRedis(connection_pool=self.pool)  # Connect to Database
             self.redis_hash_type_service = redis_hash_type_service(self.connection)
             self.redis_string_type_service = redis_string_type_service(self.connection)
         except RedisError as e:
@@ -24,37 +71,19 @@ class RedisServer:
             logger.critical(msg=msg, extra=extra, exc_info=True)
             raise RedisError
     
-    # TODO!!!
-    def cache(self, func):
-        @functools.wraps(func)
-        async def wrapper(*args, **kwargs):
-            response = await func(*args, **kwargs)
-            
-            # TODO!!!
-            if isinstance(response, BaseSchema):
-                dict_response = response.model_dump()
-                for key, value in dict_response.items():
-                    if isinstance(value, bool):
-                        dict_response[key] = str(value)
-                
-                dict_response.pop('user_tasks')
-                dict_response.pop('projects')
-                            
-                if await self.redis_hash_type_service.get_many(dict_response['username'], dict_response.keys()) is not None:
-                    await self.redis_hash_type_service.create_many(dict_response['username'], **dict_response)
-                
-                info = await self.redis_hash_type_service.get_many(dict_response['username'], dict_response.keys())
-                
-                # TODO!!!
-                index = 0
-                for key in dict_response.keys():
-                    dict_response[key] = info[index].decode('utf-8')
-                    index += 1
-                dict_response['projects'] = response.model_dump()['projects']
-                dict_response['user_tasks'] = response.model_dump()['user_tasks']
-                return dict_response
-                    
-        return wrapper
+    def reset(self) -> None:
+        """ Drop pool connections without closing them (a new event loop can't use connections of the previous one) """
+        self.pool.reset()
+    
+    async def close(self) -> None:
+        await self.connection.close()
+        await self.pool.disconnect()
         
 
-app_redis = RedisServer(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
\ No newline at end of file
+app_redis = RedisServer(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    username=settings.REDIS_USER or None,  # ACL user, None - default user
+    password=(settings.REDIS_USER_PASSWORD if settings.REDIS_USER else settings.REDIS_PASSWORD) or None,
+    db=0,
+)
@@ -1,16 +1,19 @@
-from src.utils.repository import RedisRepository
+from src.utils.repository import RedisBatch, RedisRepository
 
 
 class RedisHashTypeService:
     def __init__(self, redis_repo: RedisRepository):
         self.redis_repo: RedisRepository = redis_repo
         
-    async def create_one(self, name: str, key: str, value: str | int) -> dict:
-        result = await self.redis_repo.create_one(name, key, value)
+    async def create_one(self, name: str, key: str, value: str | int, ex: int | None = None) -> dict:
+        result = await self.redis_repo.create_one(name, key, value, ex=ex)
         return result
     
-    async def create_many(self, name: str, **data) -> dict:
-        result = await self.redis_repo.create_many(name, **data)
+    def batch(self, transaction: bool = False) -> RedisBatch:
+        return self.redis_repo.batch(transaction)
+    
+    async def create_many(self, name: str, ex: int | None = None, **data) -> dict:
+        result = await self.redis_repo.create_many(name, ex=ex, **data)
         return result
     
     async def get_one(self, name: str, key: str) -> dict:
@@ -1,20 +1,23 @@
-from src.utils.repository import RedisRepository
+from src.utils.repository import RedisBatch, RedisRepository
 
 
 class RedisStringTypeService:
     def __init__(self, redis_repo: RedisRepository):
         self.redis_repo: RedisRepository = redis_repo
         
-    async def create_one(self, name: str, value: str | int) -> dict:
-        result = await self.redis_repo.create_one(name, value)
+    async def create_one(self, name: str, value: str | int | bytes, ex: int | None = None, nx: bool = False) -> dict:
+        result = await self.redis_repo.create_one(name, value, ex=ex, nx=nx)
         return result
     
-    async def create_many(self, **data) -> dict:
-        result = await self.redis_repo.create_many(**data)
+    def batch(self, transaction: bool = False) -> RedisBatch:
+        return self.redis_repo.batch(transaction)
+    
+    async def create_many(self, ex: int | None = None, **data) -> dict:
+        result = await self.redis_repo.create_many(ex=ex, **data)
         return result
     
-    async def get_one(self, name: str) -> str:
-        result = await self.redis_repo.get_one(name)
+    async def get_one(self, name: str, decode: bool = True) -> str | bytes | None:
+        result = await self.redis_repo.get_one(name, decode=decode)
         return result
     
     async def get_many(self, *data) -> dict:
@@ -25,8 +28,12 @@ class RedisStringTypeService:
         result = await self.redis_repo.update_one(name, value)
         return result
     
-    async def delete_one(self, name: str) -> dict:
-        result = await self.redis_repo.delete_one(name)
+    async def delete_one(self, *names: str) -> dict:
+        result = await self.redis_repo.delete_one(*names)
+        return result
+    
+    async def delete_one_if_equal(self, name: str, value: str | bytes) -> dict:
+        result = await self.redis_repo.delete_one_if_equal(name, value)
         return result
     
     async def delete_all(self) -> dict:
@@ -3,6 +3,11 @@ from src.schemas.project_schemas import ProjectCreate, ProjectUpdate
 from src.utils.repository import SQLAlchemyRepository
 
 
+PROJECT_CONFLICTS = { # Unique constraint => ConflictError message
+    'uq_project_owner_id_name': 'Project name is already taken',
+}
+
+
 class ProjectService:
     def __init__(self, project_repo: SQLAlchemyRepository):
         self.project_repo: SQLAlchemyRepository = project_repo
@@ -10,15 +15,27 @@ class ProjectService:
     async def create_project(self, project: ProjectCreate, user_id: int) -> dict:
         project_dict = project.model_dump() # Converting Pydantic model (ProjectCreate) to dict
         project_dict.update({'owner_id': user_id})
-        result = await self.project_repo.create_one(project_dict)
+        result = await self.project_repo.create_one(project_dict, conflicts=PROJECT_CONFLICTS)
+        return result
+    
+    async def get_project_by_id(self, project_id: int, loader_profile: str | None = None) -> Project:
+        result = await self.project_repo.get_one(loader_profile=loader_profile, id=project_id)
         return result
     
-    async def get_project_by_id(self, project_id: int) -> Project:
-        result = await self.project_repo.get_one(id=project_id)
+    async def get_user_project_by_name(self, project_name: str, owner_id: int, loader_profile: str | None = None) -> Project:
+        result = await self.project_repo.get_one(loader_profile=loader_profile, owner_id=owner_id, name=project_name)
+        return result
+    
+    async def get_user_project_id(self, project_name: str, owner_id: int) -> int | None:
+        result = await self.project_repo.get_columns('id', owner_id=owner_id, name=project_name)
+        return result.id if result else None
+    
+    async def user_project_exists(self, project_name: str, owner_id: int) -> bool:
+        result = await self.project_repo.exists(owner_id=owner_id, name=project_name)
         return result
     
-    async def get_project_by_name(self, project_name: str) -> Project:
-        result = await self.project_repo.get_one(name=project_name)
+    async def get_user_projects(self, owner_id: int, limit: int, after: tuple | None = None) -> list[Project]:
+        result = await self.project_repo.get_many(order_by=('name', 'id'), after=after, limit=limit, owner_id=owner_id)
         return result
     
     async def update_project(self, new_project: ProjectUpdate, project_id: int) -> Project:
@@ -29,8 +46,8 @@ class ProjectService:
         result = await self.project_repo.delete_one(id=project_id)
         return result
     
-    async def delete_one_project_by_name(self, project_name: str) -> dict:
-        result = await self.project_repo.delete_one(name=project_name)
+    async def delete_user_project_by_name(self, project_name: str, owner_id: int) -> dict:
+        result = await self.project_repo.delete_one(owner_id=owner_id, name=project_name)
         return result
     
     async def delete_all_projects(self) -> dict:
@@ -1,3 +1,5 @@
+from datetime import date, timedelta
+
 from src.models.model_task import Task
 from src.schemas.task_schemas import TaskCreate, TaskUpdate
 from src.utils.repository import SQLAlchemyRepository
@@ -7,6 +9,9 @@ class TaskService:
     def __init__(self, task_repo: SQLAlchemyRepository):
         self.task_repo: SQLAlchemyRepository = task_repo
         
+    def mark_dirty(self, *keys: str) -> None:
+        self.task_repo.mark_dirty(*keys)
+        
     async def create_task(self, task: TaskCreate, project_id: int, customer_id: int) -> dict:
         task_dict = task.model_dump() # Converting Pydantic model (TaskCreate) to dict
         task_dict.update({'project_id': project_id})
@@ -14,10 +19,37 @@ class TaskService:
         result = await self.task_repo.create_one(task_dict)
         return result
     
+    async def create_tasks(self, tasks: list[TaskCreate], project_id: int, customer_id: int) -> list[int]:
+        tasks_list = [task.model_dump() | {'project_id': project_id, 'customer_id': customer_id} for task in tasks] # Converting Pydantic models (TaskCreate) to dicts
+        result = await self.task_repo.create_many(tasks_list)
+        return result
+    
     async def get_task(self, task_id: int) -> Task:
         result = await self.task_repo.get_one(id=task_id)
         return result
     
+    async def get_project_tasks(
+        self,
+        project_id: int,
+        limit: int,
+        after: tuple | None = None,
+        deadline_from: date | None = None,
+        deadline_to: date | None = None,
+        performer_id: int | None = None
+    ) -> list[Task]:
+        where = []
+        if deadline_from is not None:
+            where.append(Task.deadline >= deadline_from)
+        if deadline_to is not None:
+            where.append(Task.deadline < deadline_to + timedelta(days=1)) # 'deadline' is datetime => the whole 'deadline_to' day
+        
+        filter = {'project_id': project_id}
+        if performer_id is not None:
+            filter['performer_id'] = performer_id
+            
+        result = await self.task_repo.get_many(*where, order_by=('name', 'id'), after=after, limit=limit, **filter)
+        return result
+    
     async def update_task(self, new_task: TaskUpdate, task_id: int) -> Task:
         result = await self.task_repo.update_one(new_data=new_task, id=task_id)
         return result
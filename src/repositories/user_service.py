@@ -1,33 +1,60 @@
+from typing import Any
+
 from src.models.model_user import User
 from src.schemas.user_schemas import UserCreate, UserUpdate
 from src.utils.repository import SQLAlchemyRepository
 
 
+USER_CONFLICTS = { # Unique index => ConflictError message (case-insensitive indexes cover the exact ones)
+    'uq_user_email_lower': 'User already exists',
+    'uq_user_username_lower': 'Username is already taken',
+}
+
+
 class UserService:
     def __init__(self, user_repo: SQLAlchemyRepository):
         self.user_repo: SQLAlchemyRepository = user_repo
         
     async def create_user(self, user: UserCreate) -> dict:
         user_dict = user.model_dump() # Converting Pydantic model (UserCreate) to dict
-        result = await self.user_repo.create_one(user_dict)
+        result = await self.user_repo.create_one(user_dict, conflicts=USER_CONFLICTS)
         return result
     
-    async def get_user_by_email(self, user_email: str) -> User:
-        result = await self.user_repo.get_one(email=user_email)
+    async def get_user_by_email(self, user_email: str, loader_profile: str | None = None) -> User:
+        result = await self.user_repo.get_one(loader_profile=loader_profile, email=user_email)
         return result
     
-    async def get_user_by_id(self, user_id: int) -> User:
-        result = await self.user_repo.get_one(id=user_id)
+    async def get_user_by_id(self, user_id: int, loader_profile: str | None = None) -> User:
+        result = await self.user_repo.get_one(loader_profile=loader_profile, id=user_id)
         return result
     
-    async def get_user_by_name(self, user_name: str) -> User:
-        result = await self.user_repo.get_one(username=user_name)
+    async def get_user_by_name(self, user_name: str, loader_profile: str | None = None) -> User:
+        result = await self.user_repo.get_one(loader_profile=loader_profile, username=user_name)
         return result
     
-    async def update_user(self, new_user: UserUpdate, user_email: str) -> User:
-        result = await self.user_repo.update_one(new_data=new_user, email=user_email)
+    async def get_usernames(self, user_ids: set[int]) -> dict[int, str]:
+        result = await self.user_repo.get_many(User.id.in_(user_ids))
+        return {user.id: user.username for user in result}
+    
+    async def get_project_performers(self, project_id: int) -> dict[int, str]:
+        result = await self.user_repo.get_many(User.user_tasks.any(project_id=project_id)) # WHERE EXISTS (Task of the Project)
+        return {user.id: user.username for user in result}
+    
+    def mark_dirty(self, *keys: str) -> None:
+        self.user_repo.mark_dirty(*keys)
+    
+    def add_outbox(self, task: str, payload: Any) -> None:
+        self.user_repo.add_outbox(task, payload)
+    
+    async def update_user(self, new_user: UserUpdate, user_email: str, loader_profile: str | None = None) -> User:
+        self.user_repo.mark_dirty(f'principal:{user_email}') # Old token subject, new values are marked by the repository
+        result = await self.user_repo.update_one(new_data=new_user, loader_profile=loader_profile, email=user_email)
         return result
     
+    async def set_user_active(self, user: User, is_active: bool) -> None:
+        self.user_repo.mark_dirty(*user.cache_keys()) # Principal and profiles show 'is_active'
+        await self.user_repo.update_fields({'is_active': is_active}, id=user.id) # One column, no RETURNING
+    
     async def delete_one_user(self, user_email: str) -> dict:
         result = await self.user_repo.delete_one(email=user_email)
         return result
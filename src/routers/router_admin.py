@@ -0,0 +1,33 @@
+import asyncio
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from src.dependencies.user_manager import UserManager
+from src.middlewares.timing_middleware import TimedRoute
+from src.models.model_user import User
+from src.utils.slow_queries import slow_query_log
+
+router = APIRouter(
+    prefix='/admin',
+    tags=['Admin'],
+    route_class=TimedRoute,
+)
+
+
+@router.get('/slow_queries') # HTTP GET
+async def get_slow_queries(
+    admin_data: Annotated[User, Depends(UserManager.get_current_admin)],
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100
+) -> list[dict]:
+    """
+    Latest slow repository calls of all workers (statements fingerprints, parameter shapes, sampled EXPLAIN plans)
+
+    Args:
+        admin_data (User): Administrator data (SQLAlchemy model)
+        limit (int): Max amount of entries
+
+    Returns:
+        list[dict]: Slow repository calls, newest first
+    """
+    return await asyncio.to_thread(slow_query_log.read, limit) # File IO outside of the event loop
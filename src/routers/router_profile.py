@@ -3,15 +3,21 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, Response, Request
 
 from src.dependencies.user_manager import UserManager
-from src.dependencies.router_service import get_profile_config
+from src.middlewares.timing_middleware import TimedRoute
+from src.dependencies.router_service import get_profile_config, get_profile_read_config
 from src.models.model_user import User
 from src.schemas.user_schemas import UserAuth, UserCreate, UserRead, UserUpdate
 from src.services.profile_config import ProfileConfig
-from src.redis_config import app_redis
+from src.cache.key_builders import attr_key
+from src.cache.response_cache import response_cache
+from src.config import settings
+from src.schemas.charset import WORD_CHARSET
+from src.utils.responses import skip_revalidation
 
 router = APIRouter(
     prefix='/profile',
     tags=['Profile'],
+    route_class=TimedRoute,
 )
 
 
@@ -56,6 +62,7 @@ async def authenticate_user(
 
 
 @router.patch('/update_profile') # HTTP PATCH
+@skip_revalidation
 async def update_user(
     response: Response,
     user_data_update: UserUpdate,
@@ -77,10 +84,11 @@ async def update_user(
 
 
 @router.get('/me') # HTTP GET
-@app_redis.cache
+@skip_revalidation
+@response_cache.cached(namespace='profile_me', key_builder=attr_key('user', 'user_data.id'), ttl=settings.CACHE_TTL_PROFILE_ME)
 async def get_me(
-    user_data: Annotated[User, Depends(UserManager.get_current_user)],
-    profile_config: Annotated[ProfileConfig, Depends(get_profile_config)]
+    user_data: Annotated[User, Depends(UserManager.get_current_user_read)],
+    profile_config: Annotated[ProfileConfig, Depends(get_profile_read_config)]
 ) -> UserRead:
     """
     Show current User profile
@@ -95,9 +103,11 @@ async def get_me(
 
 
 @router.get('/@{username}') # HTTP GET
+@skip_revalidation
+@response_cache.cached(namespace='public_profile', key_builder=attr_key('username', 'username'), ttl=settings.CACHE_TTL_PUBLIC_PROFILE)
 async def get_user(
-    username: str,
-    profile_config: Annotated[ProfileConfig, Depends(get_profile_config)]
+    username: Annotated[str, WORD_CHARSET],
+    profile_config: Annotated[ProfileConfig, Depends(get_profile_read_config)]
 ) -> UserRead:
     """
     Show another User profile
@@ -1,20 +1,28 @@
+from datetime import date
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
+from src.cache.key_builders import attr_key
+from src.cache.response_cache import response_cache
+from src.config import settings
 from src.dependencies.user_manager import UserManager
-from src.dependencies.router_service import get_project_config
+from src.middlewares.timing_middleware import TimedRoute
+from src.dependencies.router_service import get_project_config, get_project_read_config
 from src.models.model_project import Project
 from src.models.model_user import User
 from src.repositories.project_service import ProjectService
 from src.repositories.task_service import TaskService
-from src.schemas.project_schemas import ProjectCreate, ProjectRead
-from src.schemas.task_schemas import TaskCreate, TaskRead
+from src.schemas.project_schemas import ProjectCreate, ProjectPage, ProjectRead
+from src.schemas.task_schemas import TaskBulkCreate, TaskCreate, TaskPage, TaskRead
 from src.services.project_config import ProjectConfig
+from src.schemas.charset import TEXT_CHARSET
+from src.utils.responses import skip_revalidation
 
 router = APIRouter(
     prefix='/projects',
-    tags=['Projects']
+    tags=['Projects'],
+    route_class=TimedRoute,
 )
 
 
@@ -37,11 +45,35 @@ async def create_project_app(
     return await project_config.create_new_project(project_create, user_data)
 
 
+@router.get('')
+@skip_revalidation
+async def get_user_projects(
+    user_data: Annotated[User, Depends(UserManager.get_current_user_read)],
+    project_config: Annotated[ProjectConfig, Depends(get_project_read_config)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 50,
+    cursor: str | None = None
+) -> ProjectPage:
+    """
+    Show current User Projects
+
+    Args:
+        user_data (User): User data (SQLAlchemy model)
+        limit (int): Page size
+        cursor (str | None): 'next_cursor' from the previous page
+
+    Returns:
+        ProjectPage: Page of Projects
+    """
+    return await project_config.get_user_projects(user_data, limit, cursor)
+
+
 @router.get('/{project_name}')
+@skip_revalidation
+@response_cache.cached(namespace='project', key_builder=attr_key('project', 'user_data.id', 'project_name'), ttl=settings.CACHE_TTL_PROJECT)
 async def get_some_project(
-    project_name: str,
-    user_data: Annotated[User, Depends(UserManager.get_current_user)],
-    project_config: Annotated[ProjectConfig, Depends(get_project_config)]
+    project_name: Annotated[str, TEXT_CHARSET],
+    user_data: Annotated[User, Depends(UserManager.get_current_user_read)],
+    project_config: Annotated[ProjectConfig, Depends(get_project_read_config)]
 ) -> ProjectRead:
     """
     Show another User Project
@@ -56,9 +88,39 @@ async def get_some_project(
     return await project_config.get_some_project_by_name(project_name, user_data)
 
 
+@router.get('/{project_name}/tasks')
+@skip_revalidation
+async def get_project_tasks(
+    project_name: Annotated[str, TEXT_CHARSET],
+    user_data: Annotated[User, Depends(UserManager.get_current_user_read)],
+    project_config: Annotated[ProjectConfig, Depends(get_project_read_config)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 50,
+    cursor: str | None = None,
+    deadline_from: date | None = None,
+    deadline_to: date | None = None,
+    performer_id: int | None = None
+) -> TaskPage:
+    """
+    Show Project Tasks
+
+    Args:
+        project_name (str): Project name
+        user_data (User): User data (SQLAlchemy model)
+        limit (int): Page size
+        cursor (str | None): 'next_cursor' from the previous page
+        deadline_from (date | None): Tasks with deadline >= deadline_from
+        deadline_to (date | None): Tasks with deadline on / before deadline_to
+        performer_id (int | None): Tasks of the performer
+
+    Returns:
+        TaskPage: Page of Tasks
+    """
+    return await project_config.get_project_tasks(project_name, user_data, limit, cursor, deadline_from, deadline_to, performer_id)
+
+
 @router.delete('/{project_name}/delete')
 async def delete_project(
-    project_name: str,
+    project_name: Annotated[str, TEXT_CHARSET],
     user_data: Annotated[User, Depends(UserManager.get_current_user)],
     project_config: Annotated[ProjectConfig, Depends(get_project_config)]
 ) -> dict:
@@ -77,7 +139,7 @@ async def delete_project(
 
 @router.post('/{project_name}/task/create')
 async def create_task_in_project(
-    project_name: str,
+    project_name: Annotated[str, TEXT_CHARSET],
     task_create: TaskCreate,
     user_data: Annotated[User, Depends(UserManager.get_current_user)],
     project_config: Annotated[ProjectConfig, Depends(get_project_config)]
@@ -94,3 +156,24 @@ async def create_task_in_project(
         dict[str, str | int]: Task has been created
     """
     return await project_config.create_task_in_current_project(project_name, task_create, user_data)
+
+
+@router.post('/{project_name}/task/create_many')
+async def create_tasks_in_project(
+    project_name: Annotated[str, TEXT_CHARSET],
+    task_bulk_create: TaskBulkCreate,
+    user_data: Annotated[User, Depends(UserManager.get_current_user)],
+    project_config: Annotated[ProjectConfig, Depends(get_project_config)]
+) -> dict:
+    """
+    Create many Tasks in Project
+
+    Args:
+        project_name (str): Project name
+        task_bulk_create (TaskBulkCreate): Tasks data Validation
+        user_data (User): User data (SQLAlcehmy model)
+
+    Returns:
+        dict[str, str | int | list]: Created Tasks ids and rejected Tasks errors
+    """
+    return await project_config.create_tasks_in_current_project(project_name, task_bulk_create, user_data)
\ No newline at end of file
@@ -1,4 +1,10 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, PlainSerializer
+
+
+DateField = Annotated[datetime, PlainSerializer(lambda value: value.date().isoformat(), return_type=str, when_used='json')]  # datetime => 'YYYY-MM-DD' in JSON responses
 
 
 class BaseSchema(BaseModel):
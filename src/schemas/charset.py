@@ -0,0 +1,39 @@
+import re
+from typing import Any
+
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import PydanticCustomError, core_schema
+
+
+CHARSET_ERROR = 'charset'  # Pydantic error type, mapped to 400 by the application
+CHARSET_MESSAGE = 'Use only alphabet letters and numbers'
+
+
+class Charset:
+    '''
+    Allowed characters of a string field, compiled once into a regex and checked while pydantic parses the field
+
+    name: Annotated[str, Field(min_length=3), WORD_CHARSET]
+
+    Fields:
+        extra (str): Allowed characters besides letters, digits and '_' (str.isalnum() or '_' == regex '\\w')
+    '''
+
+    def __init__(self, extra: str = ''):
+        self.extra = extra
+        self.pattern = re.compile(rf'[\w{re.escape(extra)}]*')
+
+    def is_valid(self, value: str) -> bool:
+        return self.pattern.fullmatch(value) is not None
+
+    def validate(self, value: str) -> str:
+        if not self.is_valid(value):
+            raise PydanticCustomError(CHARSET_ERROR, CHARSET_MESSAGE)
+        return value
+
+    def __get_pydantic_core_schema__(self, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_after_validator_function(self.validate, handler(source))
+
+
+WORD_CHARSET = Charset()  # Usernames, passwords
+TEXT_CHARSET = Charset(' ')  # Project and Task names (body and path parameters)
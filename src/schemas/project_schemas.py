@@ -1,8 +1,10 @@
 from datetime import datetime
+from typing import Annotated, Optional
 
 from pydantic import Field
 
-from src.schemas.base_schema import BaseSchema
+from src.schemas.base_schema import BaseSchema, DateField
+from src.schemas.charset import TEXT_CHARSET
 from src.schemas.task_schemas import TaskRead
 
 
@@ -11,17 +13,29 @@ class ProjectBase(BaseSchema): # Base Project Schema
 
 
 class ProjectCreate(ProjectBase):
-    name: str = Field(min_length=3, max_length=50)
+    name: Annotated[str, Field(min_length=3, max_length=50), TEXT_CHARSET]
 
     
 class ProjectRead(ProjectBase):
     id: int
     name: str
-    created_at: datetime
+    created_at: DateField # 'YYYY-MM-DD'
     owner_id: int
     project_tasks: list[TaskRead] # List of Project Tasks (Model TaskRead)
     
 
+class ProjectListItem(ProjectBase): # Project without Tasks
+    id: int
+    name: str
+    created_at: datetime
+    owner_id: int
+
+
+class ProjectPage(ProjectBase): # Page of User Projects
+    items: list[ProjectListItem]
+    next_cursor: Optional[str] # Cursor of the next page, None - last page
+    
+
 class ProjectUpdate(ProjectBase):
     name: str = Field(min_length=3, max_length=50)
     
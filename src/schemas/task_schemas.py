@@ -1,9 +1,10 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import Annotated, Optional
 
 from pydantic import Field
 
 from src.schemas.base_schema import BaseSchema
+from src.schemas.charset import TEXT_CHARSET
 
 
 class TaskBase(BaseSchema): # Base Task Schema
@@ -13,8 +14,16 @@ class TaskBase(BaseSchema): # Base Task Schema
 class TaskCreate(TaskBase):
     customer_id: int
     performer_id: int
-    name: str = Field(min_length=3, max_length=100)
+    name: Annotated[str, Field(min_length=3, max_length=100), TEXT_CHARSET]
     deadline: Optional[date] # If deadline exists - date, else None
+
+
+class TaskBulkItem(TaskCreate): # Charset is checked per Task by the service, rejected Tasks don't fail the whole batch
+    name: str = Field(min_length=3, max_length=100)
+    
+
+class TaskBulkCreate(TaskBase):
+    tasks: list[TaskBulkItem] = Field(min_length=1, max_length=1000) # Tasks are created in one transaction
     
 
 class TaskRead(TaskBase): # Show info about Task
@@ -27,6 +36,11 @@ class TaskRead(TaskBase): # Show info about Task
     deadline: Optional[date] # If deadline exists - date, else None
 
 
+class TaskPage(TaskBase): # Page of Project Tasks
+    items: list[TaskRead]
+    next_cursor: Optional[str] # Cursor of the next page, None - last page
+
+
 class TaskUpdate(TaskBase):
     name: str = Field(min_length=3, max_length=100)
     deadline: Optional[date] # If deadline exists - date, else None
@@ -1,9 +1,10 @@
 from datetime import datetime
-from typing import Union
+from typing import Annotated
 
 from pydantic import EmailStr, Field
 
-from src.schemas.base_schema import BaseSchema
+from src.schemas.base_schema import BaseSchema, DateField
+from src.schemas.charset import WORD_CHARSET
 from src.schemas.project_schemas import ProjectRead
 from src.schemas.task_schemas import TaskRead
 
@@ -13,8 +14,8 @@ class UserBase(BaseSchema): # Base User Schema
 
 
 class UserCreate(UserBase): # Register
-    username: str = Field(min_length=3, max_length=20) # Username (length >= 3 symbols) and (length <= 20 symbols)
-    password: str = Field(min_length=5) # Password (length >= 5 symbols)
+    username: Annotated[str, Field(min_length=3, max_length=20), WORD_CHARSET] # Username (length >= 3 symbols) and (length <= 20 symbols)
+    password: Annotated[str, Field(min_length=5), WORD_CHARSET] # Password (length >= 5 symbols)
     
 
 class UserAuth(UserBase): # Login
@@ -23,16 +24,24 @@ class UserAuth(UserBase): # Login
 
 class UserRead(UserBase): # Show info about User
     username: str
-    registred_at: Union[str, datetime]
+    registred_at: DateField # 'YYYY-MM-DD'
     role_id: int
     is_active: bool # If User is active on site => is_active = True, else False
     projects: list[ProjectRead] # List of User Project (Model ProjectRead)
     user_tasks: list[TaskRead] # List of User Tasks (Model TaskRead)
 
 
+class UserPrincipal(UserBase): # Authenticated User (cached 'get_current_user' result, without password and relationships)
+    id: int
+    username: str
+    registred_at: datetime
+    role_id: int
+    is_active: bool
+
+
 class UserUpdate(UserBase): # Update
-    username: str = Field(min_length=3, max_length=20) # Username (length >= 3 symbols) and (length <= 20 symbols)
-    password: str = Field(min_length=5) # Password (length >= 5 symbols)
+    username: Annotated[str, Field(min_length=3, max_length=20), WORD_CHARSET] # Username (length >= 3 symbols) and (length <= 20 symbols)
+    password: Annotated[str, Field(min_length=5), WORD_CHARSET] # Password (length >= 5 symbols)
     is_active: bool = Field(default=True)
 
 
@@ -1,23 +1,22 @@
-import re
-
 from fastapi import Response, status, Request
 from sqlalchemy.exc import SQLAlchemyError
 
+from src.cache.invalidation_bus import invalidation_bus
+from src.cache.presence_store import presence_store
 from src.redis_repositories.redis_string_type_service import RedisStringTypeService
 from src.redis_repositories.redis_hash_type_service import RedisHashTypeService
 from src.dependencies.model_service import UserService
-from src.dependencies.password_manager import PasswordManager
+from src.dependencies.password_manager import password_manager
 from src.dependencies.token_manager import TokenManager
-from src.dependencies.validation_manager import ValidationManager
 from src.exceptions.auth_error import AuthError
 from src.exceptions.conflict_error import ConflictError
-from src.exceptions.validation_error import ValidationError
 from src.exceptions.server_error import ServerError
 from src.exceptions.exist_error import ExistError
 from src.models.model_user import User
 from src.schemas.user_schemas import UserAuth, UserCreate, UserDelete, UserRead, UserUpdate
 from src.logger import logger
-from src.tasks.tasks import send_register_confirmation_email
+from src.tasks.tasks import send_register_confirmation_emails
+from src.utils.unit_of_work import UnitOfWork
 
 
 class ProfileConfig:
@@ -26,10 +25,25 @@ class ProfileConfig:
     
     Fields:
         user_service (UserService): User DAO service
+        uow (UnitOfWork): Transaction of the request (one COMMIT per method)
     '''
     
-    def __init__(self, user_service: UserService):
+    def __init__(self, user_service: UserService, uow: UnitOfWork):
         self.__user_service = user_service
+        self.__uow = uow
+    
+    async def _set_presence(self, user: User, is_active: bool) -> None:
+        if await presence_store.set_active(user.id, is_active): # Redis only, written to the Database in batches
+            await invalidation_bus.publish(*user.cache_keys()) # Cached profiles show 'is_active'
+        else:
+            await self.__user_service.set_user_active(user, is_active) # Redis is unavailable => UPDATE of the row
+    
+    @staticmethod
+    async def _with_presence(user: User, user_model: UserRead) -> UserRead:
+        is_active = await presence_store.is_active(user.id) # None => the Database value
+        if is_active is not None:
+            user_model.is_active = is_active
+        return user_model
         
     async def register_new_user(self, response: Response, user_data: UserCreate) -> dict:
         """
@@ -42,43 +56,22 @@ class ProfileConfig:
         Raises:
             ConflictError: status - 409, User is trying to create existing account
             ConflictError: status - 409, User is trying to take existing Username
-            ValidationError: status - 400, User input symbols are incorrect
+            UnavailableError: status - 503, Password hashing queue is full
             ServerError: status - 500, SERVER ERROR
 
         Returns:
             dict[str, str | int]: Successfull registration
         """
         try:
-            user_exist = await self.__user_service.get_user_by_email(user_data.email) # Check if User is already exist (User, None)
-            if user_exist:
-                msg = 'User already exists'
-                extra = user_data.model_dump()
-                logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                raise ConflictError('User already exists')
-            
-            username_exist = await self.__user_service.get_user_by_name(user_data.username) # Check if Username is already taken (User, None)
-            if username_exist:
-                msg = 'Username is already taken'
-                extra = {'username': username_exist}
-                logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                raise ConflictError('Username is already taken')
-            
-            user_dict = user_data.model_dump()  # Converting Pydantic model (UserCreate) to dict
-            if await ValidationManager.validate_schemas_data_user(user_dict):    # Check User symbols
-                user_dict['password'] = PasswordManager().get_password_hash(user_data.password) # Hashing password
-                await self.__user_service.create_user(UserCreate(**user_dict))
+            password_hash = await password_manager.get_password_hash(user_data.password) # Hashing password (symbols are checked by UserCreate), before the transaction begins
+            async with self.__uow: # One transaction: INSERT User + outbox message, one COMMIT
+                await self.__user_service.create_user(user_data.model_copy(update={'password': password_hash})) # INSERT ... ON CONFLICT DO NOTHING, taken email / Username => ConflictError
+                self.__user_service.add_outbox(send_register_confirmation_emails.name, user_data.email) # Confirmation email, committed with the User
                 
                 access_token = TokenManager.create_access_token({'sub': str(user_data.email)})  # Creating Token
                 response.set_cookie(key='user_access_token', value=access_token, httponly=True) # Only HTTP
                 logger.debug(msg='User created / cookies set')  # log
-                
-                send_register_confirmation_email.delay(user_dict['email'])  # Celery task (sending confirmation email)
                 return {'message': 'Successful registration', 'status_code': status.HTTP_200_OK}
-            else:
-                msg = 'Use only alphabet letters and numbers'
-                extra = {'user_data': user_dict}
-                logger.debug(msg=msg, extra=extra, exc_info=True)  # log
-                raise ValidationError('Use only alphabet letters and numbers')
         except SQLAlchemyError:
             raise ServerError()
 
@@ -95,6 +88,7 @@ class ProfileConfig:
             ConflictError: status - 409, A Logged-in User is trying to Login again
             AuthError: status - 401, Incorrect email or password
             AuthError: status - 401, Incorrect email or password
+            UnavailableError: status - 503, Password hashing queue is full
             ServerError: status - 500, SERVER ERROR
 
         Returns:
@@ -105,26 +99,25 @@ class ProfileConfig:
             if token:   # If token exists => User is already logged-in
                 msg = 'User is already login'
                 extra = {'token_info': token}
-                logger.warning(msg=msg, extra=extra, exc_info=True)  # log
+                logger.warning(msg=msg, extra=extra, exc_info=False)  # log
                 raise ConflictError('User is already login')
             
-            user = await self.__user_service.get_user_by_email(user_data.email) # Searching for a User in the Database
+            async with self.__uow: # SELECT, the connection is released before the password is verified
+                user = await self.__user_service.get_user_by_email(user_data.email) # Searching for a User in the Database
             if user is None:
                 msg = 'Incorrect email or password'
-                logger.warning(msg=msg, exc_info=True)
+                logger.warning(msg=msg, exc_info=False)
                 raise AuthError(msg='Incorrect email or password')
                 
             user_model_check = UserAuth.model_validate(user) # Converting SQLAlchemy model to Pydantic model (UserAuth)
-            if user_data.email != user_model_check.email or (not PasswordManager().verify_password(user_data.password, user_model_check.password)):
+            if user_data.email != user_model_check.email or (not await password_manager.verify_password(user_data.password, user_model_check.password)):
                 msg = 'Incorrect email or password'
                 extra = {'email': user_data.email, 'password': user_data.password}
-                logger.warning(msg=msg, extra=extra, exc_info=True)  # log
+                logger.warning(msg=msg, extra=extra, exc_info=False)  # log
                 raise AuthError(msg='Incorrect email or password')
-                
-            user_model_update = UserUpdate.model_validate(user) # Converting SQLAlchemy model to Pydantic model (UserUpdate)
-            if not user_model_update.is_active: # If User account isn't active, change field 'is_active'
-                user_model_update.is_active = True
-                await self.__user_service.update_user(user_model_update, user_model_update.email)
+            
+            async with self.__uow: # Presence is written to Redis, UPDATE only if Redis is unavailable
+                await self._set_presence(user, True) # 'is_active' and last seen time
             
             access_token = TokenManager.create_access_token({'sub': str(user_data.email)}) # Creating access token with User email
             response.set_cookie(key='user_access_token', value=access_token, httponly=True) # Creating cookie for User
@@ -142,19 +135,17 @@ class ProfileConfig:
             user_data_update (UserUpdate): User update data Validation
 
         Raises:
-            ValidationError: status - 400, User input symbols are incorrect
+            UnavailableError: status - 503, Password hashing queue is full
             ServerError: status - 500, SERVER ERROR
 
         Returns:
             UserRead: Updated User data
         """
         try:
-            new_user_dict = user_data_update.model_dump() # Converting Pydantic model (UserUpdate) to dict
-            
-            if await ValidationManager.validate_schemas_data_user(new_user_dict): # Check User symbols
-                new_user_dict['password'] = PasswordManager().get_password_hash(user_data_update.password) # Hashing password
-
-                new_user_data: User = await self.__user_service.update_user(UserUpdate(**new_user_dict), user_data.email) # Updating User
+            password_hash = await password_manager.get_password_hash(user_data_update.password) # Hashing password (symbols are checked by UserUpdate), before the transaction begins
+            async with self.__uow:
+                self.__user_service.mark_dirty(f'username:{user_data.username}') # Old Username (public profile cache)
+                new_user_data: User = await self.__user_service.update_user(user_data_update.model_copy(update={'password': password_hash}), user_data.email, loader_profile='profile-full') # Updating User
                 
                 #TODO May be create refresh_token?....
                 response.delete_cookie(key='user_access_token') # Updating cookie
@@ -162,14 +153,7 @@ class ProfileConfig:
                 response.set_cookie(key='user_access_token', value=access_token, httponly=True) # Updating cookie
                 
                 new_user_model = UserRead.model_validate(new_user_data) # Converting SQLAlchemy model to Pydantic model (UserRead)
-                date = re.search(r'\d{4}-\d{2}-\d{2}', f'{new_user_model.registred_at}') # Date type YYYY-MM-DD
-                new_user_model.registred_at = date[0]
-                return new_user_model
-            else:
-                msg = 'Use only alphabet letters and numbers'
-                extra = {'new_user_dict': new_user_dict}
-                logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                raise ValidationError('Use only alphabet letters and numbers')
+                return await self._with_presence(new_user_data, new_user_model)
         except SQLAlchemyError:
             raise ServerError()
     
@@ -181,16 +165,22 @@ class ProfileConfig:
             user_data (User): User data (SQLAlchemy Model)
 
         Raises:
+            ExistError: status - 404, User doesn't exist
             ServerError: status - 500, SERVER ERROR
 
         Returns:
             UserRead: User data
         """
         try:
-            user_model = UserRead.model_validate(user_data) # Converting SQLAlchemy model to Pydantic model (UserRead)
-            date = re.search(r'\d{4}-\d{2}-\d{2}', f'{user_model.registred_at}') # Date type YYYY-MM-DD
-            user_model.registred_at = date[0]
-            return user_model
+            async with self.__uow:
+                user_full = await self.__user_service.get_user_by_id(user_data.id, loader_profile='profile-full') # 'get_current_user' loads only the User row
+                if user_full is None:
+                    msg = "User doesn't exist"
+                    logger.warning(msg=msg)  # log
+                    raise ExistError(msg="User doesn't exist")
+                
+                user_model = UserRead.model_validate(user_full) # Converting SQLAlchemy model to Pydantic model (UserRead)
+                return await self._with_presence(user_full, user_model)
         except SQLAlchemyError:
             raise ServerError()
     
@@ -203,29 +193,21 @@ class ProfileConfig:
 
         Raises:
             ExistError: status - 404, User doesn't exist
-            ValidationError: status - 400, User input symbols are incorrect
             ServerError: status - 500, SERVER ERROR
 
         Returns:
             UserRead: User data
         """
         try:
-            if await ValidationManager.validate_path_data(username): # Check User symbols
-                another_user = await self.__user_service.get_user_by_name(username) # Searching for a User in the Database 
+            async with self.__uow:
+                another_user = await self.__user_service.get_user_by_name(username, loader_profile='profile-full') # Searching for a User in the Database (symbols are checked by the router)
                 if another_user is None:
                     msg = "User doesn't exist"
                     logger.warning(msg=msg)  # log
                     raise ExistError(msg="User doesn't exist")
                     
                 another_user_model = UserRead.model_validate(another_user) # Converting SQLAlchemy model to Pydantic model (UserRead)
-                date = re.search(r'\d{4}-\d{2}-\d{2}', f'{another_user.registred_at}') # Date type YYYY-MM-DD
-                another_user_model.registred_at = date[0]
-                return another_user_model
-            else:
-                msg = 'Use only alphabet letters and numbers'
-                extra = {'username': username}
-                logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                raise ValidationError(msg='Use only alphabet letters and numbers')
+                return await self._with_presence(another_user, another_user_model)
         except SQLAlchemyError:
             raise ServerError()
 
@@ -244,11 +226,10 @@ class ProfileConfig:
             dict[str, str | int]: User successfull logout 
         """
         try:
-            response.delete_cookie(key='user_access_token')
-            user_model_update = UserUpdate.model_validate(user_data) # Converting SQLAlchemy model to Pydantic model (UserUpdate)
-            user_model_update.is_active = False # Change model field to FALSE
-            await self.__user_service.update_user(user_model_update, user_model_update.email) # Update User data
-            return {'message': 'User successfully logged out', 'status_code': status.HTTP_200_OK}
+            async with self.__uow:
+                response.delete_cookie(key='user_access_token')
+                await self._set_presence(user_data, False) # The cached User is enough
+                return {'message': 'User successfully logged out', 'status_code': status.HTTP_200_OK}
         except SQLAlchemyError:
             raise ServerError()
 
@@ -267,9 +248,11 @@ class ProfileConfig:
             dict[str, str | int]: User account has been deleted
         """
         try:
-            response.delete_cookie(key='user_access_token')
-            user_model_data = UserDelete.model_validate(user_data) # Converting SQLAlchemy model to Pydantic model (UserDelete)
-            await self.__user_service.delete_one_user(user_model_data.email) # Delete User from Database
-            return {'message': 'User account has been deleted', 'status_code': status.HTTP_200_OK}
+            async with self.__uow:
+                response.delete_cookie(key='user_access_token')
+                user_model_data = UserDelete.model_validate(user_data) # Converting SQLAlchemy model to Pydantic model (UserDelete)
+                await self.__user_service.delete_one_user(user_model_data.email) # Delete User from Database
+                await presence_store.forget(user_data.id)
+                return {'message': 'User account has been deleted', 'status_code': status.HTTP_200_OK}
         except SQLAlchemyError:
             raise ServerError()
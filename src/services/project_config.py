@@ -1,20 +1,21 @@
-import re
+from datetime import date
 
 from fastapi import status
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.exceptions.conflict_error import ConflictError
 from src.exceptions.validation_error import ValidationError
 from src.exceptions.server_error import ServerError
 from src.exceptions.exist_error import ExistError
-from src.exceptions.access_error import AccessError
 from src.models.model_user import User
 from src.repositories.project_service import ProjectService
 from src.repositories.task_service import TaskService
-from src.schemas.project_schemas import ProjectCreate, ProjectRead
-from src.schemas.task_schemas import TaskCreate
+from src.repositories.user_service import UserService
+from src.schemas.project_schemas import ProjectCreate, ProjectListItem, ProjectPage, ProjectRead
+from src.schemas.charset import CHARSET_MESSAGE, TEXT_CHARSET
+from src.schemas.task_schemas import TaskBulkCreate, TaskCreate, TaskPage, TaskRead
 from src.logger import logger
-from src.dependencies.validation_manager import ValidationManager
+from src.dependencies.pagination_manager import PaginationManager
+from src.utils.unit_of_work import UnitOfWork
 
 
 class ProjectConfig:
@@ -24,11 +25,21 @@ class ProjectConfig:
     Fields:
         project_service (ProjectService): Project DAO service
         task_service (TaskService): Task DAO service
+        user_service (UserService): User DAO service
+        uow (UnitOfWork): Transaction of the request (one COMMIT per method)
     '''
     
-    def __init__(self, project_service: ProjectService, task_service: TaskService):
+    def __init__(self, project_service: ProjectService, task_service: TaskService, user_service: UserService, uow: UnitOfWork):
         self.__project_service = project_service
         self.__task_service = task_service
+        self.__user_service = user_service
+        self.__uow = uow
+    
+    def _mark_profiles(self, owner: User, performers: dict[int, str] | None = None) -> None:
+        keys = [f'user:{owner.id}', f'username:{owner.username}'] # Owner profiles ('projects[].project_tasks')
+        for performer_id, username in (performers or {}).items():
+            keys += [f'user:{performer_id}', f'username:{username}'] # Performer profiles ('user_tasks')
+        self.__user_service.mark_dirty(*keys)
     
     async def create_new_project(self, project_create: ProjectCreate, user_data: User) -> dict:
         """
@@ -40,30 +51,96 @@ class ProjectConfig:
 
         Raises:
             ConflictError: status - 409, Project name is already taken
-            ValidationError: status - 400, User input symbols are incorrect
             ServerError: status - 500, SERVER ERROR
 
         Returns:
             dict[str, str | int]: Project has been created 
         """
         try:
-            project_create_dict = project_create.model_dump() # Converting Pydantic model to dict
-            if await ValidationManager.validate_shemas_data_project(project_create_dict):    # Check User symbols
-                for project in user_data.projects:
-                    project_dict = ProjectRead.model_validate(project).model_dump() # 1. Converting SQLAlchemy model to Pydantic model (ProjectRead), 2. Converting Pydantic model to dict
-                    if project_dict['name'] == project_create.name:
-                        msg = 'Project name is already taken'
-                        extra = {'project_name': project_create.name}
-                        logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                        raise ConflictError(msg='Project name is already taken')
-                    
-                await self.__project_service.create_project(project_create, user_data.id)
+            async with self.__uow:
+                self._mark_profiles(user_data)
+                await self.__project_service.create_project(project_create, user_data.id) # INSERT ... ON CONFLICT DO NOTHING, taken Project name => ConflictError
                 return {'message': 'Project has been created', 'status_code': status.HTTP_200_OK}
-            else:
-                msg = 'Use only alphabet letters and numbers'
-                extra = {'project_create_dict': project_create_dict}
-                logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                raise ValidationError(msg='Use only alphabet letters and numbers')
+        except SQLAlchemyError:
+            raise ServerError()
+            
+    async def get_user_projects(self, user_data: User, limit: int, cursor: str | None = None) -> ProjectPage:
+        """
+        Show current User Projects (keyset pagination)
+
+        Args:
+            user_data (User): User data (SQLAlchemy model)
+            limit (int): Page size
+            cursor (str | None): Cursor of the page, None - first page
+
+        Raises:
+            ValidationError: status - 400, Cursor is invalid
+            ServerError: status - 500, SERVER ERROR
+
+        Returns:
+            ProjectPage: Page of Projects (ordered by name)
+        """
+        try:
+            async with self.__uow:
+                after = PaginationManager.decode_cursor(cursor, types=(str, int)) # (name, id)
+                projects = await self.__project_service.get_user_projects(user_data.id, limit + 1, after) # One extra row => there is the next page
+                
+                page = projects[:limit]
+                next_cursor = PaginationManager.encode_cursor((page[-1].name, page[-1].id)) if len(projects) > limit else None
+                return ProjectPage(items=[ProjectListItem.model_validate(project) for project in page], next_cursor=next_cursor)
+        except SQLAlchemyError:
+            raise ServerError()
+    
+    async def get_project_tasks(
+        self,
+        project_name: str,
+        user_data: User,
+        limit: int,
+        cursor: str | None = None,
+        deadline_from: date | None = None,
+        deadline_to: date | None = None,
+        performer_id: int | None = None
+    ) -> TaskPage:
+        """
+        Show Project Tasks (keyset pagination)
+
+        Args:
+            project_name (str): Project name
+            user_data (User): User data (SQLAlchemy model)
+            limit (int): Page size
+            cursor (str | None): Cursor of the page, None - first page
+            deadline_from (date | None): Tasks with deadline >= deadline_from
+            deadline_to (date | None): Tasks with deadline on / before deadline_to
+            performer_id (int | None): Tasks of the performer
+
+        Raises:
+            ExistError: status - 404, Project doesn't exist
+            ValidationError: status - 400, Cursor is invalid / Deadline range is incorrect
+            ServerError: status - 500, SERVER ERROR
+
+        Returns:
+            TaskPage: Page of Tasks (ordered by name)
+        """
+        try:
+            async with self.__uow:
+                if deadline_from and deadline_to and deadline_from > deadline_to:
+                    msg = 'Deadline range is incorrect'
+                    extra = {'deadline_from': deadline_from, 'deadline_to': deadline_to}
+                    logger.info(msg=msg, extra=extra)  # log
+                    raise ValidationError(msg='Deadline range is incorrect')
+                
+                after = PaginationManager.decode_cursor(cursor, types=(str, int)) # (name, id)
+                project_id = await self.__project_service.get_user_project_id(project_name, user_data.id) # Searching for the User Project id in the Database
+                if project_id is None:
+                    msg = "Project doesn't exist"
+                    logger.warning(msg=msg)  # log
+                    raise ExistError(msg="Project doesn't exist")
+                
+                tasks = await self.__task_service.get_project_tasks(project_id, limit + 1, after, deadline_from, deadline_to, performer_id) # One extra row => there is the next page
+                
+                page = tasks[:limit]
+                next_cursor = PaginationManager.encode_cursor((page[-1].name, page[-1].id)) if len(tasks) > limit else None
+                return TaskPage(items=[TaskRead.model_validate(task) for task in page], next_cursor=next_cursor)
         except SQLAlchemyError:
             raise ServerError()
             
@@ -77,36 +154,21 @@ class ProjectConfig:
 
         Raises:
             ExistError: status - 404, Project doesn't exist
-            AccessError: status - 405, Don't have enough access rights to see the project
-            ValidationError: status - 400, User input symbols are incorrect
             ServerError: status - 500, SERVER ERROR
 
         Returns:
             ProjectRead: Project data
         """
         try:
-            if ValidationManager.validate_path_data(project_name): # Check User symbold
-                project = await self.__project_service.get_project_by_name(project_name) # Searching for a Project in the Database
+            async with self.__uow:
+                project = await self.__project_service.get_user_project_by_name(project_name, user_data.id, loader_profile='project-with-tasks') # Searching for the User Project in the Database (WHERE owner_id = ? AND name = ?)
                 if project is None:
                     msg = "Project doesn't exist"
-                    logger.warning(msg=msg, exc_info=True)  # log
+                    logger.warning(msg=msg, exc_info=False)  # log
                     raise ExistError(msg="Project doesn't exist")
                     
-                if project.owner_id != user_data.id: # If User doesn't own the project
-                    msg = "You don't have enough access rights to see this project"
-                    extra = {'project_owner_id': project.owner_id, 'user_data_id': user_data.id}
-                    logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                    raise AccessError(msg="You don't have enough access rights to see this project")
-                    
                 project_model = ProjectRead.model_validate(project) # Converting SQLAlchemy model to Pydantic model (ProjectRead)
-                date = re.search(r'\d{4}-\d{2}-\d{2}', f'{project_model.created_at}') # Date type YYYY-MM-DD
-                project_model.created_at = date[0]
                 return project_model
-            else:
-                msg = 'Use only alphabet letters and numbers'
-                extra = {'project_name': project_name}
-                logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                raise ValidationError(msg='Use only alphabet letters and numbers')
         except SQLAlchemyError:
             raise ServerError()
     
@@ -120,34 +182,22 @@ class ProjectConfig:
 
         Raises:
             ExistError: status - 404, Project doesn't exist
-            AccessError: status - 405, Don't have enough access rights to see the project
-            ValidationError: status - 400, User input symbols are incorrect
             ServerError: status - 500, SERVER ERROR
 
         Returns:
             dict[str, str | int]: Project has been deleted
         """
         try:
-            if ValidationManager.validate_path_data(project_name): # Check User symbols
-                project = await self.__project_service.get_project_by_name(project_name) # Searching for a Project in the Database
-                if project is None:
+            async with self.__uow:
+                project_id = await self.__project_service.get_user_project_id(project_name, user_data.id) # Searching for the User Project id in the Database
+                if project_id is None:
                     msg = "Project doesn't exist"
-                    logger.warning(msg=msg, exc_info=True)  # log
+                    logger.warning(msg=msg, exc_info=False)  # log
                     raise ExistError(msg="Project doesn't exist")
-                
-                if project.owner_id != user_data.id: # If User doesn't own the project
-                    msg = "You don't have enough access rights to see this project"
-                    extra = {'project_owner_id': project.owner_id, 'user_data_id': user_data.id}
-                    logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                    raise AccessError(msg="You don't have enough access rights to see this project")
                     
-                await self.__project_service.delete_one_project_by_name(project_name)
+                self._mark_profiles(user_data, await self.__user_service.get_project_performers(project_id)) # Tasks are deleted by CASCADE
+                await self.__project_service.delete_one_project_by_id(project_id)
                 return {'message': 'Project has been deleted', 'status_code': status.HTTP_200_OK}
-            else:
-                msg = 'Use only alphabet letters and numbers'
-                extra = {'project_name': project_name}
-                logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                raise ValidationError(msg='Use only alphabet letters and numbers')
         except SQLAlchemyError:
             raise ServerError()
     
@@ -162,33 +212,76 @@ class ProjectConfig:
 
         Raises:
             ExistError: status - 404, Project doesn't exist
-            AccessError: status - 405, Don't have enough access rights to see the project
-            ValidationError: status - 400, User input symbols are incorrect
             ServerError: status - 500, SERVER ERROR
 
         Returns:
             dict[str, str | int]: Task has been created
         """
         try:
-            if ValidationManager.validate_path_data(project_name) and ValidationManager.validate_schemas_data_task(task_create.model_dump()): # Check User symbols
-                project = await self.__project_service.get_project_by_name(project_name) # Searching for a Project in the Database
-                if project is None:
+            async with self.__uow:
+                project_id = await self.__project_service.get_user_project_id(project_name, user_data.id) # Searching for the User Project id in the Database
+                if project_id is None:
                     msg = "Project doesn't exist"
-                    logger.warning(msg=msg, exc_info=True)  # log
+                    logger.warning(msg=msg, exc_info=False)  # log
                     raise ExistError(msg="Project doesn't exist")
                     
-                if project.owner_id != user_data.id: # If User doesn't own the project
-                    msg = "You don't have enough access rights to see this project"
-                    extra = {'project_owner_id': project.owner_id, 'user_data_id': user_data.id}
-                    logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                    raise AccessError(msg="You don't have enough access rights to see this project")
-                    
-                await self.__task_service.create_task(task_create, project.id, user_data.id)
+                self.__task_service.mark_dirty(f'project:{user_data.id}:{project_name}') # Project cache ('project_tasks')
+                self._mark_profiles(user_data, await self.__user_service.get_usernames({task_create.performer_id}))
+                await self.__task_service.create_task(task_create, project_id, user_data.id)
                 return {'message': 'Task has been created', 'status_code': status.HTTP_200_OK}
-            else:
-                msg = 'Use only alphabet letters and numbers'
-                extra = {'project_name': project_name}
-                logger.warning(msg=msg, extra=extra, exc_info=True)  # log
-                raise ValidationError(msg='Use only alphabet letters and numbers')
+        except SQLAlchemyError:
+            raise ServerError()
+    
+    async def create_tasks_in_current_project(self, project_name: str, task_bulk_create: TaskBulkCreate, user_data: User) -> dict:
+        """
+        Create many Tasks in Project (one multi-row INSERT in one transaction)
+
+        Args:
+            project_name (str): Project name
+            task_bulk_create (TaskBulkCreate): Tasks data Validation
+            user_data (User): User data (SQLAlcehmy model)
+
+        Raises:
+            ExistError: status - 404, Project doesn't exist
+            ServerError: status - 500, SERVER ERROR
+
+        Returns:
+            dict[str, str | int | list]: Created Tasks ids and errors of the rejected Tasks (by index in the request)
+        """
+        try:
+            async with self.__uow: # Project lookup, performers check and multi-row INSERT, one COMMIT
+                project_id = await self.__project_service.get_user_project_id(project_name, user_data.id) # Project is resolved once for the whole batch
+                if project_id is None:
+                    msg = "Project doesn't exist"
+                    logger.warning(msg=msg)  # log
+                    raise ExistError(msg="Project doesn't exist")
+                
+                tasks = task_bulk_create.tasks
+                errors = []
+                for index, task in enumerate(tasks): # Check User symbols (compiled charset of TaskCreate.name)
+                    if not TEXT_CHARSET.is_valid(task.name):
+                        errors.append({'index': index, 'message': CHARSET_MESSAGE})
+                
+                performers = await self.__user_service.get_usernames({task.performer_id for task in tasks}) # All performers are checked with one query
+                for index, task in enumerate(tasks):
+                    if task.performer_id not in performers:
+                        errors.append({'index': index, 'message': "Performer doesn't exist"})
+                
+                rejected = {error['index'] for error in errors}
+                valid_tasks = [task for index, task in enumerate(tasks) if index not in rejected]
+                self.__task_service.mark_dirty(f'project:{user_data.id}:{project_name}') # Project cache ('project_tasks')
+                self._mark_profiles(user_data, {task.performer_id: performers[task.performer_id] for task in valid_tasks})
+                task_ids = await self.__task_service.create_tasks(valid_tasks, project_id, user_data.id) if valid_tasks else []
+                
+                if errors:
+                    msg = 'Some Tasks have been rejected'
+                    extra = {'project_name': project_name, 'errors': errors}
+                    logger.info(msg=msg, extra=extra)  # log
+                return {
+                    'message': 'Tasks have been created',
+                    'task_ids': task_ids,
+                    'errors': sorted(errors, key=lambda error: error['index']),
+                    'status_code': status.HTTP_200_OK,
+                }
         except SQLAlchemyError:
             raise ServerError()
@@ -1,10 +1,34 @@
-from celery import Celery
+import time
+
+from celery import Celery, Task
+from celery.result import AsyncResult
 
 from src.config import settings
+from src.metrics import CELERY_ENQUEUE_DURATION, CELERY_ENQUEUE_ERRORS
 
 
 app_celery = Celery(
     'tasks', 
     broker=f'redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}',
     include=['src.tasks.tasks']
-)
\ No newline at end of file
+)
+
+
+def enqueue(task: Task, *args, **kwargs) -> AsyncResult:
+    """
+    Send task to the broker ('task.delay') with latency / error metrics
+
+    Args:
+        task (Task): Celery task
+
+    Returns:
+        AsyncResult: Task result
+    """
+    start = time.perf_counter()
+    try:
+        return task.delay(*args, **kwargs)
+    except Exception:
+        CELERY_ENQUEUE_ERRORS.labels(task.name).inc()
+        raise
+    finally:
+        CELERY_ENQUEUE_DURATION.labels(task.name).observe(time.perf_counter() - start)
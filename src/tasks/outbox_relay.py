@@ -0,0 +1,144 @@
+import asyncio
+from contextlib import suppress
+from datetime import timedelta
+from itertools import groupby
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import src.tasks.tasks  # noqa: F401 Registers the outbox tasks in 'app_celery.tasks'
+from src.config import settings
+from src.database import async_session_factory
+from src.logger import logger
+from src.metrics import OUTBOX_RELAYED
+from src.models.model_outbox import OutboxMessage
+from src.tasks.celery import app_celery, enqueue
+from src.utils.outbox import outbox_wakeup
+
+
+class OutboxRelay:
+    '''
+    Send committed outbox messages to the Celery broker (asyncio task of every worker process)
+
+    1. Claims a batch of available messages: FOR UPDATE SKIP LOCKED + 'available_at' moved by the lease, committed at once
+       (workers share the outbox without double sends, no transaction / row locks are held while the broker is called)
+    2. Groups them by task and sends each group in chunks: one Celery task gets a list of payloads
+    3. Deletes sent messages, failed ones are postponed with exponential backoff (second short transaction)
+
+    Broker publishes run in a thread, so broker latency / outages don't block requests.
+    Delivery is at least once: a message is sent again after the lease if the DELETE isn't committed.
+
+    Fields:
+        session_factory (async_sessionmaker[AsyncSession]): Session factory
+        batch_size (int): Messages claimed per transaction
+        chunk_size (int): Payloads per Celery task
+        poll_interval (float): Seconds between polls without COMMIT notifications (other workers, retries)
+        max_backoff (int): Max seconds between attempts of a failed message
+        lease (int): Seconds claimed messages are hidden from the other workers
+    '''
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int,
+        chunk_size: int,
+        poll_interval: float,
+        max_backoff: int,
+        lease: int
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.lease = lease
+
+    async def run(self) -> None:
+        while True:
+            try:
+                relayed = await self.relay_batch()
+            except SQLAlchemyError as e:
+                logger.error(msg='Outbox relay error', extra={'Error': e}, exc_info=False)  # log
+                relayed = 0
+            if relayed < self.batch_size:  # Outbox is drained => wait for a COMMIT or the next poll
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(outbox_wakeup.wait(), timeout=self.poll_interval)
+                outbox_wakeup.clear()
+
+    async def relay_batch(self) -> int:
+        """
+        Send one batch of available messages
+
+        Returns:
+            int: Amount of claimed messages (sent + postponed)
+        """
+        messages = await self._claim()
+        if not messages:
+            return 0
+
+        sent_ids, failed_ids = [], []
+        for task_name, group in groupby(sorted(messages, key=lambda message: (message.task, message.id)), key=lambda message: message.task):
+            group = list(group)
+            for start in range(0, len(group), self.chunk_size):
+                chunk = group[start:start + self.chunk_size]
+                ids = sent_ids if await self._send(task_name, chunk) else failed_ids
+                ids.extend(message.id for message in chunk)
+
+        async with self.session_factory() as session:
+            if sent_ids:
+                await session.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(sent_ids)))
+            if failed_ids:  # 2 ** attempts seconds instead of the lease
+                backoff = func.make_interval(0, 0, 0, 0, 0, 0, func.least(func.power(2, OutboxMessage.attempts), self.max_backoff))
+                await session.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id.in_(failed_ids))
+                    .values(available_at=func.timezone('utc', func.now()) + backoff)
+                )
+            await session.commit()
+        return len(messages)
+
+    async def _claim(self) -> list[OutboxMessage]:
+        async with self.session_factory() as session:
+            query = (
+                select(OutboxMessage)
+                .where(OutboxMessage.available_at <= func.timezone('utc', func.now()))
+                .order_by(OutboxMessage.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            messages = list((await session.execute(query)).scalars().all())
+            if not messages:
+                await session.rollback()
+                return []
+
+            for message in messages:  # Lease: the other workers skip the messages until they are sent or the worker dies
+                message.attempts += 1
+                message.available_at = func.timezone('utc', func.now()) + timedelta(seconds=self.lease)
+            await session.commit()
+            return messages
+
+    async def _send(self, task_name: str, chunk: list[OutboxMessage]) -> bool:
+        task = app_celery.tasks.get(task_name)
+        if task is None:
+            logger.critical(msg='Unknown outbox task', extra={'task': task_name})  # log
+            OUTBOX_RELAYED.labels(task_name, 'failed').inc(len(chunk))
+            return False
+        try:
+            await asyncio.to_thread(enqueue, task, [message.payload for message in chunk])  # Broker publish outside of the event loop
+        except Exception as e:
+            logger.error(msg='Outbox messages have not been sent to the broker', extra={'task': task_name, 'Error': e}, exc_info=False)  # log
+            OUTBOX_RELAYED.labels(task_name, 'failed').inc(len(chunk))
+            return False
+        OUTBOX_RELAYED.labels(task_name, 'sent').inc(len(chunk))
+        return True
+
+
+outbox_relay = OutboxRelay(
+    session_factory=async_session_factory,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    chunk_size=settings.SMTP_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL,
+    max_backoff=settings.OUTBOX_MAX_BACKOFF,
+    lease=settings.OUTBOX_LEASE,
+)
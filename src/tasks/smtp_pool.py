@@ -0,0 +1,174 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from smtplib import SMTP, SMTP_SSL, SMTPException, SMTPServerDisconnected
+from typing import Iterator
+
+from src.config import settings
+from src.logger import logger
+from src.metrics import SMTP_CONNECTIONS_OPENED
+
+
+class SMTPPool:
+    '''
+    Persistent SMTP connections of one worker process (TLS handshake and login once per connection, not per email)
+
+    A connection idle for more than 'max_idle' seconds is checked with NOOP before use, a broken one is replaced.
+    Connections are recycled after 'max_messages' emails (servers limit messages per session).
+
+    Fields:
+        host (str): SMTP host
+        port (int): SMTP port
+        user (str): SMTP login
+        password (str): SMTP password
+        use_ssl (bool): SMTP_SSL (implicit TLS), False - plain SMTP (local stand-in)
+        size (int): Max connections (worker threads)
+        timeout (float): Socket timeout in seconds
+        max_idle (float): Seconds idle before NOOP check
+        max_messages (int): Emails per connection before reconnect
+    '''
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        use_ssl: bool,
+        size: int,
+        timeout: float,
+        max_idle: float,
+        max_messages: int
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.size = size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_messages = max_messages
+        self.__idle: queue.LifoQueue[tuple[SMTP, float, int]] = queue.LifoQueue()  # (connection, last use, sent emails)
+        self.__slots = threading.BoundedSemaphore(size)
+        self.__pid = os.getpid()
+
+    def _reset_after_fork(self) -> None:
+        if self.__pid != os.getpid():  # Sockets of the parent process can't be shared
+            self.__idle = queue.LifoQueue()
+            self.__slots = threading.BoundedSemaphore(self.size)
+            self.__pid = os.getpid()
+
+    def _connect(self) -> SMTP:
+        smtp_class = SMTP_SSL if self.use_ssl else SMTP
+        connection = smtp_class(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.login(self.user, self.password)
+        except SMTPException:
+            self._close(connection)
+            raise
+        SMTP_CONNECTIONS_OPENED.inc()
+        return connection
+
+    @staticmethod
+    def _close(connection: SMTP) -> None:
+        try:
+            connection.quit()
+        except (SMTPException, OSError):
+            connection.close()
+
+    @staticmethod
+    def _is_alive(connection: SMTP) -> bool:
+        try:
+            return connection.noop()[0] == 250
+        except (SMTPException, OSError):
+            return False
+
+    def _checkout(self) -> tuple[SMTP, int]:
+        while True:
+            try:
+                connection, last_use, sent = self.__idle.get_nowait()
+            except queue.Empty:
+                return self._connect(), 0
+            if sent >= self.max_messages:
+                self._close(connection)
+            elif time.monotonic() - last_use <= self.max_idle or self._is_alive(connection):
+                return connection, sent
+            else:
+                connection.close()  # Dropped by the server
+
+    @contextmanager
+    def connection(self) -> Iterator['PooledSMTP']:
+        """
+        Take a connection for a batch of emails
+
+        Raises:
+            SMTPException: Connect / login / send errors (the broken connection isn't returned to the pool)
+            OSError: Network errors
+
+        Yields:
+            PooledSMTP: Connection wrapper, 'send_message' reconnects once if the server closed an idle connection
+        """
+        self._reset_after_fork()
+        with self.__slots:
+            connection, sent = self._checkout()
+            pooled = PooledSMTP(self, connection, sent)
+            try:
+                yield pooled
+            except BaseException:
+                pooled.connection.close()
+                raise
+            else:
+                self.__idle.put((pooled.connection, time.monotonic(), pooled.sent))
+
+    def close(self) -> None:
+        while True:
+            try:
+                connection, _, _ = self.__idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(connection)
+
+
+class PooledSMTP:
+    '''
+    Checked out connection
+
+    Fields:
+        pool (SMTPPool): Owner pool
+        connection (SMTP): SMTP connection
+        sent (int): Emails sent over the connection
+    '''
+
+    def __init__(self, pool: SMTPPool, connection: SMTP, sent: int):
+        self.pool = pool
+        self.connection = connection
+        self.sent = sent
+
+    def send_message(self, message) -> None:
+        if self.sent >= self.pool.max_messages:
+            self.pool._close(self.connection)
+            self.connection, self.sent = self.pool._connect(), 0
+        try:
+            self.connection.send_message(message)
+        except SMTPServerDisconnected:
+            logger.info(msg='SMTP connection closed by the server, reconnecting')  # log
+            self.connection.close()
+            self.connection, self.sent = self.pool._connect(), 0
+            self.connection.send_message(message)
+        self.sent += 1
+
+
+smtp_pool = SMTPPool(
+    host=settings.SMTP_HOST,
+    port=settings.SMTP_PORT,
+    user=settings.SMTP_USER,
+    password=settings.SMTP_PASS,
+    use_ssl=settings.SMTP_SSL,
+    size=settings.SMTP_POOL_SIZE,
+    timeout=settings.SMTP_TIMEOUT,
+    max_idle=settings.SMTP_MAX_IDLE,
+    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+)
@@ -1,27 +1,80 @@
+import random
+from smtplib import SMTPAuthenticationError, SMTPException, SMTPRecipientsRefused, SMTPResponseException
+
+from celery import Task
 from pydantic import EmailStr
-from smtplib import SMTP_SSL, SMTPAuthenticationError
 
 from src.tasks.celery import app_celery
 from src.tasks.email_templates import create_register_confirmation_template
+from src.tasks.smtp_pool import smtp_pool
 from src.config import settings
 from src.logger import logger
+from src.metrics import SMTP_EMAILS
 
 
-@app_celery.task
-def send_register_confirmation_email(email_to: EmailStr):
-    """ Send register email
+def _is_transient(error: Exception) -> bool:
+    # Network errors, dropped connections and 4xx replies are retried, 5xx replies aren't
+    if isinstance(error, SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (SMTPException, OSError)) and not isinstance(error, SMTPAuthenticationError)
+
+
+def _retry_countdown(retries: int) -> float:
+    backoff = min(settings.SMTP_RETRY_BACKOFF_BASE * 2 ** retries, settings.SMTP_RETRY_BACKOFF_CAP)
+    return backoff * random.uniform(0.5, 1.0)  # Jitter, retries of one outage don't come back together
+
+
+@app_celery.task(bind=True, max_retries=settings.SMTP_MAX_RETRIES)
+def send_register_confirmation_emails(self: Task, emails: list[EmailStr]) -> int:
+    """ Send register emails over one pooled SMTP connection (batch of the outbox relay)
+
+    Transient errors retry the not sent emails with exponential backoff.
 
     Args:
-        email_to (EmailStr): User email
+        emails (list[EmailStr]): Users emails
+
+    Returns:
+        int: Amount of sent emails
     """
-    msg = create_register_confirmation_template(email_to)  # Creating email message template
+    sent = 0
+    position = 0
     try:
-        with SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.login(settings.SMTP_USER, settings.SMTP_PASS)
-            server.send_message(msg)  # Sending message on User email
-            
-            logger.info(msg='The message has been sent', exc_info=True)  # log
+        with smtp_pool.connection() as connection:
+            for position, email_to in enumerate(emails):
+                msg = create_register_confirmation_template(email_to)  # Creating email message template
+                try:
+                    connection.send_message(msg)  # Sending message on User email
+                    sent += 1
+                except SMTPRecipientsRefused as e:
+                    logger.warning(msg='Email recipient refused', extra={'Error': e})  # log
+                    SMTP_EMAILS.labels('refused').inc()
+            position = len(emails)
     except SMTPAuthenticationError as e:
         msg = 'SMTPAuthenticationError'
         extra = {'Error': e}
         logger.critical(msg=msg, extra=extra)  # log
+        SMTP_EMAILS.labels('failed').inc(len(emails) - position)
+        raise
+    except (SMTPException, OSError) as e:
+        remaining = emails[position:]
+        if not _is_transient(e) or self.request.retries >= self.max_retries:
+            logger.error(msg='Emails have not been sent', extra={'Error': e, 'emails': len(remaining)})  # log
+            SMTP_EMAILS.labels('failed').inc(len(remaining))
+            raise
+        SMTP_EMAILS.labels('retried').inc(len(remaining))
+        raise self.retry(args=[remaining], exc=e, countdown=_retry_countdown(self.request.retries))
+    finally:
+        SMTP_EMAILS.labels('sent').inc(sent)
+
+    logger.info(msg='The messages have been sent', extra={'sent': sent})  # log
+    return sent
+
+
+@app_celery.task
+def send_register_confirmation_email(email_to: EmailStr):
+    """ Send register email (messages queued before the outbox, new ones are relayed as batches)
+
+    Args:
+        email_to (EmailStr): User email
+    """
+    send_register_confirmation_emails.delay([email_to])
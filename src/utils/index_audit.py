@@ -0,0 +1,123 @@
+import ast
+import importlib
+from pathlib import Path
+
+from sqlalchemy import Column, Table, UniqueConstraint
+
+from src.database import Base
+
+
+REPOSITORIES_DIR = Path(__file__).resolve().parent.parent / 'repositories'
+REPOSITORY_FILTER_METHODS = {'get_one', 'get_columns', 'exists', 'get_many', 'update_one', 'update_fields', 'delete_one'} # Repository methods with 'filter_by(**filter)'
+REPOSITORY_KEY_METHODS = {'update_many': 'id'} # Repository methods with 'WHERE {key} = ...': default 'key'
+NOT_FILTER_KWARGS = {'new_data', 'loader_profile', 'order_by', 'after', 'limit', 'values', 'returning'} # Repository method kwargs, which aren't columns
+
+
+def _leading_columns(table: Table) -> set[str]:
+    """
+    Take columns that can be searched by index (first column of every index / unique constraint / primary key)
+
+    Args:
+        table (Table): SQLAlchemy table
+
+    Returns:
+        set[str]: Column names
+    """
+    leading = {list(table.primary_key.columns)[0].name}
+    for index in table.indexes:
+        first = index.expressions[0]
+        if isinstance(first, Column): # Functional indexes (lower(email)) don't back 'email = ?'
+            leading.add(first.name)
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint) and constraint.columns:
+            leading.add(list(constraint.columns)[0].name)
+    return leading
+
+
+def _service_model(tree: ast.Module) -> type[Base] | None:
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith('src.models.'):
+            module = importlib.import_module(node.module)
+            return getattr(module, node.names[0].name)
+    return None
+
+
+def _function_filter_keys(function: ast.AST) -> dict[str, set[str]]:
+    """
+    Take keys of filter dicts built inside function ('filter = {...}' and 'filter[...] = ...')
+
+    Returns:
+        dict[str, set[str]]: {variable name: dict keys}
+    """
+    keys: dict[str, set[str]] = {}
+    for node in ast.walk(function):
+        if not isinstance(node, ast.Assign):
+            continue
+        for target in node.targets:
+            if isinstance(target, ast.Name) and isinstance(node.value, ast.Dict):
+                keys.setdefault(target.id, set()).update(key.value for key in node.value.keys if isinstance(key, ast.Constant))
+            elif isinstance(target, ast.Subscript) and isinstance(target.value, ast.Name) and isinstance(target.slice, ast.Constant):
+                keys.setdefault(target.value.id, set()).add(target.slice.value)
+    return keys
+
+
+def _call_filter_columns(call: ast.Call, filter_keys: dict[str, set[str]]) -> set[str]:
+    columns = set()
+    for keyword in call.keywords:
+        if keyword.arg is None and isinstance(keyword.value, ast.Name): # **filter
+            columns.update(filter_keys.get(keyword.value.id, set()))
+        elif keyword.arg and keyword.arg not in NOT_FILTER_KWARGS:
+            columns.add(keyword.arg)
+    return columns
+
+
+def _call_key_columns(call: ast.Call) -> set[str]:
+    for keyword in call.keywords:
+        if keyword.arg == 'key':
+            return {keyword.value.value} if isinstance(keyword.value, ast.Constant) else set() # Variable key can't be checked
+    return {REPOSITORY_KEY_METHODS[call.func.attr]}
+
+
+def find_unindexed_filters(repositories_dir: Path = REPOSITORIES_DIR) -> list[dict]:
+    """
+    Find repository calls in DAO services, which filter by columns without index
+
+    A call is backed if at least one of its filter columns is the first column of an index.
+
+    Args:
+        repositories_dir (Path): Directory with DAO services
+
+    Returns:
+        list[dict]: Unbacked calls ({'service', 'line', 'table', 'columns'})
+    """
+    unindexed = []
+    for path in sorted(repositories_dir.glob('*_service.py')):
+        tree = ast.parse(path.read_text(encoding='utf-8'))
+        model = _service_model(tree)
+        if model is None:
+            continue
+        leading = _leading_columns(model.__table__)
+
+        for function in ast.walk(tree):
+            if not isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            filter_keys = _function_filter_keys(function)
+
+            for node in ast.walk(function):
+                if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+                    continue
+                if node.func.attr in REPOSITORY_FILTER_METHODS:
+                    columns = _call_filter_columns(node, filter_keys)
+                elif node.func.attr in REPOSITORY_KEY_METHODS:
+                    columns = _call_key_columns(node)
+                else:
+                    continue
+
+                if columns and not (columns & leading):
+                    unindexed.append({
+                        'service': f'{path.name}:{function.name}',
+                        'line': node.lineno,
+                        'table': model.__tablename__,
+                        'columns': sorted(columns),
+                    })
+    return unindexed
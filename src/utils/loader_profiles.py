@@ -0,0 +1,49 @@
+from sqlalchemy.orm import selectinload
+
+from src.models.model_project import Project
+from src.models.model_task import Task
+from src.models.model_user import User
+
+
+'''
+Named relationship loading profiles
+
+All relationships are declared with lazy='raise', so nothing is loaded unless
+the query asks for it. Repositories take a profile name and apply its options.
+'''
+LOADER_PROFILES = {
+    'auth-minimal': (),  # Only the row itself (one indexed SELECT)
+    'user-with-projects': (
+        selectinload(User.projects),
+    ),
+    'profile-full': (  # Everything 'UserRead' needs
+        selectinload(User.projects).selectinload(Project.project_tasks),
+        selectinload(User.user_tasks),
+    ),
+    'project-with-tasks': (  # Everything 'ProjectRead' needs
+        selectinload(Project.project_tasks),
+    ),
+    'task-with-project': (
+        selectinload(Task.project),
+    ),
+}
+
+
+def get_loader_options(loader_profile: str | None) -> tuple:
+    """
+    Take loader options by profile name
+
+    Args:
+        loader_profile (str | None): Profile name, None - don't load relationships
+
+    Raises:
+        KeyError: Unknown profile name
+
+    Returns:
+        tuple: SQLAlchemy loader options
+    """
+    if loader_profile is None:
+        return ()
+    if loader_profile not in LOADER_PROFILES:
+        raise KeyError(f'Unknown loader profile: {loader_profile}')
+    return LOADER_PROFILES[loader_profile]
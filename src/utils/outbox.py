@@ -0,0 +1,37 @@
+import asyncio
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.model_outbox import OutboxMessage
+
+
+OUTBOX_PENDING = 'outbox_pending'  # session.info key, the current transaction wrote outbox messages
+outbox_wakeup = asyncio.Event()  # Set after COMMIT of outbox messages, the relay doesn't wait for the next poll
+
+
+def add_outbox(session: Session, task: str, payload: Any) -> None:
+    """
+    Add Celery task message to the current transaction (transactional outbox)
+
+    The message is written with the next flush and committed / rolled back with the data it belongs to.
+
+    Args:
+        session (Session): SQLAlchemy session (AsyncSession.info is the same dict)
+        task (str): Celery task name, the task takes a list of payloads
+        payload (Any): JSON payload
+    """
+    session.add(OutboxMessage(task=task, payload=payload))
+    session.info[OUTBOX_PENDING] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_relay(session: Session) -> None:
+    if session.info.pop(OUTBOX_PENDING, False):
+        outbox_wakeup.set()  # Same thread as the event loop (SQLAlchemy greenlet)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session: Session) -> None:
+    session.info.pop(OUTBOX_PENDING, None)
@@ -0,0 +1,138 @@
+import functools
+import hashlib
+import re
+from collections import Counter
+from contextvars import ContextVar
+
+from src.metrics import DB_QUERY_DURATION
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")  # 'string', 123, 1.5
+_PARAMETERS = re.compile(r'\$\d+|%\(\w+\)s|\?')  # asyncpg / psycopg / sqlite placeholders
+_IN_LISTS = re.compile(r'\bIN\s*\((?:\s*\?(?:::\w+)?\s*,?)+\)', re.IGNORECASE)  # IN (?, ?::INTEGER, ?) => IN (?)
+_ROW = r'\((?:[^()]|\([^()]*\))*\)'  # (?::VARCHAR, ?), (?::NUMERIC(10, 2))
+_VALUES_LISTS = re.compile(rf'\bVALUES\s*({_ROW})(?:\s*,\s*{_ROW})+', re.IGNORECASE)  # VALUES (?, ?), (?, ?) => VALUES (?, ?)
+_SPACES = re.compile(r'\s+')
+
+
+@functools.lru_cache(maxsize=1024)  # Statements come from the SQLAlchemy compiled cache => small set
+def fingerprint(statement: str) -> tuple[str, str, str]:
+    """
+    Normalize statement (literals and parameters => '?', IN lists / multi-row VALUES => one item)
+
+    Args:
+        statement (str): SQL statement
+
+    Returns:
+        tuple[str, str, str]: (operation, fingerprint - 12 hex chars, normalized statement)
+    """
+    normalized = _PARAMETERS.sub('?', statement)
+    normalized = _LITERALS.sub('?', normalized)
+    normalized = _IN_LISTS.sub('IN (?)', normalized)
+    normalized = _VALUES_LISTS.sub(r'VALUES \1', normalized)  # Bulk INSERT / UPDATE ... FROM (VALUES ...) of any batch size
+    normalized = _SPACES.sub(' ', normalized).strip()
+    operation = normalized.split(' ', 1)[0].upper()
+    return operation, hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12], normalized
+
+
+class QueryStats:
+    '''
+    Queries of one request / block
+
+    Fields:
+        count (int): Amount of queries
+        duration (float): Total DB time in seconds
+        fingerprints (Counter[str]): Fingerprint: amount of queries
+        statements (dict[str, str]): Fingerprint: normalized statement
+    '''
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Counter[str] = Counter()
+        self.statements: dict[str, str] = {}
+
+    def add(self, fingerprint: str, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint] += 1
+        self.statements.setdefault(fingerprint, statement)
+
+    def repeated(self, threshold: int) -> list[dict]:
+        """
+        Find statements repeated at least 'threshold' times (N+1 queries)
+
+        Args:
+            threshold (int): Min amount of the same statement
+
+        Returns:
+            list[dict]: {'fingerprint', 'count', 'statement'}
+        """
+        return [
+            {'fingerprint': fingerprint, 'count': count, 'statement': self.statements[fingerprint]}
+            for fingerprint, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar('query_stats', default=None)
+
+
+def start_query_stats() -> QueryStats:
+    stats = QueryStats()
+    _query_stats.set(stats)
+    return stats
+
+
+def get_query_stats() -> QueryStats | None:
+    return _query_stats.get()
+
+
+class QueryCounter:
+    '''
+    Query budget of a block (tests): counts every query executed while the block runs
+
+    with QueryCounter(budget=3) as counter:
+        response = await ac.get('/profile/me')
+
+    Fields:
+        budget (int | None): Max amount of queries, None - only count
+    '''
+
+    _active: set['QueryCounter'] = set()
+
+    def __init__(self, budget: int | None = None):
+        self.budget = budget
+        self.stats = QueryStats()
+
+    @property
+    def count(self) -> int:
+        return self.stats.count
+
+    def __enter__(self) -> 'QueryCounter':
+        QueryCounter._active.add(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        QueryCounter._active.discard(self)
+        if exc_type is None and self.budget is not None and self.count > self.budget:
+            statements = '\n'.join(f"{fingerprint} x{count}: {self.stats.statements[fingerprint]}" for fingerprint, count in self.stats.fingerprints.most_common())
+            raise AssertionError(f'{self.count} queries, budget is {self.budget}:\n{statements}')
+
+
+def record_query(statement: str, duration: float) -> None:
+    """
+    Record executed statement (SQLAlchemy 'after_cursor_execute')
+
+    Args:
+        statement (str): SQL statement
+        duration (float): Execution time in seconds
+    """
+    operation, query_fingerprint, normalized = fingerprint(statement)
+    DB_QUERY_DURATION.labels(operation, query_fingerprint).observe(duration)
+
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.add(query_fingerprint, normalized, duration)
+    for counter in QueryCounter._active:
+        counter.stats.add(query_fingerprint, normalized, duration)
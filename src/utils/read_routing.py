@@ -0,0 +1,155 @@
+import asyncio
+import itertools
+from contextvars import ContextVar
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session
+from starlette.requests import HTTPConnection
+from starlette.types import Scope
+
+from src.logger import logger
+from src.metrics import DB_READ_SESSIONS, DB_REPLICA_LAG
+
+
+STICKY_COOKIE = 'db_sticky'  # Set after a write, reads of the client go to the primary while it lives
+WROTE = 'wrote'  # session.info key, the current transaction wrote rows
+
+# Replication lag in seconds, 0 - replay caught up with the received WAL (an idle primary doesn't look lagging) / not a replica
+LAG_QUERY = text(
+    'SELECT CASE '
+    'WHEN NOT pg_is_in_recovery() THEN 0 '
+    'WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+)
+
+
+class ReadYourWrites:
+    '''
+    Read-your-writes state of one request
+
+    Fields:
+        sticky (bool): The client wrote recently (cookie), reads go to the primary
+        wrote (bool): The request committed a write => the response sets the cookie
+    '''
+
+    def __init__(self, sticky: bool):
+        self.sticky = sticky
+        self.wrote = False
+
+
+_read_your_writes: ContextVar[ReadYourWrites | None] = ContextVar('read_your_writes', default=None)
+
+
+def start_read_your_writes(scope: Scope) -> ReadYourWrites:
+    """
+    Start read-your-writes tracking of the request (middleware)
+
+    Args:
+        scope (Scope): ASGI scope of the request
+
+    Returns:
+        ReadYourWrites: Request state
+    """
+    state = ReadYourWrites(sticky=STICKY_COOKIE in HTTPConnection(scope).cookies)
+    _read_your_writes.set(state)
+    return state
+
+
+def is_sticky() -> bool:
+    state = _read_your_writes.get()
+    return state is not None and (state.sticky or state.wrote)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_statement(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE] = True
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flush(session: Session, flush_context) -> None:
+    session.info[WROTE] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _mark_written(session: Session) -> None:
+    if session.info.pop(WROTE, False):
+        state = _read_your_writes.get()  # SQLAlchemy greenlets share the request context
+        if state is not None:
+            state.wrote = True
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_written(session: Session) -> None:
+    session.info.pop(WROTE, None)
+
+
+class ReplicaRouter:
+    '''
+    Route read-only sessions to the read replicas
+
+    A read goes to the primary if the client wrote recently (read-your-writes) or no replica is within 'max_lag'.
+    Replicas are used round-robin, their lag is checked by a background task of every worker
+    (unknown lag / unreachable replica => skipped).
+
+    Fields:
+        engines (list[AsyncEngine]): Replica engines
+        max_lag (float): Max replication lag in seconds
+        check_interval (float): Seconds between lag checks
+    '''
+
+    def __init__(self, engines: list[AsyncEngine], max_lag: float, check_interval: float):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.__factories = [async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False) for engine in engines]
+        self.__lags: list[float | None] = [None] * len(engines)  # None - not checked yet / unreachable
+        self.__next = itertools.count()
+
+    async def check_lag(self) -> list[float | None]:
+        """
+        Check replication lag of every replica
+
+        Returns:
+            list[float | None]: Lag in seconds per replica, None - unreachable
+        """
+        for index, engine in enumerate(self.engines):
+            try:
+                async with engine.connect() as connection:
+                    lag = float((await connection.execute(LAG_QUERY)).scalar() or 0)
+            except (SQLAlchemyError, OSError) as e:
+                lag = None
+                logger.warning(msg='Replica lag check failed', extra={'replica': index, 'Error': e})  # log
+            self.__lags[index] = lag
+            DB_REPLICA_LAG.labels(str(index)).set(-1 if lag is None else lag)
+        return list(self.__lags)
+
+    def read_session_factory(self) -> async_sessionmaker[AsyncSession] | None:
+        """
+        Choose the session factory of a read-only dependency
+
+        Returns:
+            async_sessionmaker[AsyncSession] | None: Replica session factory, None - the primary
+        """
+        if not self.engines:
+            return None
+        if is_sticky():
+            DB_READ_SESSIONS.labels('primary_sticky').inc()
+            return None
+        healthy = [factory for factory, lag in zip(self.__factories, self.__lags) if lag is not None and lag <= self.max_lag]
+        if not healthy:
+            DB_READ_SESSIONS.labels('primary_lag').inc()
+            return None
+        DB_READ_SESSIONS.labels('replica').inc()
+        return healthy[next(self.__next) % len(healthy)]
+
+    async def run(self) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.check_interval)
+
+    async def close(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
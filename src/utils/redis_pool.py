@@ -0,0 +1,56 @@
+import asyncio
+
+from redis.asyncio import BlockingConnectionPool
+from redis.asyncio.connection import Connection
+from redis.exceptions import ConnectionError
+
+from src.metrics import REDIS_POOL_CONNECTIONS, REDIS_POOL_TIMEOUTS, REDIS_POOL_WAITERS
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    '''
+    Blocking Redis connection pool with Prometheus gauges
+
+    A request waits up to 'timeout' seconds for a free connection instead of opening a new one over 'max_connections'.
+    Gauges are updated on every checkout / release (in use, idle, waiters).
+    Connections are bound to the event loop which opened them, the pool is reset when it is used by another loop.
+    '''
+    
+    def reset(self) -> None:
+        self._in_use = 0
+        self._waiters = 0
+        self._loop: asyncio.AbstractEventLoop | None = None  # Event loop of the pool connections
+        super().reset()  # Called by __init__ and after fork
+        self._update_gauges()
+    
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not None and self._loop is not loop:
+            self.reset()  # Connections of another (closed) loop can be neither used nor closed, they are dropped
+        self._loop = loop
+    
+    def _update_gauges(self) -> None:
+        REDIS_POOL_CONNECTIONS.labels('in_use').set(self._in_use)
+        REDIS_POOL_CONNECTIONS.labels('idle').set(len(self._connections) - self._in_use)
+        REDIS_POOL_WAITERS.set(self._waiters)
+    
+    async def get_connection(self, command_name: str, *keys, **options) -> Connection:
+        self._check_loop()
+        self._waiters += 1
+        self._update_gauges()
+        try:
+            connection = await super().get_connection(command_name, *keys, **options)
+        except ConnectionError:
+            REDIS_POOL_TIMEOUTS.inc()  # No free connection in 'timeout' seconds / can't connect
+            raise
+        finally:
+            self._waiters -= 1
+        
+        self._in_use += 1
+        self._update_gauges()
+        return connection
+    
+    async def release(self, connection: Connection) -> None:
+        await super().release(connection)
+        self._in_use -= 1
+        self._update_gauges()
@@ -1,14 +1,24 @@
 from abc import ABC, abstractmethod
+from typing import Any, Callable
 
 from pydantic import BaseModel
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import Column, ColumnElement, Index, Row, and_, column, delete, exists, literal, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert # INSERT ... ON CONFLICT
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.visitors import replacement_traverse
 from sqlalchemy.ext.asyncio import AsyncSession
 from redis import Redis
+from redis.asyncio.client import Pipeline
 from redis.exceptions import RedisError
 
+from src.cache.invalidation_bus import ALL_KEYS, invalidation_bus, mark_dirty
 from src.database import Base
+from src.exceptions.conflict_error import ConflictError
 from src.logger import logger
+from src.utils.loader_profiles import get_loader_options
+from src.utils.outbox import add_outbox
+from src.utils.slow_queries import slow_query_log
+from src.utils.unit_of_work import in_unit_of_work
 
 
 class AbstractRepository(ABC):
@@ -16,10 +26,18 @@ class AbstractRepository(ABC):
     async def create_one(): # INSERT
         raise NotImplementedError
     
+    @abstractmethod
+    async def create_many(): # INSERT
+        raise NotImplementedError
+    
     @abstractmethod
     async def get_one(): # SELECT
         raise NotImplementedError
     
+    @abstractmethod
+    async def get_many(): # SELECT
+        raise NotImplementedError
+    
     @abstractmethod
     async def update_one(): # UPDATE
         raise NotImplementedError
@@ -39,76 +57,411 @@ class SQLAlchemyRepository(AbstractRepository):
     def __init__(self, session: AsyncSession):
         self.session = session # Take async session
     
-    async def create_one(self, data: dict) -> dict:
+    def mark_dirty(self, *keys: str) -> None:
+        mark_dirty(self.session, *keys) # Evicted from caches after COMMIT
+    
+    def add_outbox(self, task: str, payload: Any) -> None:
+        add_outbox(self.session, task, payload) # Committed with the next write, sent to the broker by the outbox relay
+    
+    async def _commit(self) -> None:
+        if in_unit_of_work(self.session): # The unit of work commits once for the whole service method
+            await self.session.flush()
+            return
+        await self.session.commit()
+        await invalidation_bus.publish_committed(self.session) # Evict dirty entities from all workers caches
+    
+    async def _rollback(self) -> None:
+        if not in_unit_of_work(self.session): # The unit of work rolls back the transaction / savepoint on the re-raised error
+            await self.session.rollback()
+    
+    def _unique_predicate(self, name: str, data: dict) -> ColumnElement[bool]:
+        table = self.model.__table__
+        for unique in (*table.indexes, *table.constraints):
+            if unique.name == name:
+                break
+        else:
+            raise ValueError(f'{table.name} has no unique index / constraint {name}')
+        
+        expressions = unique.expressions if isinstance(unique, Index) else list(unique.columns)
+        def bind_value(element):  # 'lower(user.email)' => 'lower(:email)', the same expression for the new row
+            if isinstance(element, Column) and element.table is table:
+                return literal(data.get(element.name), element.type)
+            return None
+        return and_(*(expression == replacement_traverse(expression, {}, bind_value) for expression in expressions))
+    
+    async def _conflict_message(self, data: dict, conflicts: dict[str, str]) -> str:
+        checks = [exists().where(self._unique_predicate(name, data)).label(name) for name in conflicts] # One SELECT EXISTS per constraint in one query
+        result = await self.session.execute(select(*checks))
+        for (name, message), conflict in zip(conflicts.items(), result.one()):
+            if conflict:
+                return message
+        return f'{self.model.to_string()} already exists' # Conflicting row was deleted meanwhile / constraint isn't mapped
+    
+    @slow_query_log.track
+    async def create_one(self, data: dict, conflicts: dict[str, str] | None = None) -> dict:
+        """
+        INSERT one row
+
+        Args:
+            data (dict): Row values
+            conflicts (dict[str, str] | None): Unique constraint / index name => ConflictError message,
+                the row is inserted with 'ON CONFLICT DO NOTHING' instead of checking the values before the INSERT
+
+        Raises:
+            ConflictError: status - 409, The row violates a unique constraint / index of 'conflicts'
+            SQLAlchemyError: Database error
+
+        Returns:
+            dict: Row has been created
+        """
         try:
-            stmt = insert(self.model).values(**data)
-            await self.session.execute(stmt)
-            await self.session.commit()
+            stmt = insert(self.model).values(**data).returning(self.model)
+            if conflicts:
+                stmt = stmt.on_conflict_do_nothing() # Concurrent INSERTs of the same values => one row, no IntegrityError
+            result = await self.session.execute(stmt)
+            row = result.scalar()
+            if row is None: # Skipped by ON CONFLICT, which constraint is found only on this path
+                message = await self._conflict_message(data, conflicts)
+                await self._rollback()
+                logger.warning(msg=message, extra={'table': self.model.__tablename__}, exc_info=False) # log
+                raise ConflictError(msg=message)
+            
+            self.mark_dirty(*row.cache_keys()) # Cached 404
+            await self._commit()
             return {'message': f'{self.model.to_string()} has been created'}
         except SQLAlchemyError as e:
-            await self.session.rollback()
+            await self._rollback()
+            logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
+            raise SQLAlchemyError
+        
+    @slow_query_log.track
+    async def create_many(self, data: list[dict]) -> list[int]:
+        try:
+            stmt = insert(self.model).values(data).returning(self.model) # One multi-row INSERT ... RETURNING
+            result = await self.session.execute(stmt)
+            rows = result.scalars().all()
+            for row in rows:
+                self.mark_dirty(*row.cache_keys())
+            res = [row.id for row in rows]
+            await self._commit()
+            return res
+        except SQLAlchemyError as e:
+            await self._rollback()
             logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
             raise SQLAlchemyError
         
-    async def get_one(self, **filter) -> Base:
+    @slow_query_log.track
+    async def get_one(self, loader_profile: str | None = None, **filter) -> Base:
         try:
-            query = select(self.model).filter_by(**filter)
+            query = select(self.model).filter_by(**filter).options(*get_loader_options(loader_profile)) # Relationships are loaded only by profile
             result = await self.session.execute(query)
             res = result.scalar()
             return res
         except SQLAlchemyError as e:
-            await self.session.rollback()
+            await self._rollback()
+            logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
+            raise SQLAlchemyError
+    
+    @slow_query_log.track
+    async def get_columns(self, *columns: str, **filter) -> Row | None:
+        try:
+            query = select(*[getattr(self.model, column) for column in columns]).filter_by(**filter).limit(1) # Only the needed columns, without entity and relationships
+            result = await self.session.execute(query)
+            res = result.first()
+            return res
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
+            raise SQLAlchemyError
+    
+    @slow_query_log.track
+    async def exists(self, **filter) -> bool:
+        try:
+            query = select(select(self.model.id).filter_by(**filter).exists()) # SELECT EXISTS (SELECT id ... WHERE ...)
+            result = await self.session.execute(query)
+            res = bool(result.scalar())
+            return res
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
+            raise SQLAlchemyError
+    
+    @slow_query_log.track
+    async def get_many(
+        self,
+        *where: ColumnElement[bool],
+        order_by: tuple[str, ...] = ('id',),
+        after: tuple | None = None,
+        limit: int | None = None,
+        loader_profile: str | None = None,
+        **filter
+    ) -> list[Base]:
+        try:
+            if 'id' not in order_by:
+                order_by = (*order_by, 'id') # Unique tail column => stable ordering
+            columns = [getattr(self.model, column) for column in order_by]
+            
+            query = select(self.model).filter_by(**filter).where(*where).order_by(*columns).options(*get_loader_options(loader_profile))
+            if after is not None: # Keyset pagination: (col1, col2, ...) > (last_value1, last_value2, ...)
+                query = query.where(tuple_(*columns) > tuple_(*after))
+            if limit is not None:
+                query = query.limit(limit)
+            result = await self.session.execute(query)
+            res = list(result.scalars().all())
+            return res
+        except SQLAlchemyError as e:
+            await self._rollback()
             logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
             raise SQLAlchemyError
     
-    async def update_one(self, new_data: BaseModel, **filter) -> Base:
+    @slow_query_log.track
+    async def update_one(self, new_data: BaseModel, loader_profile: str | None = None, **filter) -> Base:
         try:
             new_dict_data = new_data.model_dump(exclude_unset=True) # Converting Pydantic model to dict with excluding unset fields
             stmt = update(self.model).filter_by(**filter).values(new_dict_data).returning(self.model)
             result = await self.session.execute(stmt)
-            await self.session.commit()
             res = result.scalar()
+            if res is not None:
+                self.mark_dirty(*res.cache_keys()) # New values, old ones are marked by the caller
+            await self._commit()
+            
+            options = get_loader_options(loader_profile)
+            if res is not None and options: # Load relationships of the updated row by profile
+                query = select(self.model).filter_by(id=res.id).options(*options).execution_options(populate_existing=True)
+                result = await self.session.execute(query)
+                res = result.scalar()
             return res
         except SQLAlchemyError as e:
-            await self.session.rollback()
+            await self._rollback()
             logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
             raise SQLAlchemyError
     
+    @slow_query_log.track
+    async def update_fields(self, values: dict[str, Any], returning: tuple[str, ...] = (), **filter) -> Row | None:
+        """
+        UPDATE only the given columns, without loading the entity (cache keys are marked by the caller)
+
+        Args:
+            values (dict[str, Any]): Changed columns and their new values, {} - no UPDATE
+            returning (tuple[str, ...]): Columns of the updated row to return, () - nothing
+
+        Raises:
+            SQLAlchemyError: Database error
+
+        Returns:
+            Row | None: Projection of the first updated row, None - nothing returned / no row matched
+        """
+        if not values:
+            return None
+        try:
+            stmt = update(self.model).filter_by(**filter).values(values)
+            if returning:
+                stmt = stmt.returning(*[getattr(self.model, column) for column in returning]) # Only the needed columns, not the entity
+            result = await self.session.execute(stmt)
+            res = result.first() if returning else None
+            await self._commit()
+            return res
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
+            raise SQLAlchemyError
+    
+    @slow_query_log.track
+    async def update_many(self, rows: list[dict[str, Any]], key: str = 'id') -> int:
+        """
+        UPDATE many rows with their own values in one statement: UPDATE ... FROM (VALUES (...), (...)) WHERE key = new_values.key
+
+        Args:
+            rows (list[dict[str, Any]]): Rows with the same columns, 'key' column identifies the row
+            key (str): Key column
+
+        Raises:
+            SQLAlchemyError: Database error
+
+        Returns:
+            int: Amount of updated rows
+        """
+        if not rows:
+            return 0
+        try:
+            names = list(rows[0])
+            new_values = values(*[column(name, getattr(self.model, name).type) for name in names], name='new_values').data(
+                [tuple(row[name] for name in names) for row in rows]
+            )
+            stmt = (
+                update(self.model)
+                .where(getattr(self.model, key) == new_values.c[key])
+                .values({name: new_values.c[name] for name in names if name != key})
+                .execution_options(synchronize_session=False) # Rows aren't loaded in the session
+            )
+            result = await self.session.execute(stmt)
+            await self._commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
+            raise SQLAlchemyError
+    
+    @slow_query_log.track
     async def delete_one(self, **filter) -> dict:
         try:
-            stmt = delete(self.model).filter_by(**filter)
-            await self.session.execute(stmt)
-            await self.session.commit()
+            stmt = delete(self.model).filter_by(**filter).returning(self.model)
+            result = await self.session.execute(stmt)
+            for row in result.scalars().all():
+                self.mark_dirty(*row.cache_keys())
+            await self._commit()
             return {'message': f'{self.model.to_string()} has been deleted'}
         except SQLAlchemyError as e:
-            await self.session.rollback()
+            await self._rollback()
             logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
             raise SQLAlchemyError
     
+    @slow_query_log.track
     async def delete_all(self) -> dict:
         try:
             stmt = delete(self.model)
             await self.session.execute(stmt)
-            await self.session.commit()
+            self.mark_dirty(ALL_KEYS)
+            await self._commit()
             return {'message': f'All {self.model.to_string()}s have been deleted'}
         except SQLAlchemyError as e:
-            await self.session.rollback()
+            await self._rollback()
             logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
             raise SQLAlchemyError
         
 
+class RedisBatch:
+    '''
+    Redis commands queued and sent in one round trip (pipeline), optionally as one transaction (MULTI / EXEC)
+
+    Methods mirror RedisRepository, 'execute' returns one typed result per queued method call.
+
+    Fields:
+        pipeline (Pipeline): Redis pipeline
+        data_type (str): Repository data type ('string', 'hash')
+    '''
+    
+    def __init__(self, pipeline: Pipeline, data_type: str):
+        self.pipeline = pipeline
+        self.data_type = data_type
+        self.__parsers: list[tuple[int, Callable[[list], Any]]] = [] # (amount of Redis commands, raw replies => result) per method call
+    
+    async def __aenter__(self) -> 'RedisBatch':
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.pipeline.reset()
+    
+    def _queue(self, commands: int, parser: Callable[[list], Any]) -> 'RedisBatch':
+        self.__parsers.append((commands, parser))
+        return self
+    
+    @staticmethod
+    def _decode(value: bytes | None, decode: bool = True) -> str | bytes | None:
+        if value is None:
+            return None
+        return value.decode('utf-8') if decode else value
+    
+    def create_one(self, *data, ex: int | None = None, nx: bool = False) -> 'RedisBatch':
+        if self.data_type == 'string':  # SET name value [EX seconds] [NX]
+            self.pipeline.set(name=data[0], value=data[1], ex=ex, nx=nx)
+            return self._queue(1, lambda replies: bool(replies[0]))
+        elif self.data_type == 'hash':  # HSET name key value [+ EXPIRE name seconds]
+            self.pipeline.hset(name=data[0], key=data[1], value=data[2])
+            if ex:
+                self.pipeline.expire(name=data[0], time=ex)
+            return self._queue(2 if ex else 1, lambda replies: True)
+        raise TypeError
+    
+    def create_many(self, name: str | None = None, ex: int | None = None, **data) -> 'RedisBatch':
+        if self.data_type == 'string':
+            if ex:  # SET name1 value1 EX seconds, SET name2 value2 EX seconds... (MSET has no TTL)
+                for key, value in data.items():
+                    self.pipeline.set(name=key, value=value, ex=ex)
+                return self._queue(len(data), lambda replies: all(replies))
+            self.pipeline.mset(data)  # MSET name1 value1 name2 value2...
+            return self._queue(1, lambda replies: bool(replies[0]))
+        elif self.data_type == 'hash':  # HSET name key1 value1 key2 value2... [+ EXPIRE name seconds]
+            self.pipeline.hset(name=name, mapping=data)
+            if ex:
+                self.pipeline.expire(name=name, time=ex)
+            return self._queue(2 if ex else 1, lambda replies: True)
+        raise TypeError
+    
+    def get_one(self, *data, decode: bool = True) -> 'RedisBatch':
+        if self.data_type == 'string':  # GET name
+            self.pipeline.get(name=data[0])
+        elif self.data_type == 'hash':  # HGET name key
+            self.pipeline.hget(name=data[0], key=data[1])
+        else:
+            raise TypeError
+        return self._queue(1, lambda replies: self._decode(replies[0], decode))
+    
+    def get_many(self, *data, name: str | None = None, decode: bool = True) -> 'RedisBatch':
+        if self.data_type == 'string':  # MGET key1 key2 key3...
+            self.pipeline.mget(list(data))
+        elif self.data_type == 'hash':  # HMGET name key1 key2 key3...
+            self.pipeline.hmget(name, list(data))
+        else:
+            raise TypeError
+        return self._queue(1, lambda replies: [self._decode(value, decode) for value in replies[0]])
+    
+    def expire(self, name: str, ex: int) -> 'RedisBatch':
+        self.pipeline.expire(name=name, time=ex)  # EXPIRE name seconds
+        return self._queue(1, lambda replies: bool(replies[0]))
+    
+    def delete_one(self, *data) -> 'RedisBatch':
+        self.pipeline.delete(*data)  # DEL names
+        return self._queue(1, lambda replies: replies[0])
+    
+    def delete_one_if_equal(self, name: str, value: str | bytes) -> 'RedisBatch':
+        self.pipeline.eval(RedisRepository.DELETE_IF_EQUAL_SCRIPT, 1, name, value)  # GET + DEL atomically (locks)
+        return self._queue(1, lambda replies: bool(replies[0]))
+    
+    async def execute(self) -> list:
+        """
+        Send queued commands
+
+        Raises:
+            RedisError: Connection error / MULTI was discarded
+
+        Returns:
+            list: Results in order of method calls (bool, int, str | bytes | None, list)
+        """
+        try:
+            replies = await self.pipeline.execute()
+        except RedisError as e:
+            msg = 'REDIS CRITICAL ERROR'
+            extra = {'Error': e}
+            logger.critical(msg=msg, extra=extra, exc_info=False)  # log
+            raise e
+        finally:
+            parsers, self.__parsers = self.__parsers, []
+        
+        results = []
+        offset = 0
+        for commands, parser in parsers:
+            results.append(parser(replies[offset:offset + commands]))
+            offset += commands
+        return results
+
+
 class RedisRepository(AbstractRepository):
     data_type = None
+    DELETE_IF_EQUAL_SCRIPT = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) else return 0 end"
     
     def __init__(self, RedisConnection: Redis):
         self.redis = RedisConnection
         
-    async def create_one(self, *data) -> dict:
+    async def create_one(self, *data, ex: int | None = None, nx: bool = False) -> dict:
         try:
-            if self.data_type == 'string':  # SET name value
-                await self.redis.set(name=data[0], value=data[1])
+            if self.data_type == 'string':  # SET name value [EX seconds] [NX]
+                result = await self.redis.set(name=data[0], value=data[1], ex=ex, nx=nx)
+                return {'success': bool(result)}  # NX => False if the name already exists
             elif self.data_type == 'hash':  # HSET name key value
                 await self.redis.hset(name=data[0], key=data[1], value=data[2])
+                if ex:
+                    await self.redis.expire(name=data[0], time=ex)  # EXPIRE name seconds
             else:
                 raise TypeError
             
@@ -119,24 +472,25 @@ class RedisRepository(AbstractRepository):
             logger.critical(msg=msg, extra=extra, exc_info=False)  # log
             raise e
     
-    async def create_many(self, name: str | None = None, **data) -> dict:
-        try:
-            if self.data_type == 'string':
-                await self.redis.mset(data)  # MSET name1 value1 name2 value2...
-            elif self.data_type == 'hash':
-                await self.redis.hmset(name, data)  # HMSET name key1 value1 key2 value2...
-                logger.debug(msg='Successfully created')
-            else:
-                raise TypeError
+    def batch(self, transaction: bool = False) -> RedisBatch:
+        """
+        Queue commands to send them in one round trip
+
+        Args:
+            transaction (bool): Wrap commands in MULTI / EXEC
+
+        Returns:
+            RedisBatch: Commands queue (async context manager)
+        """
+        return RedisBatch(self.redis.pipeline(transaction=transaction), self.data_type)
+    
+    async def create_many(self, name: str | None = None, ex: int | None = None, **data) -> dict:
+        async with self.batch(transaction=bool(ex)) as batch:  # HSET + EXPIRE / SET EX... in one round trip
+            await batch.create_many(name, ex=ex, **data).execute()
             
-            return {'success': True}
-        except RedisError as e:
-            msg = 'REDIS CRITICAL ERROR'
-            extra = {'Error': e}
-            logger.critical(msg=msg, extra=extra, exc_info=False)  # log
-            raise e
+        return {'success': True}
     
-    async def get_one(self, *data) -> str | dict:
+    async def get_one(self, *data, decode: bool = True) -> str | bytes | None:
         try:
             if self.data_type == 'string':
                 result: bytes = await self.redis.get(name=data[0])  # GET name
@@ -146,7 +500,7 @@ class RedisRepository(AbstractRepository):
                 raise TypeError
             
             if result:
-                return result.decode('utf-8')
+                return result.decode('utf-8') if decode else result
             return None
         except RedisError as e:
             msg = 'REDIS CRITICAL ERROR'
@@ -191,7 +545,7 @@ class RedisRepository(AbstractRepository):
     
     async def delete_one(self, *data) -> dict:
         try:
-            await self.redis.delete(data)  # DEL names
+            await self.redis.delete(*data)  # DEL names
 
             return {'success': True}
         except RedisError as e:
@@ -200,6 +554,17 @@ class RedisRepository(AbstractRepository):
             logger.critical(msg=msg, extra=extra, exc_info=False)  # log
             raise e
     
+    async def delete_one_if_equal(self, name: str, value: str | bytes) -> dict:
+        try:
+            result = await self.redis.eval(self.DELETE_IF_EQUAL_SCRIPT, 1, name, value)  # GET + DEL atomically (locks)
+            
+            return {'success': bool(result)}
+        except RedisError as e:
+            msg = 'REDIS CRITICAL ERROR'
+            extra = {'Error': e}
+            logger.critical(msg=msg, extra=extra, exc_info=False)  # log
+            raise e
+    
     async def delete_all(self) -> dict:
         try:
             await self.redis.flushdb(asynchronous=True)  # DEL all keys in Database
@@ -0,0 +1,108 @@
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+from starlette.types import Scope
+
+
+class RequestTiming:
+    '''
+    Time spent by one request in each phase (auth, db, redis, bcrypt, serialization)
+
+    Phases may overlap: 'auth' includes its own 'db' / 'redis' time.
+
+    Fields:
+        start (float): Request start (perf_counter)
+        phases (dict[str, float]): Phase name: seconds
+        endpoint_end (float | None): Endpoint return time (perf_counter), the rest is response serialization
+        scope (Scope | None): ASGI scope of the request
+    '''
+
+    def __init__(self, scope: Scope | None = None):
+        self.start = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.endpoint_end: float | None = None
+        self.scope = scope
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def route(self) -> str | None:
+        """
+        Matched route template ('/projects/{project_name}'), the path if the request isn't routed yet
+
+        Returns:
+            str | None: 'GET /projects/{project_name}'
+        """
+        if self.scope is None:
+            return None
+        route = self.scope.get('route')  # Set by the router after matching
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+
+    def total(self) -> float:
+        return time.perf_counter() - self.start
+
+    def server_timing(self) -> str:
+        """
+        Build 'Server-Timing' header value
+
+        Returns:
+            str: 'db;dur=12.3, redis;dur=0.8, total;dur=20.1' (milliseconds)
+        """
+        metrics = [f'{phase};dur={seconds * 1000:.1f}' for phase, seconds in self.phases.items()]
+        metrics.append(f'total;dur={self.total() * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+_request_timing: ContextVar[RequestTiming | None] = ContextVar('request_timing', default=None)
+
+
+def start_request_timing(scope: Scope | None = None) -> RequestTiming:
+    timing = RequestTiming(scope)
+    _request_timing.set(timing)
+    return timing
+
+
+def get_request_timing() -> RequestTiming | None:
+    return _request_timing.get()
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Add block execution time to the current request phase (no-op outside of a request)
+
+    Args:
+        phase (str): Phase name
+    """
+    timing = _request_timing.get()
+    if timing is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(phase, time.perf_counter() - start)
+
+
+def timed_phase(phase: str) -> Callable:
+    """
+    Async function decorator, 'timed' for the whole call
+
+    Args:
+        phase (str): Phase name
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            with timed(phase):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,56 @@
+from typing import Any, Callable
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+class ModelResponse(Response):
+    '''
+    JSON response of a pydantic model serialized by pydantic-core in one pass
+
+    FastAPI returns it as is: no return value revalidation, no 'jsonable_encoder'.
+    '''
+
+    media_type = 'application/json'
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return ORJSONResponse(content).body
+
+    @classmethod
+    def from_endpoint(cls, model: BaseModel, endpoint_kwargs: dict[str, Any]) -> 'ModelResponse':
+        """
+        Build response of the endpoint result, with headers / cookies / status code set on the injected 'Response'
+
+        Args:
+            model (BaseModel): Endpoint result
+            endpoint_kwargs (dict[str, Any]): Endpoint arguments
+
+        Returns:
+            ModelResponse: Response
+        """
+        response = cls(model)
+        for value in endpoint_kwargs.values():
+            if isinstance(value, Response): # FastAPI sub-response ('response: Response' parameter)
+                response.raw_headers.extend(value.raw_headers)
+                if value.status_code:
+                    response.status_code = value.status_code
+        return response
+
+
+def skip_revalidation(endpoint: Callable) -> Callable:
+    """
+    Endpoint decorator: the returned model is trusted and serialized as is (TimedRoute)
+
+    The return annotation still documents the response in OpenAPI.
+
+    Args:
+        endpoint (Callable): Endpoint which returns a model of its return annotation
+
+    Returns:
+        Callable: The same endpoint
+    """
+    endpoint.skip_revalidation = True
+    return endpoint
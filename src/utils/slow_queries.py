@@ -0,0 +1,274 @@
+import asyncio
+import contextvars
+import functools
+import glob
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable
+
+import orjson
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import settings
+from src.logger import logger
+from src.metrics import DB_SLOW_CALLS
+from src.utils.query_stats import fingerprint
+from src.utils.request_timing import get_request_timing
+
+
+class SlowStatement:
+    '''
+    Statement executed by a repository call
+
+    Parameters are kept in memory only (EXPLAIN), the log gets their shapes.
+
+    Fields:
+        statement (str): SQL statement
+        parameters (Any): Bound parameters (DBAPI format)
+        duration (float): Execution time in seconds
+        engine (Engine): Engine which executed the statement
+        executemany (bool): Many parameter sets (no EXPLAIN)
+    '''
+
+    def __init__(self, statement: str, parameters: Any, duration: float, engine: Engine, executemany: bool):
+        self.statement = statement
+        self.parameters = parameters
+        self.duration = duration
+        self.engine = engine
+        self.executemany = executemany
+
+    @staticmethod
+    def _shape(value: Any) -> str:
+        if isinstance(value, (list, tuple)):
+            return f'{type(value).__name__}[{len(value)}]'
+        return type(value).__name__
+
+    def parameter_shapes(self) -> list[str] | dict[str, str]:
+        """
+        Bound parameters types, without values
+
+        Returns:
+            list[str] | dict[str, str]: ['int', 'str', 'list[3]'] (positional) or {'email': 'str'} (named), first row of executemany
+        """
+        parameters = self.parameters
+        if self.executemany and parameters:
+            parameters = parameters[0]
+        if isinstance(parameters, dict):
+            return {name: self._shape(value) for name, value in parameters.items()}
+        return [self._shape(value) for value in parameters or ()]
+
+    def to_dict(self) -> dict:
+        operation, query_fingerprint, normalized = fingerprint(self.statement)
+        return {
+            'fingerprint': query_fingerprint,
+            'operation': operation,
+            'statement': normalized,
+            'parameters': self.parameter_shapes(),
+            'rows': len(self.parameters) if self.executemany else 1,
+            'duration': round(self.duration, 4),
+        }
+
+
+class RepositoryCall:
+    '''
+    One SQLAlchemyRepository method call and its statements
+
+    Fields:
+        caller (str): Calling service method ('UserService.get_user_by_email')
+        method (str): Repository method ('get_one')
+        statements (list[SlowStatement]): Executed statements
+    '''
+
+    def __init__(self, caller: str, method: str):
+        self.caller = caller
+        self.method = method
+        self.statements: list[SlowStatement] = []
+
+
+_repository_call: contextvars.ContextVar[RepositoryCall | None] = contextvars.ContextVar('repository_call', default=None)
+
+
+def record_statement(statement: str, parameters: Any, duration: float, engine: Engine, executemany: bool) -> None:
+    """
+    Attach executed statement to the current repository call (SQLAlchemy 'after_cursor_execute')
+
+    Args:
+        statement (str): SQL statement
+        parameters (Any): Bound parameters
+        duration (float): Execution time in seconds
+        engine (Engine): Engine which executed the statement
+        executemany (bool): Many parameter sets
+    """
+    call = _repository_call.get()
+    if call is not None:
+        call.statements.append(SlowStatement(statement, parameters, duration, engine, executemany))
+
+
+class SlowQueryLog:
+    '''
+    Sampled log of slow repository calls with EXPLAIN plans
+
+    1. A SQLAlchemyRepository call longer than 'threshold' is logged: statements fingerprints, parameter shapes, service method, route
+    2. A 'sample_rate' fraction of them gets the plan of the slowest statement, captured in a background task:
+       SELECT - EXPLAIN (ANALYZE, BUFFERS), INSERT / UPDATE / DELETE - EXPLAIN only (ANALYZE would execute them again),
+       always in a rolled back transaction with 'statement_timeout'
+    3. Entries are JSON lines in rotating files, one file per worker process ('slow_queries-{pid}.jsonl')
+
+    Fields:
+        directory (str): Store directory (shared by the workers)
+        threshold (float): Min repository call duration in seconds
+        sample_rate (float): Fraction of slow calls explained, 0 - never
+        max_explains (int): Max concurrent EXPLAIN tasks per worker, the next slow calls are logged without a plan
+        explain_timeout (int): EXPLAIN statement_timeout in milliseconds
+        max_bytes (int): Max file size before rotation
+        backup_count (int): Rotated files kept per worker
+    '''
+
+    def __init__(
+        self,
+        directory: str,
+        threshold: float,
+        sample_rate: float,
+        max_explains: int,
+        explain_timeout: int,
+        max_bytes: int,
+        backup_count: int
+    ):
+        self.directory = directory
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.max_explains = max_explains
+        self.explain_timeout = explain_timeout
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.__explains: set[asyncio.Task] = set()  # Running EXPLAIN tasks (strong references)
+        self.__store: logging.Logger | None = None
+        self.__store_path: str | None = None
+
+    def track(self, func: Callable) -> Callable:
+        """
+        SQLAlchemyRepository method decorator: time the call and log it if it is slow
+
+        Args:
+            func (Callable): Async repository method
+
+        Returns:
+            Callable: Decorated method
+        """
+        @functools.wraps(func)
+        async def wrapper(repository, *args, **kwargs) -> Any:
+            if _repository_call.get() is not None:  # Nested repository call, statements go to the outer one
+                return await func(repository, *args, **kwargs)
+
+            caller = sys._getframe(1).f_code  # Awaiting coroutine => service method
+            call = RepositoryCall(caller=caller.co_qualname, method=func.__name__)
+            token = _repository_call.set(call)
+            start = time.perf_counter()
+            try:
+                return await func(repository, *args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                _repository_call.reset(token)
+                if duration >= self.threshold and call.statements:
+                    self._slow_call(call, duration)
+        return wrapper
+
+    def _slow_call(self, call: RepositoryCall, duration: float) -> None:
+        timing = get_request_timing()
+        entry = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'pid': os.getpid(),
+            'caller': call.caller,
+            'repository_method': call.method,
+            'route': timing.route() if timing is not None else None,
+            'duration': round(duration, 4),
+            'statements': [statement.to_dict() for statement in call.statements],
+        }
+        DB_SLOW_CALLS.labels(call.caller).inc()
+        logger.warning('Slow repository call', extra={key: entry[key] for key in ('caller', 'repository_method', 'route', 'duration')})  # log
+
+        explained = [statement for statement in call.statements if not statement.executemany]
+        if explained and len(self.__explains) < self.max_explains and random.random() < self.sample_rate:
+            slowest = max(explained, key=lambda statement: statement.duration)
+            task = asyncio.create_task(self._explain(entry, slowest), context=contextvars.Context())  # Outside of the request (timing, query stats)
+            self.__explains.add(task)
+            task.add_done_callback(self.__explains.discard)
+        else:
+            self.write(entry)
+
+    async def _explain(self, entry: dict, statement: SlowStatement) -> None:
+        operation = fingerprint(statement.statement)[0]
+        options = 'ANALYZE, BUFFERS, FORMAT JSON' if operation in ('SELECT', 'WITH') else 'FORMAT JSON'
+        try:
+            async with AsyncEngine(statement.engine).connect() as connection:
+                transaction = await connection.begin()
+                try:
+                    await connection.execute(text(f'SET LOCAL statement_timeout = {int(self.explain_timeout)}'))
+                    result = await connection.exec_driver_sql(f'EXPLAIN ({options}) {statement.statement}', statement.parameters)
+                    plan = result.scalar()
+                    if isinstance(plan, str):  # asyncpg returns 'json' columns as text
+                        plan = orjson.loads(plan)
+                finally:
+                    await transaction.rollback()
+            entry['explain'] = {'fingerprint': fingerprint(statement.statement)[1], 'options': options, 'plan': plan}
+        except Exception as e:
+            entry['explain'] = {'fingerprint': fingerprint(statement.statement)[1], 'error': str(e)}
+        self.write(entry)
+
+    def _get_store(self) -> logging.Logger:
+        path = os.path.join(self.directory, f'slow_queries-{os.getpid()}.jsonl')
+        if self.__store is None or self.__store_path != path:  # One file per worker process (created after fork)
+            os.makedirs(self.directory, exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            store = logging.getLogger(f'slow_queries.{os.getpid()}')
+            for old_handler in store.handlers:
+                old_handler.close()
+            store.handlers = [handler]
+            store.setLevel(logging.INFO)
+            store.propagate = False  # Not the application log
+            self.__store, self.__store_path = store, path
+        return self.__store
+
+    def write(self, entry: dict) -> None:
+        try:
+            self._get_store().info(orjson.dumps(entry, default=str).decode('utf-8'))
+        except OSError as e:
+            logger.error(msg='Slow query store write failed', extra={'Error': e}, exc_info=False)  # log
+
+    def read(self, limit: int = 100) -> list[dict]:
+        """
+        Read the latest entries of all workers (blocking file IO)
+
+        Args:
+            limit (int): Max amount of entries
+
+        Returns:
+            list[dict]: Entries, newest first
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, 'slow_queries-*.jsonl*')):
+            try:
+                with open(path, 'rb') as file:
+                    entries.extend(orjson.loads(line) for line in file if line.strip())
+            except (OSError, orjson.JSONDecodeError):
+                continue  # Rotated or written right now
+        entries.sort(key=lambda entry: entry['timestamp'], reverse=True)
+        return entries[:limit]
+
+
+slow_query_log = SlowQueryLog(
+    directory=settings.SQL_SLOW_QUERY_DIR,
+    threshold=settings.SQL_SLOW_QUERY_THRESHOLD,
+    sample_rate=settings.SQL_SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    max_explains=settings.SQL_SLOW_QUERY_MAX_EXPLAINS,
+    explain_timeout=settings.SQL_SLOW_QUERY_EXPLAIN_TIMEOUT,
+    max_bytes=settings.SQL_SLOW_QUERY_MAX_BYTES,
+    backup_count=settings.SQL_SLOW_QUERY_BACKUP_COUNT,
+)
@@ -0,0 +1,73 @@
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+
+from src.cache.invalidation_bus import invalidation_bus
+from src.logger import logger
+
+
+UNIT_OF_WORK = 'unit_of_work'  # session.info key, repositories flush instead of COMMIT
+
+
+class UnitOfWork:
+    '''
+    One transaction for the repository calls of a router service method (async context manager)
+
+    1. Outer block: repository writes are flushed, the block ends with one COMMIT (ROLLBACK on any exception)
+    2. Nested block: SAVEPOINT, an exception rolls back only the nested writes and is re-raised
+    3. Entities marked dirty are evicted from caches after the COMMIT
+
+    Fields:
+        session (AsyncSession): Session shared by the repositories of the request
+    '''
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.__savepoints: list[AsyncSessionTransaction] = []
+        self.__depth = 0
+
+    @property
+    def active(self) -> bool:
+        return self.__depth > 0
+
+    async def __aenter__(self) -> 'UnitOfWork':
+        if self.__depth:
+            self.__savepoints.append(await self.session.begin_nested())  # SAVEPOINT
+        else:
+            self.session.info[UNIT_OF_WORK] = self
+        self.__depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__depth -= 1
+        if self.__depth:
+            savepoint = self.__savepoints.pop()
+            if exc_type is None:
+                await savepoint.commit()  # RELEASE SAVEPOINT
+            else:
+                await savepoint.rollback()  # ROLLBACK TO SAVEPOINT
+            return
+
+        self.session.info.pop(UNIT_OF_WORK, None)
+        if exc_type is not None:
+            await self.session.rollback()
+            return
+        try:
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.critical(msg='SQLALCHEMY CRITICAL ERROR', extra={'Error': e}, exc_info=False) # log
+            raise SQLAlchemyError
+        await invalidation_bus.publish_committed(self.session) # Evict dirty entities from all workers caches
+
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    """
+    Check if the session is used by an open unit of work
+
+    Args:
+        session (AsyncSession): SQLAlchemy session
+
+    Returns:
+        bool: True - the unit of work commits / rolls back the transaction
+    """
+    return UNIT_OF_WORK in session.info
@@ -3,7 +3,7 @@ from httpx import AsyncClient
 from sqlalchemy import insert
 import pytest
 
-from tests.conftest import engine_test, async_session_factory_test
+from tests.conftest import engine_test, async_session_factory_test, clear_caches
 from src.main import app as fastapi_app
 from src.database import Base
 from src.models.model_role import Role
@@ -26,6 +26,7 @@ async def database_prepare():
     async with engine_test.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all) # DELETE all tables
         await conn.run_sync(Base.metadata.create_all) # CREATE empty tables
+    await clear_caches() # Cached Users / responses of the dropped tables
         
     async with async_session_factory_test() as session:
         stmt = insert(Role).values(id=1, name='test', permicions=['None'])
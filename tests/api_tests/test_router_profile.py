@@ -5,6 +5,8 @@ import pytest
 from httpx import AsyncClient
 from pydantic import EmailStr
 
+from src.utils.query_stats import QueryCounter
+
 
 '''
 !!!
@@ -71,7 +73,8 @@ class TestRouterProfile:
         Args:
             authenticated_ac (AsyncClient): Authenticated User
         """
-        response = await authenticated_ac.get('/profile/me')  # HTTP GET
+        with QueryCounter(budget=4):  # User (auth) + User, Projects, Tasks (profile)
+            response = await authenticated_ac.get('/profile/me')  # HTTP GET
         response_data = {key: value for key, value in response.json().items() if key != 'registred_at'}
         
         assert response.status_code == 200
@@ -83,6 +86,8 @@ class TestRouterProfile:
             'projects': [],
             'user_tasks': [],
         }
+        assert 'auth;dur=' in response.headers['server-timing']  # Request phases
+        assert 'total;dur=' in response.headers['server-timing']
     
 
     @pytest.mark.parametrize('email, old_username, old_password, new_username, new_password, status_code', [
@@ -5,6 +5,8 @@ import pytest
 from httpx import AsyncClient
 from datetime import date
 
+from src.dependencies.pagination_manager import PaginationManager
+
 
 '''
 !!!
@@ -39,7 +41,7 @@ class TestRouterProject:
     @pytest.mark.parametrize('project_name, status_code', [
         ('project1', 200),  # Correct request
         ('project2', 404),  # Project not found
-        ('projest%3', 404),  # Project not found
+        ('projest%3', 400),  # Invalid Project name
     ])    
     async def test_get_some_project_by_name(self, authenticated_ac: AsyncClient, project_name: str, status_code: int):
         """ Test reading some project
@@ -65,7 +67,7 @@ class TestRouterProject:
     @pytest.mark.parametrize('project_name, status_code', [
         ('project1', 200),  # Correct request
         ('project2', 404),  # Project not found
-        ('project&3', 404),  # Project not found
+        ('project&3', 400),  # Invalid Project name
     ])
     async def test_delete_current_project(self, authenticated_ac: AsyncClient, project_name: str, status_code: int):
         """ Test deleting project by name
@@ -114,4 +116,94 @@ class TestRouterProject:
         
         assert response.status_code == status_code
         if status_code == 200:
-            assert response_data == {'message': 'Task has been created', 'status_code': 200}
\ No newline at end of file
+            assert response_data == {'message': 'Task has been created', 'status_code': 200}    
+    
+    async def test_get_user_projects(self, authenticated_ac: AsyncClient):
+        """ Test listing current User Projects
+
+        Args:
+            authenticated_ac (AsyncClient): Authenticated User
+        """
+        response = await authenticated_ac.get('/projects', params={'limit': 10})  # HTTP GET
+        
+        response_data = response.json()
+        
+        assert response.status_code == 200
+        assert [project['name'] for project in response_data['items']] == ['project1']
+        assert response_data['next_cursor'] is None
+    
+    
+    async def test_get_project_tasks(self, authenticated_ac: AsyncClient):
+        """ Test listing Project Tasks page by page
+
+        Args:
+            authenticated_ac (AsyncClient): Authenticated User
+        """
+        response1 = await authenticated_ac.get('/projects/project1/tasks', params={'limit': 1})  # HTTP GET. First page
+        response1_data = response1.json()
+        
+        assert response1.status_code == 200
+        assert [task['name'] for task in response1_data['items']] == ['task1']
+        assert response1_data['next_cursor']
+        
+        response2 = await authenticated_ac.get('/projects/project1/tasks', params={'limit': 1, 'cursor': response1_data['next_cursor']})  # HTTP GET. Second page
+        response2_data = response2.json()
+        
+        assert response2.status_code == 200
+        assert [task['name'] for task in response2_data['items']] == ['task2']
+        assert response2_data['next_cursor'] is None
+        
+        response3 = await authenticated_ac.get('/projects/project1/tasks', params={'cursor': 'invalid'})  # HTTP GET. Invalid cursor
+        assert response3.status_code == 400
+        
+        response4 = await authenticated_ac.get('/projects/project1/tasks', params={'cursor': PaginationManager.encode_cursor(('a', 'x'))})  # HTTP GET. Wrongly typed cursor
+        assert response4.status_code == 400
+    
+    
+    async def test_profiles_show_new_task(self, authenticated_ac: AsyncClient):
+        """ Test cached owner profiles are evicted by a Task of another performer
+
+        Args:
+            authenticated_ac (AsyncClient): Authenticated User
+        """
+        def project_tasks(profile: dict) -> list[str]:
+            return [task['name'] for project in profile['projects'] for task in project['project_tasks']]
+        
+        me = (await authenticated_ac.get('/profile/me')).json()  # HTTP GET. Cached profiles
+        public = (await authenticated_ac.get(f'/profile/@{me["username"]}')).json()
+        assert 'task3' not in project_tasks(me) and 'task3' not in project_tasks(public)
+        
+        response = await authenticated_ac.post('/projects/project1/task/create', json={  # HTTP POST
+            'customer_id': 6,
+            'performer_id': 6,
+            'name': 'task3',
+            'deadline': None,
+        })
+        assert response.status_code == 200
+        
+        me = (await authenticated_ac.get('/profile/me')).json()  # HTTP GET
+        public = (await authenticated_ac.get(f'/profile/@{me["username"]}')).json()
+        assert 'task3' in project_tasks(me)
+        assert 'task3' in project_tasks(public)
+    
+    
+    async def test_project_name_with_space(self, authenticated_ac: AsyncClient):
+        """ Test reaching a Project with a space in its name by the path parameter
+
+        Args:
+            authenticated_ac (AsyncClient): Authenticated User
+        """
+        response = await authenticated_ac.post('/projects/create_project', json={  # HTTP POST
+            'name': 'my project'
+        })
+        assert response.status_code == 200
+        
+        response = await authenticated_ac.get('/projects/my project')  # HTTP GET
+        assert response.status_code == 200
+        assert response.json()['name'] == 'my project'
+        
+        response = await authenticated_ac.get('/projects/my project/tasks')  # HTTP GET
+        assert response.status_code == 200
+        
+        response = await authenticated_ac.delete('/projects/my project/delete')  # HTTP DELETE
+        assert response.status_code == 200
@@ -0,0 +1,49 @@
+# BENCHMARK charset validation of request bodies - BNCH1
+#
+# python -m tests.benchmarks.bench_charset
+#
+# Before: the parsed body was dumped to dict and every character was checked in a Python loop (ValidationManager)
+# After: compiled charset regexes run while pydantic parses the body
+
+import timeit
+
+from pydantic import BaseModel, EmailStr, Field
+
+from src.schemas.user_schemas import UserCreate
+
+
+class UserCreateWithoutCharset(BaseModel): # UserCreate before the charset rules
+    email: EmailStr
+    username: str = Field(min_length=3, max_length=20)
+    password: str = Field(min_length=5)
+
+
+def validate_schemas_data_user(data_dict: dict[str, str]) -> bool: # ValidationManager.validate_schemas_data_user (without 'async')
+    temp = {key: value for key, value in data_dict.items() if key != 'email' and key != 'is_active'}
+    for value in temp.values():
+        for let in value:
+            if not (let.isalnum() or let == '_'):
+                return False
+    return True
+
+
+BODY = b'{"email": "test1@example.com", "username": "test_user_name_1", "password": "very_long_password_1234567890"}'
+
+
+def before() -> None:
+    user_data = UserCreateWithoutCharset.model_validate_json(BODY)
+    assert validate_schemas_data_user(user_data.model_dump())
+
+
+def after() -> None:
+    UserCreate.model_validate_json(BODY)
+
+
+def main(number: int = 100_000) -> None:
+    for name, func in (('before', before), ('after', after)):
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        print(f'{name:>6}: {seconds / number * 1e6:.2f} us per request body')
+
+
+if __name__ == '__main__':
+    main()
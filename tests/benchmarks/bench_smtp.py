@@ -0,0 +1,47 @@
+# BENCHMARK register emails over SMTP - BNCH2
+#
+# python -m tests.benchmarks.bench_smtp
+#
+# Before: one SMTP connection (connect + login + QUIT) per email
+# After: batch of emails over one pooled connection
+#
+# Local plain SMTP stand-in, so the difference is a lower bound (no TLS handshake, no network latency)
+
+import time
+from smtplib import SMTP
+
+from src.tasks.email_templates import create_register_confirmation_template
+from src.tasks.smtp_pool import SMTPPool
+from tests.smtp_server import LocalSMTPServer
+
+
+EMAILS = [f'test{number}@example.com' for number in range(500)]
+
+
+def before(server: LocalSMTPServer) -> None:
+    for email_to in EMAILS:
+        with SMTP(server.host, server.port, timeout=5) as connection:
+            connection.login('user', 'password')
+            connection.send_message(create_register_confirmation_template(email_to))
+
+
+def after(server: LocalSMTPServer) -> None:
+    pool = SMTPPool(host=server.host, port=server.port, user='user', password='password', use_ssl=False, size=1, timeout=5, max_idle=30, max_messages=100)
+    for start in range(0, len(EMAILS), 50):  # SMTP_BATCH_SIZE
+        with pool.connection() as connection:
+            for email_to in EMAILS[start:start + 50]:
+                connection.send_message(create_register_confirmation_template(email_to))
+    pool.close()
+
+
+def main() -> None:
+    for name, func in (('before', before), ('after', after)):
+        with LocalSMTPServer() as server:
+            start = time.perf_counter()
+            func(server)
+            seconds = time.perf_counter() - start
+        print(f'{name:>6}: {len(EMAILS) / seconds:.0f} emails/s, {server.connections} connections')
+
+
+if __name__ == '__main__':
+    main()
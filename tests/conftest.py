@@ -1,14 +1,20 @@
 from typing import AsyncGenerator
 
+import pytest
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
+from src.cache.invalidation_bus import ALL_KEYS, invalidation_bus
+from src.cache.presence_store import presence_store
+from src.cache.principal_cache import PrincipalCache
+from src.cache.response_cache import ResponseCache
 from src.config import settings
-from src.database import get_async_session
+from src.database import get_async_read_session, get_async_session, instrument_engine
 from src.main import app
 from src.logger import logger
+from src.redis_config import app_redis
 
-engine_test = create_async_engine(settings.TEST_DATABASE_URL, echo=False, poolclass=NullPool)
+engine_test = instrument_engine(create_async_engine(settings.TEST_DATABASE_URL, echo=False, poolclass=NullPool)) # Replaces the application engine
 async_session_factory_test = async_sessionmaker(engine_test, class_=AsyncSession, expire_on_commit=False, autoflush=False)
 
 
@@ -33,5 +39,23 @@ async def get_async_session_test() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close() # Close session
+
+
+@pytest.fixture(scope='function', autouse=True)
+def redis_prepare():
+    """ Fresh Redis pool for every test (pool connections are bound to the event loop which opened them) """
+    app_redis.reset()
+
+
+async def clear_caches() -> None:
+    """ Delete cached principals / responses / presence of the dropped test Database (ids are reused after CREATE) """
+    patterns = (f'{PrincipalCache.prefix}:*', f'{ResponseCache.prefix}:*', f'{ResponseCache.lock_prefix}:{ResponseCache.prefix}:*')
+    for pattern in patterns:
+        keys = [key async for key in app_redis.connection.scan_iter(match=pattern)]
+        if keys:
+            await app_redis.connection.delete(*keys)
+    await app_redis.connection.delete(presence_store.active_key, presence_store.last_seen_key, presence_store.dirty_key) # Presence of reused User ids
+    invalidation_bus.evict_local(ALL_KEYS) # Worker process tiers
             
-app.dependency_overrides[get_async_session] = get_async_session_test
\ No newline at end of file
+app.dependency_overrides[get_async_session] = get_async_session_test
+app.dependency_overrides[get_async_read_session] = get_async_session_test # No replicas in tests
@@ -0,0 +1,72 @@
+import socketserver
+import threading
+from email import message_from_bytes
+from email.message import Message
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    # Minimal plain SMTP session: EHLO (AUTH PLAIN), AUTH, MAIL, RCPT, DATA, NOOP, RSET, QUIT
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+
+    def handle(self) -> None:
+        server: 'LocalSMTPServer' = self.server.owner
+        with server.lock:
+            server.connections += 1
+        self.reply('220 localhost ESMTP')
+        while line := self.rfile.readline():
+            command = line.decode('ascii', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250-localhost')
+                self.reply('250 AUTH PLAIN')
+            elif verb == 'AUTH':
+                self.reply('235 Authentication successful')
+            elif verb in ('MAIL', 'RCPT', 'NOOP', 'RSET'):
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while (data_line := self.rfile.readline()) not in (b'.\r\n', b''):
+                    data.append(data_line[1:] if data_line.startswith(b'..') else data_line)
+                with server.lock:
+                    server.messages.append(message_from_bytes(b''.join(data)))
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class LocalSMTPServer:
+    '''
+    Local SMTP stand-in (plain SMTP, any login) for email tests and benchmarks
+
+    Fields:
+        host (str): Listen host
+        port (int): Listen port (0 - random free port)
+        messages (list[Message]): Received emails
+        connections (int): Accepted connections
+    '''
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages: list[Message] = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.__server: socketserver.ThreadingTCPServer | None = None
+
+    def __enter__(self) -> 'LocalSMTPServer':
+        self.__server = socketserver.ThreadingTCPServer((self.host, self.port), _SMTPHandler)
+        self.__server.daemon_threads = True
+        self.__server.owner = self
+        self.port = self.__server.server_address[1]
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
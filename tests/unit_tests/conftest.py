@@ -2,7 +2,7 @@ from sqlalchemy import insert, delete
 import asyncio
 import pytest
 
-from tests.conftest import engine_test, async_session_factory_test
+from tests.conftest import engine_test, async_session_factory_test, clear_caches
 from src.schemas.project_schemas import ProjectCreate, ProjectUpdate
 from src.schemas.role_schemas import RoleCreate, RoleUpdate
 from src.schemas.user_schemas import UserCreate, UserUpdate
@@ -36,6 +36,7 @@ async def database_prepare():
     async with engine_test.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all) # DROP all tables
         await conn.run_sync(Base.metadata.create_all) # CREATE empty tables
+    await clear_caches() # Cached Users / responses of the dropped tables
 
 
 # MOCK
@@ -1,10 +1,55 @@
 # TEST application dependencies - TSTU3
 
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from uuid import uuid4
+
+import orjson
 import pytest
 
-from pydantic import EmailStr
+from fastapi import Response
+from pydantic import BaseModel, EmailStr
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import select
+
+from src.cache.invalidation_bus import InvalidationBus, mark_dirty
+from src.cache.key_builders import attr_key
+from src.cache.presence_store import PresenceStore, presence_store
+from src.cache.response_cache import ResponseCache
+from src.dependencies.password_manager import password_manager
+from src.exceptions.auth_error import AuthError
+from src.logger import ExpectedErrorFilter, RateLimitFilter
+from src.models.model_outbox import OutboxMessage
+from src.redis_config import app_redis
+from src.schemas.charset import CHARSET_ERROR, WORD_CHARSET
+from src.repositories.role_service import RoleService
+from src.schemas.project_schemas import ProjectCreate, ProjectRead
+from src.schemas.role_schemas import RoleCreate
+from src.schemas.task_schemas import TaskCreate
+from src.schemas.user_schemas import UserCreate
+from src.tasks.email_templates import create_register_confirmation_template
+from src.tasks.outbox_relay import OutboxRelay
+from src.tasks.smtp_pool import SMTPPool
+from src.utils.query_stats import fingerprint
+from src.utils.responses import ModelResponse
+from src.utils.read_routing import ReplicaRouter, start_read_your_writes
+from src.utils.role_repo import RoleRepository
+from src.utils.unit_of_work import UnitOfWork
+from src.utils.user_repo import UserRepository
+from tests.conftest import async_session_factory_test, engine_test
+from tests.smtp_server import LocalSMTPServer
+
+
+def is_valid(schema: type[BaseModel], data: dict) -> bool:
+    try:
+        schema.model_validate(data)
+        return True
+    except PydanticValidationError as e:
+        assert {error['type'] for error in e.errors()} == {CHARSET_ERROR} # Only symbols are incorrect
+        return False
 
-from src.dependencies.validation_manager import ValidationManager
 
 class TestSecurity:
     @pytest.mark.parametrize('id, username, email, password, response', [
@@ -22,9 +67,8 @@ class TestSecurity:
             password (str): User password
             response (bool): test response
         """
-        user_data_dict = {'id': id, 'username': username, 'email': email, 'password': password}
-        result = await ValidationManager.validate_schemas_data_user(user_data_dict)
-        assert result == response
+        user_data_dict = {'username': username, 'email': email, 'password': password}
+        assert is_valid(UserCreate, user_data_dict) == response
         
     
     @pytest.mark.parametrize('id, name, owner_id, response', [
@@ -42,9 +86,8 @@ class TestSecurity:
             owner_id (str): Project owner_id
             response (bool): test response
         """
-        project_data_dict = {'id': id, 'name': name, 'owner_id': owner_id}
-        result = await ValidationManager.validate_shemas_data_project(project_data_dict)
-        assert result == response
+        project_data_dict = {'name': name}
+        assert is_valid(ProjectCreate, project_data_dict) == response
     
     
     @pytest.mark.parametrize('name, response', [
@@ -60,9 +103,8 @@ class TestSecurity:
             name (str): Task name
             response (bool): test response
         """
-        task_data_dict = {'name': name}
-        result = await ValidationManager.validate_schemas_data_task(task_data_dict)
-        assert result == response
+        task_data_dict = {'customer_id': 1, 'performer_id': 1, 'name': name, 'deadline': None}
+        assert is_valid(TaskCreate, task_data_dict) == response
     
     
     @pytest.mark.parametrize('data, response', [
@@ -78,5 +120,253 @@ class TestSecurity:
             data (str): some data
             response (bool): test response
         """
-        result = await ValidationManager.validate_path_data(data)
-        assert result == response
\ No newline at end of file
+        assert WORD_CHARSET.is_valid(data) == response
+    
+    
+    async def test_password_manager(self):
+        """ Test hashing and verifying password in the thread pool """
+        password_hash = await password_manager.get_password_hash('test1')
+        
+        assert password_hash != 'test1'
+        assert await password_manager.verify_password('test1', password_hash) is True
+        assert await password_manager.verify_password('test2', password_hash) is False
+
+    
+    
+    async def test_invalidation_bus(self):
+        """ Test publishing dirty entity keys only after COMMIT """
+        bus = InvalidationBus()
+        evicted = []
+        bus.add_local_handler(lambda *keys: evicted.extend(keys))
+        
+        async with async_session_factory_test() as session:
+            await session.execute(select(1))
+            mark_dirty(session, 'user:1')
+            await session.rollback() # Discarded
+            
+            await session.execute(select(1))
+            mark_dirty(session, 'user:2', 'username:test2')
+            await session.commit()
+            await bus.publish_committed(session)
+        
+        assert evicted == ['user:2', 'username:test2']
+
+    
+    
+    async def test_response_cache_singleflight(self):
+        """ Test recomputing a missing key once for concurrent requests """
+        cache = ResponseCache(app_redis.redis_string_type_service, local_ttl=5, local_maxsize=10, stale_ttl=5, lock_timeout=5, beta=1.0)
+        calls = []
+        
+        @cache.cached(namespace=f'test_{uuid4().hex}', key_builder=attr_key('user', 'user_id'), ttl=5)
+        async def get_user(user_id: int) -> dict:
+            calls.append(user_id)
+            await asyncio.sleep(0.1)
+            return {'id': user_id}
+        
+        results = await asyncio.gather(*[get_user(user_id=1) for _ in range(10)])
+        
+        assert results == [{'id': 1}] * 10
+        assert calls == [1]
+    
+    
+    @pytest.mark.parametrize('transaction', [False, True])
+    async def test_redis_batch(self, transaction: bool):
+        """ Test sending queued Redis commands in one round trip
+
+        Args:
+            transaction (bool): MULTI / EXEC
+        """
+        key = f'test:{uuid4().hex}'
+        async with app_redis.redis_string_type_service.batch(transaction=transaction) as batch:
+            batch.create_one(f'{key}:1', 'value1', ex=10)
+            batch.create_many(ex=10, **{f'{key}:2': 'value2', f'{key}:3': 'value3'})
+            batch.get_one(f'{key}:1')
+            batch.get_many(f'{key}:2', f'{key}:3', f'{key}:4')
+            batch.delete_one(f'{key}:1', f'{key}:2', f'{key}:3')
+            results = await batch.execute()
+        
+        assert results == [True, True, 'value1', ['value2', 'value3', None], 3]
+    
+    
+    async def test_fingerprint_batches(self):
+        """ Test one fingerprint for IN lists and multi-row VALUES of any size """
+        def fingerprints(template: str, item: str) -> set[str]:
+            return {fingerprint(template.format(', '.join([item] * size)))[1] for size in (1, 2, 3, 1000)}
+        
+        assert len(fingerprints('SELECT task.id FROM task WHERE task.id IN ({})', '$1::INTEGER')) == 1
+        assert len(fingerprints('INSERT INTO task (name, price) VALUES {} RETURNING task.id', '($1::VARCHAR, $2::NUMERIC(10, 2))')) == 1
+        assert len(fingerprints('UPDATE "user" SET is_active=new_values.is_active FROM (VALUES {}) AS new_values (id, is_active) WHERE "user".id = new_values.id', '($1::INTEGER, $2::BOOLEAN)')) == 1
+        
+        operation, _, statement = fingerprint('INSERT INTO task (name, project_id) VALUES ($1::VARCHAR, $2), ($3::VARCHAR, $4) RETURNING task.id')
+        assert operation == 'INSERT'
+        assert statement == 'INSERT INTO task (name, project_id) VALUES (?::VARCHAR, ?) RETURNING task.id'
+    
+    
+    async def test_log_filters(self):
+        """ Test rate limiting of one message and dropping tracebacks of client errors """
+        rate_limit = RateLimitFilter(rate=0, burst=2)
+        records = [logging.LogRecord('test', logging.WARNING, __file__, 0, 'Repeated message', None, None) for _ in range(3)]
+        assert [rate_limit.filter(record) for record in records] == [True, True, False]
+        
+        try:
+            raise AuthError(msg='Token is invalid')
+        except AuthError:
+            record = logging.LogRecord('test', logging.WARNING, __file__, 0, 'Token is invalid', None, sys.exc_info())
+        ExpectedErrorFilter().filter(record)
+        assert record.exc_info is None
+    
+    
+    async def test_model_response(self):
+        """ Test serializing trusted models (dates by the schema, headers of the injected Response) """
+        project = ProjectRead(id=1, name='test', created_at=datetime(2024, 5, 1, 12, 30), owner_id=1, project_tasks=[])
+        sub_response = Response()
+        sub_response.set_cookie(key='user_access_token', value='token')
+        
+        response = ModelResponse.from_endpoint(project, {'response': sub_response, 'project': project})
+        
+        assert orjson.loads(response.body) == {'id': 1, 'name': 'test', 'created_at': '2024-05-01', 'owner_id': 1, 'project_tasks': []}
+        assert 'user_access_token' in response.headers['set-cookie']
+    
+    
+    async def test_smtp_pool(self):
+        """ Test sending batches of emails over one pooled SMTP connection (local SMTP stand-in) """
+        with LocalSMTPServer() as server:
+            pool = SMTPPool(host=server.host, port=server.port, user='user', password='password', use_ssl=False, size=2, timeout=5, max_idle=30, max_messages=100)
+            for batch in (['test1@example.com', 'test2@example.com'], ['test3@example.com']):
+                with pool.connection() as connection:
+                    for email_to in batch:
+                        connection.send_message(create_register_confirmation_template(email_to))
+            pool.close()
+        
+        assert server.connections == 1
+        assert [message['To'] for message in server.messages] == ['test1@example.com', 'test2@example.com', 'test3@example.com']
+    
+    
+    async def test_outbox_relay(self):
+        """ Test sending claimed outbox messages without a transaction / row locks and postponing failed ones """
+        async with async_session_factory_test() as session:
+            session.add_all([OutboxMessage(task='sent', payload=index) for index in range(3)] + [OutboxMessage(task='failed', payload=3)])
+            await session.commit()
+        
+        relay = OutboxRelay(async_session_factory_test, batch_size=10, chunk_size=2, poll_interval=1, max_backoff=300, lease=60)
+        sent = []
+        
+        async def send(task_name: str, chunk: list[OutboxMessage]) -> bool:
+            async with async_session_factory_test() as session:
+                locked = (await session.execute(select(OutboxMessage.id).with_for_update(nowait=True))).scalars().all() # Raises if the claim still locks rows
+                assert len(locked) == 4
+                assert await relay._claim() == [] # Leased
+            sent.extend(message.payload for message in chunk)
+            return task_name == 'sent'
+        
+        relay._send = send
+        assert await relay.relay_batch() == 4
+        assert sorted(sent) == [0, 1, 2, 3]
+        
+        async with async_session_factory_test() as session:
+            messages = (await session.execute(select(OutboxMessage))).scalars().all()
+        assert [(message.task, message.attempts) for message in messages] == [('failed', 1)]
+        assert await relay.relay_batch() == 0 # Postponed by the backoff
+    
+    
+    async def test_unit_of_work(self):
+        """ Test one COMMIT for many repository calls and rolling back a failed nested block to its savepoint """
+        async with async_session_factory_test() as session:
+            role_service = RoleService(RoleRepository(session))
+            uow = UnitOfWork(session)
+            async with uow:
+                await role_service.create_role(RoleCreate(name='test1', permicions=['None']))
+                with pytest.raises(ValueError):
+                    async with uow: # SAVEPOINT
+                        await role_service.create_role(RoleCreate(name='test2', permicions=['None']))
+                        raise ValueError
+                assert session.in_transaction() # Repository calls only flushed
+            
+            with pytest.raises(ValueError):
+                async with uow:
+                    await role_service.create_role(RoleCreate(name='test3', permicions=['None']))
+                    raise ValueError
+        
+        async with async_session_factory_test() as session:
+            roles = await RoleRepository(session).get_many()
+        
+        assert [role.name for role in roles] == ['test1']
+    
+    
+    @pytest.mark.usefixtures('clear_users', 'clear_roles', 'create_role', 'create_user')
+    async def test_presence_store(self):
+        """ Test reading 'is_active' from Redis and flushing the changes with one UPDATE ... FROM (VALUES ...) """
+        store = PresenceStore(app_redis.connection, async_session_factory_test, flush_interval=1, batch_size=100, touch_interval=60, touch_maxsize=10, prefix=f'test:{uuid4().hex}')
+        assert await store.is_active(1) is None # No entry => the Database value
+        
+        assert await store.set_active(1, False) is True
+        assert await store.is_active(1) is False
+        assert await store.flush() == 1
+        assert await store.flush() == 0 # Nothing changed since the last flush
+        
+        async with async_session_factory_test() as session:
+            row = await UserRepository(session).get_columns('is_active', 'last_seen_at', id=1)
+        assert row.is_active is False
+        assert row.last_seen_at is not None
+        await app_redis.connection.delete(store.active_key, store.last_seen_key, store.dirty_key)
+    
+    
+    async def test_presence_store_new_loop(self):
+        """ Test the module presence store from another event loop (the Redis pool is reset for the loop) """
+        app_redis.reset() # Drop connections of the test loop
+        assert await asyncio.to_thread(asyncio.run, presence_store.set_active(1, True)) is True # Connection of a loop closed by asyncio.run
+        assert await presence_store.is_active(1) is True
+        await presence_store.forget(1)
+    
+    
+    @pytest.mark.usefixtures('clear_roles')
+    async def test_replica_router(self):
+        """ Test routing reads to a replica within the lag limit and to the primary after a write of the client """
+        replica_router = ReplicaRouter(engines=[engine_test], max_lag=1, check_interval=1)
+        assert replica_router.read_session_factory() is None # Lag isn't checked yet
+        
+        assert await replica_router.check_lag() == [0] # Not in recovery => no lag
+        assert replica_router.read_session_factory() is not None
+        
+        state = start_read_your_writes({'type': 'http', 'headers': [(b'cookie', b'db_sticky=1')]})
+        assert replica_router.read_session_factory() is None # Sticky client
+        
+        state.sticky = False
+        async with async_session_factory_test() as session:
+            await session.execute(select(1))
+            await session.commit()
+            assert state.wrote is False # Read-only transaction
+            
+            await RoleRepository(session).create_one({'name': 'test', 'permicions': ['None']})
+        assert state.wrote is True
+        assert replica_router.read_session_factory() is None # The request wrote => the primary
+    
+    
+    async def test_cache_replica_reads(self):
+        """ Test evicting keys again after the replica lag and reading the primary for a client that wrote recently """
+        bus = InvalidationBus(replica_lag=0.1)
+        evicted = []
+        bus.add_local_handler(lambda *keys: evicted.extend(keys))
+        
+        await bus.publish('user:1')
+        assert evicted == ['user:1']
+        await asyncio.sleep(0.2)
+        assert evicted == ['user:1', 'user:1'] # A value refilled from a lagging replica is evicted too
+        
+        cache = ResponseCache(app_redis.redis_string_type_service, local_ttl=5, local_maxsize=10, stale_ttl=5, lock_timeout=5, beta=1.0)
+        database = {'name': 'test1'}
+        
+        @cache.cached(namespace=f'test_{uuid4().hex}', key_builder=attr_key('user', 'user_id'), ttl=5)
+        async def get_user(user_id: int) -> dict:
+            return {'id': user_id, **database}
+        
+        assert await get_user(user_id=1) == {'id': 1, 'name': 'test1'}
+        database['name'] = 'test2' # The write isn't evicted yet
+        assert await get_user(user_id=1) == {'id': 1, 'name': 'test1'}
+        
+        state = start_read_your_writes({'type': 'http', 'headers': [(b'cookie', b'db_sticky=1')]})
+        assert await get_user(user_id=1) == {'id': 1, 'name': 'test2'} # Sticky client => not the cached value
+        
+        state.sticky = False
+        assert await get_user(user_id=1) == {'id': 1, 'name': 'test2'} # Replaced by the sticky request
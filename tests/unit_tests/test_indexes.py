@@ -0,0 +1,26 @@
+# TEST repository filters are backed by indexes - TSTU4
+
+from src.utils.index_audit import find_unindexed_filters
+
+
+class TestIndexes:
+    async def test_repository_filters_are_indexed(self):
+        """ Test every 'filter_by' column in DAO services is backed by an index """
+        result = find_unindexed_filters()
+        assert result == []
+    
+    
+    async def test_partial_update_filters_are_audited(self, tmp_path):
+        """ Test 'update_fields' filters and 'update_many' keys are checked too """
+        (tmp_path / 'user_service.py').write_text(
+            'from src.models.model_user import User\n'
+            '\n'
+            'class UserService:\n'
+            '    async def update_by_activity(self, rows):\n'
+            "        await self.user_repo.update_fields({'is_active': False}, is_active=True)\n"
+            "        await self.user_repo.update_many(rows, key='is_active')\n"
+            '        await self.user_repo.update_many(rows)\n',
+            encoding='utf-8',
+        )
+        result = find_unindexed_filters(tmp_path)
+        assert [(call['line'], call['columns']) for call in result] == [(5, ['is_active']), (6, ['is_active'])]
@@ -1,11 +1,15 @@
 # TEST Profile CRUD requests - TSTU1
 
 import pytest
+from sqlalchemy.exc import InvalidRequestError
 
+from src.exceptions.conflict_error import ConflictError
 from src.schemas.role_schemas import RoleCreate, RoleUpdate
 from src.schemas.user_schemas import UserCreate, UserUpdate
 from src.repositories.role_service import RoleService
 from src.repositories.user_service import UserService
+from src.utils.query_stats import QueryCounter
+from src.utils.slow_queries import slow_query_log
 
 
 class TestRoleCRUD:
@@ -98,6 +102,25 @@ class TestUserCRUD:
         assert result == {'message': 'User has been created'}
     
     
+    @pytest.mark.usefixtures('clear_users', 'clear_roles', 'create_role', 'create_user')
+    @pytest.mark.parametrize('email, username, response', [
+        ('TEST@example.com', 'test2', 'User already exists'),
+        ('test2@example.com', 'Test1', 'Username is already taken'),
+    ])
+    async def test_create_user_conflict(self, email: str, username: str, response: str, user_service_test: UserService):
+        """ Test mapping unique indexes to ConflictError messages (INSERT ... ON CONFLICT DO NOTHING)
+
+        Args:
+            email (str): User email
+            username (str): User username
+            response (str): test response
+            user_service_test (UserService): User DAO service
+        """
+        with pytest.raises(ConflictError) as error:
+            await user_service_test.create_user(UserCreate(email=email, username=username, password='test2'))
+        assert error.value.message == response
+    
+    
     @pytest.mark.usefixtures('clear_users', 'clear_roles', 'create_role', 'create_user')
     @pytest.mark.parametrize('user_email, response', [
         ('test@example.com', f'<User: id = 1, username = test1, email = test@example.com, password = test1, role_id = 1, is_active = True>'),
@@ -132,8 +155,59 @@ class TestUserCRUD:
         """
         result = await user_service_test.get_user_by_id(user_id)
         assert str(result) == response
+
+
+    @pytest.mark.usefixtures('clear_users', 'clear_roles', 'create_role', 'create_user')
+    async def test_get_user_loader_profiles(self, user_service_test: UserService):
+        """ Test loading User relationships only by loader profile
+
+        Args:
+            user_service_test (UserService): User DAO service
+        """
+        user_minimal = await user_service_test.get_user_by_id(1, loader_profile='auth-minimal')
+        with pytest.raises(InvalidRequestError):  # Relationships are not loaded
+            user_minimal.projects
+
+        user_full = await user_service_test.get_user_by_id(1, loader_profile='profile-full')
+        assert user_full.projects == []
+        assert user_full.user_tasks == []
+
+    
+    @pytest.mark.usefixtures('clear_users', 'clear_roles', 'create_role', 'create_user')
+    async def test_get_user_query_budget(self, user_service_test: UserService):
+        """ Test amount of queries of the full User profile (User + 'selectin' relationships)
+
+        Args:
+            user_service_test (UserService): User DAO service
+        """
+        with QueryCounter(budget=3) as counter:
+            await user_service_test.get_user_by_id(1, loader_profile='profile-full')
+        assert counter.count == 3
     
     
+    @pytest.mark.usefixtures('clear_users', 'clear_roles', 'create_role', 'create_user')
+    async def test_slow_query_log(self, user_service_test: UserService, monkeypatch: pytest.MonkeyPatch, tmp_path):
+        """ Test logging slow repository calls (every call is slow, without EXPLAIN)
+
+        Args:
+            user_service_test (UserService): User DAO service
+            monkeypatch (pytest.MonkeyPatch): Slow query log settings
+            tmp_path (Path): Slow query log directory
+        """
+        monkeypatch.setattr(slow_query_log, 'threshold', 0)
+        monkeypatch.setattr(slow_query_log, 'sample_rate', 0)
+        monkeypatch.setattr(slow_query_log, 'directory', str(tmp_path))
+        await user_service_test.get_user_by_email('test@example.com', loader_profile='auth-minimal')
+        
+        entries = slow_query_log.read()
+        assert len(entries) == 1
+        assert entries[0]['caller'] == 'UserService.get_user_by_email'
+        assert entries[0]['repository_method'] == 'get_one'
+        assert entries[0]['statements'][0]['operation'] == 'SELECT'
+        assert entries[0]['statements'][0]['parameters'] == ['str'] # Shapes only
+        assert 'test@example.com' not in str(entries)
+
+
     @pytest.mark.usefixtures('clear_users', 'clear_roles', 'create_role', 'create_user')
     @pytest.mark.parametrize('user_name, response', [
         ('test1', f'<User: id = 1, username = test1, email = test@example.com, password = test1, role_id = 1, is_active = True>'),
@@ -171,6 +245,22 @@ class TestUserCRUD:
         assert str(result) == response
     
     
+    @pytest.mark.usefixtures('clear_users', 'clear_roles', 'create_role', 'create_user')
+    async def test_update_fields(self, user_service_test: UserService):
+        """ Test UPDATE of one column with a column projection instead of the entity
+
+        Args:
+            user_service_test (UserService): User DAO service
+        """
+        user = await user_service_test.get_user_by_email('test@example.com')
+        await user_service_test.set_user_active(user, False)
+        
+        result = await user_service_test.user_repo.update_fields({'is_active': True}, returning=('id', 'is_active'), email='test@example.com')
+        assert tuple(result) == (1, True)
+        assert await user_service_test.user_repo.update_fields({'is_active': True}, returning=('id',), email='None@example.com') is None
+        assert await user_service_test.user_repo.get_columns('password', id=1) == ('test1',) # Other columns aren't written
+    
+    
     @pytest.mark.usefixtures('clear_users', 'clear_roles', 'create_role', 'create_user')
     @pytest.mark.parametrize('user_email, response', [
         ('test@example.com', {'message': 'User has been deleted'})
@@ -1,11 +1,16 @@
 # TEST Project CRUD requests - TSTU2 
 
+from datetime import date, datetime
+
 import pytest
+from sqlalchemy import insert
 
+from src.models.model_task import Task
 from src.schemas.project_schemas import ProjectCreate, ProjectUpdate
 from src.schemas.task_schemas import TaskCreate, TaskUpdate
 from src.repositories.project_service import ProjectService
 from src.repositories.task_service import TaskService
+from tests.conftest import async_session_factory_test
 
 
 class TestProjectCRUD:
@@ -44,20 +49,41 @@ class TestProjectCRUD:
     
     
     @pytest.mark.usefixtures('clear_projects', 'clear_users', 'clear_roles', 'create_role', 'create_user', 'create_project')
-    @pytest.mark.parametrize('project_name, response', [
-        ('test', f'<Project: id = 1, name = test>'),
-        ('None', 'None')
+    @pytest.mark.parametrize('project_name, owner_id, response', [
+        ('test', 1, f'<Project: id = 1, name = test>'),
+        ('test', 2, 'None'),  # Project of another User
+        ('None', 1, 'None')
     ])
-    async def test_get_project_by_name(self, project_name: str, response: str, project_service_test: ProjectService):
-        """ Test reading Project by name from the Database
+    async def test_get_user_project_by_name(self, project_name: str, owner_id: int, response: str, project_service_test: ProjectService):
+        """ Test reading User Project by name from the Database
 
         Args:
             project_name (str): Project name in the Database
+            owner_id (int): Project owner id
             response (str): test response
             project_service_test (ProjectService): Project DAO service
         """        
-        result = await project_service_test.get_project_by_name(project_name)
+        result = await project_service_test.get_user_project_by_name(project_name, owner_id)
         assert str(result) == response
+
+
+    @pytest.mark.usefixtures('clear_projects', 'clear_users', 'clear_roles', 'create_role', 'create_user', 'create_project')
+    @pytest.mark.parametrize('project_name, owner_id, project_id', [
+        ('test', 1, 1),
+        ('test', 2, None),  # Another owner
+        ('None', 1, None)
+    ])
+    async def test_get_user_project_id(self, project_name: str, owner_id: int, project_id: int | None, project_service_test: ProjectService):
+        """ Test owner-scoped Project lookup
+
+        Args:
+            project_name (str): Project name in the Database
+            owner_id (int): Project owner id
+            project_id (int | None): test response
+            project_service_test (ProjectService): Project DAO service
+        """
+        assert await project_service_test.get_user_project_id(project_name, owner_id) == project_id
+        assert await project_service_test.user_project_exists(project_name, owner_id) == (project_id is not None)
     
     
     @pytest.mark.usefixtures('clear_projects', 'clear_users', 'clear_roles', 'create_role', 'create_user', 'create_project')
@@ -95,19 +121,22 @@ class TestProjectCRUD:
     
     
     @pytest.mark.usefixtures('clear_projects', 'clear_users', 'clear_roles', 'create_role', 'create_user', 'create_project')
-    @pytest.mark.parametrize('project_name, response', [
-        ('test', {'message': 'Project has been deleted'})
+    @pytest.mark.parametrize('project_name, owner_id, exists', [
+        ('test', 1, False),
+        ('test', 2, True)  # Project of another User is kept
     ])
-    async def test_delete_one_project_by_name(self, project_name: str, response: dict, project_service_test: ProjectService):
-        """ Test deleting one Project by name
+    async def test_delete_user_project_by_name(self, project_name: str, owner_id: int, exists: bool, project_service_test: ProjectService):
+        """ Test deleting one User Project by name
 
         Args:
             project_name (str): Project name in the Database
-            response (dict): test response
+            owner_id (int): Project owner id
+            exists (bool): Project is still in the Database
             project_service_test (ProjectService): Project DAO service
         """
-        result = await project_service_test.delete_one_project_by_name(project_name)
-        assert result == response
+        result = await project_service_test.delete_user_project_by_name(project_name, owner_id)
+        assert result == {'message': 'Project has been deleted'}
+        assert await project_service_test.user_project_exists(project_name, 1) is exists
     
     
     @pytest.mark.usefixtures('clear_projects', 'clear_users', 'clear_roles', 'create_role', 'create_user', 'create_project')
@@ -138,8 +167,40 @@ class TestTaskCRUD:
         """
         result = await task_service_test.create_task(task_create, project_id, customer_id)
         assert result == response
-    
-    
+
+
+    @pytest.mark.usefixtures('clear_projects', 'clear_users', 'clear_roles', 'create_role', 'create_user', 'create_project')
+    async def test_create_tasks(self, task_create: TaskCreate, task_service_test: TaskService):
+        """ Test creating many Tasks with one INSERT
+
+        Args:
+            task_create (TaskCreate): Task create Validation
+            task_service_test (TaskService): Task DAO service
+        """
+        result = await task_service_test.create_tasks([task_create, task_create, task_create], 1, 1)
+        assert len(result) == 3
+        assert len(set(result)) == 3
+
+
+    @pytest.mark.usefixtures('clear_projects', 'clear_tasks', 'clear_users', 'clear_roles', 'create_role', 'create_user', 'create_project')
+    async def test_get_project_tasks_deadline(self, task_service_test: TaskService):
+        """ Test that the deadline range includes the whole 'deadline_to' day
+
+        Args:
+            task_service_test (TaskService): Task DAO service
+        """
+        async with async_session_factory_test() as session:
+            stmt = insert(Task).values([
+                {'customer_id': 1, 'performer_id': 1, 'project_id': 1, 'name': 'task1', 'deadline': datetime(2030, 4, 4, 18, 30)},
+                {'customer_id': 1, 'performer_id': 1, 'project_id': 1, 'name': 'task2', 'deadline': datetime(2030, 4, 5)},
+            ])
+            await session.execute(stmt)
+            await session.commit()
+        
+        result = await task_service_test.get_project_tasks(1, limit=10, deadline_from=date(2030, 4, 4), deadline_to=date(2030, 4, 4))
+        assert [task.name for task in result] == ['task1']
+
+
     @pytest.mark.usefixtures('clear_projects', 'clear_tasks', 'clear_users', 'clear_roles', 'create_role', 'create_user', 'create_project', 'create_task')
     @pytest.mark.parametrize('task_id, response', [
         (1, '<Task: id = 1, name = test, project_id = 1>'),